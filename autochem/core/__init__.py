@@ -2,22 +2,48 @@ __all__ = []
 
 from .atom import *
 from .bond import *
+from .fragment_cache import *
+from .fragment_db import *
+from .graph import *
+from .hessian import *
 from .job import *
+from .json_cache import *
+from .manifest import *
 from .molecule import *
+from .neighbours import *
+from .normal_modes import *
 from .periodic_table import *
+from .result_store import *
 from .results import *
+from .row_stream import *
 from .sc import *
+from .section_index import *
 from .settings import *
+from .sqlite_cache import *
 from .thermo import *
+from .thermo_cache import *
 from .utils import *
 
 __all__ += atom.__all__
 __all__ += bond.__all__
+__all__ += fragment_cache.__all__
+__all__ += fragment_db.__all__
+__all__ += graph.__all__
+__all__ += hessian.__all__
 __all__ += job.__all__
+__all__ += json_cache.__all__
+__all__ += manifest.__all__
 __all__ += molecule.__all__
+__all__ += neighbours.__all__
+__all__ += normal_modes.__all__
 __all__ += periodic_table.__all__
+__all__ += result_store.__all__
 __all__ += results.__all__
+__all__ += row_stream.__all__
 __all__ += sc.__all__
+__all__ += section_index.__all__
 __all__ += settings.__all__
+__all__ += sqlite_cache.__all__
 __all__ += thermo.__all__
+__all__ += thermo_cache.__all__
 __all__ += utils.__all__
\ No newline at end of file
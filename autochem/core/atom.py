@@ -4,12 +4,53 @@ import numpy as np
 
 __all__ = ['Atom']
 
+
+class AtomStore:
+    """
+    Contiguous per-atom arrays. A |Molecule| keeps one store for all of its
+    atoms, and every |Atom| is a view onto one row of a store. Atoms created
+    on their own are given a store with a single row.
+
+    * ``positions`` -- (N, 3) array of cartesian coordinates in angstroms
+    * ``atnums`` -- atomic numbers
+    * ``masses`` -- atomic masses in g mol⁻¹
+    * ``mol_ids`` -- fragment each atom belongs to, -1 if unassigned
+    * ``indices`` -- 1-based position in the parent system, 0 if unassigned
+    """
+    __slots__ = ('positions', 'atnums', 'masses', 'mol_ids', 'indices')
+
+    def __init__(self, size):
+        self.positions = np.zeros((size, 3))
+        self.atnums = np.zeros(size, dtype=int)
+        self.masses = np.zeros(size)
+        self.mol_ids = np.full(size, -1, dtype=int)
+        self.indices = np.zeros(size, dtype=int)
+
+    def __len__(self):
+        return len(self.atnums)
+
+    def set_atnums(self, atnums):
+        """Assign atomic numbers, keeping masses in step"""
+        self.atnums[:] = atnums
+        self.masses[:] = PT.masses[self.atnums]
+
+
+def as_vector(point):
+    """
+    Returns a point in space as a numpy array. Accepts |Atom| instances
+    as well as any sequence of x, y and z.
+    """
+    if isinstance(point, Atom):
+        return point.coords
+    return np.asarray(point, dtype=float)
+
+
 class Atom:
     """A class representing a atom in 3 dimensional euclidean space.
     An instance has the following attributes:
 
     * ``atnum`` -- atomic symbol, equal to zero for a dummy atom
-    * ``coords`` -- tuple of x,y,z coordinates
+    * ``coords`` -- numpy array of x,y,z coordinates
     * ``bonds`` -- list of bonds that this atom is a part of
     * ``mol`` -- molecule this atom is a part of. Assigned programmatically when a molecule is separated using the *mol.separate* method, or can be assigned manually if building up a molecule from scratch
 
@@ -17,22 +58,29 @@ class Atom:
     * ``x``, ``y``, ``z`` -- for atom coordinates
     * ``symbol`` -- read or write the atom symbol directly
 
+    Positions, atomic numbers, masses, molecule numbers and indices are not
+    stored on the atom itself, but in the |AtomStore| of the |Molecule| that
+    the atom belongs to. An atom is a view onto one row of those arrays, so
+    changing ``atom.coords`` moves the atom in the molecule too.
+
     >>> a = Atom('H', coords = (1,2,3))
 
     """
+    __slots__ = ('_store', '_row', '_bonds', '_connected_atoms',
+                 '_h_bonded_to', 'fragment', 'number')
+
     def __init__(self, symbol = None, atnum = 0, coords = None, mol = None, bonds = None):
+        self._store = AtomStore(1)
+        self._row = 0
         if symbol is not None:
             self.symbol = symbol
-            self.atnum = PT.get_atnum(self)
         else:
             self.atnum = atnum
-            self.symbol = PT.get_symbol(self)
 
-        self.mass = PT.get_mass(self)
         self.mol = mol
-        self.bonds = bonds or []
-        self.connected_atoms = []
-        self.h_bonded_to = []
+        self._bonds = bonds
+        self._connected_atoms = None
+        self._h_bonded_to = None
         self.fragment = None
 
         if coords is None:
@@ -42,17 +90,109 @@ class Atom:
         else:
             raise TypeError('Atom: Invalid coordinates given')
 
+    @classmethod
+    def view(cls, store, row):
+        """Returns an atom backed by row ``row`` of an |AtomStore|"""
+        atom = cls.__new__(cls)
+        atom._store = store
+        atom._row = row
+        atom._bonds = None
+        atom._connected_atoms = None
+        atom._h_bonded_to = None
+        atom.fragment = None
+        return atom
+
+    @property
+    def atnum(self):
+        return int(self._store.atnums[self._row])
+
+    @atnum.setter
+    def atnum(self, value):
+        value = int(value)
+        self._store.atnums[self._row] = value
+        self._store.masses[self._row] = PT.masses[value]
+
+    @property
+    def symbol(self):
+        return PT.ptable[self.atnum][0]
+
+    @symbol.setter
+    def symbol(self, value):
+        self.atnum = PT.atnums[value.capitalize()]
+
+    @property
+    def mass(self):
+        return float(self._store.masses[self._row])
+
+    @property
+    def coords(self):
+        return self._store.positions[self._row]
+
+    @coords.setter
+    def coords(self, value):
+        self._store.positions[self._row] = value
+
+    @property
+    def mol(self):
+        mol = self._store.mol_ids[self._row]
+        return None if mol < 0 else int(mol)
+
+    @mol.setter
+    def mol(self, value):
+        self._store.mol_ids[self._row] = -1 if value is None else value
+
+    @property
+    def index(self):
+        index = self._store.indices[self._row]
+        if index == 0:
+            raise AttributeError("'Atom' object has no attribute 'index'")
+        return int(index)
+
+    @index.setter
+    def index(self, value):
+        self._store.indices[self._row] = value
+
+    @property
+    def bonds(self):
+        if self._bonds is None:
+            self._bonds = []
+        return self._bonds
+
+    @bonds.setter
+    def bonds(self, value):
+        self._bonds = value
+
+    @property
+    def connected_atoms(self):
+        if self._connected_atoms is None:
+            self._connected_atoms = []
+        return self._connected_atoms
+
+    @connected_atoms.setter
+    def connected_atoms(self, value):
+        self._connected_atoms = value
+
+    @property
+    def h_bonded_to(self):
+        if self._h_bonded_to is None:
+            self._h_bonded_to = []
+        return self._h_bonded_to
+
+    @h_bonded_to.setter
+    def h_bonded_to(self, value):
+        self._h_bonded_to = value
+
     @property
     def x(self):
-        return self.coords[0]
+        return self._store.positions[self._row, 0]
 
     @property
     def y(self):
-        return self.coords[1]
+        return self._store.positions[self._row, 1]
 
     @property
     def z(self):
-        return self.coords[2]
+        return self._store.positions[self._row, 2]
 
     def __repr__(self):
         """Unambiguous representation of an |Atom| instance"""
@@ -80,23 +220,20 @@ class Atom:
 
     def translate(self, vector):
         """Move atom in space by passing a vector in angstroms"""
-        self.coords = [i + j for i, j in zip(self, vector)]
+        self._store.positions[self._row] += as_vector(vector)
 
     def move_to(self, vector):
         """Move atom in space to the values, in angstroms, given in this vector. The vector passed represents a point in euclidean space"""
-        self.coords = [i for i in vector]
+        self.coords = as_vector(vector)
 
     def distance_to(self, vector):
         """Measure the distance between the atom and a point in space, given as a vector in angstroms"""
         # pythagoras in 3D
-        dist = 0.0
-        for i,j in zip(self, vector):
-            dist += (i - j)**2
-        return dist ** 0.5
+        return float(np.sqrt(((self.coords - as_vector(vector))**2).sum()))
 
     def vector_to(self, point):
         """Returns a vector from the atom to a given point, in angstroms"""
-        return [(i - j) for i,j in zip(point, self)]
+        return as_vector(point) - self.coords
 
     def angle_between(self, pos1, pos2):
         """Returns an angle between positions 1 and 2 in degrees, with this atom lying at the centre"""
@@ -107,7 +244,7 @@ class Atom:
 
     def as_xyz(self, end_of_line = ''):
         """
-        Return atom in xyz format: symbol x y z. Can also give an optional 
+        Return atom in xyz format: symbol x y z. Can also give an optional
         end of line character such as a newline
         """
         return f" {self.symbol:5s} {self.x:>10.5f} {self.y:>10.5f} {self.z:>10.5f}{end_of_line}"
@@ -0,0 +1,53 @@
+import hashlib
+import os
+import numpy as np
+from .json_cache import JSONCache
+
+__all__ = ['FragmentCache']
+
+
+CACHE_DIR = os.environ.get('AUTOCHEM_CACHE',
+                           os.path.join(os.path.expanduser('~'), '.autochem_cache'))
+
+# bump if the layout of a cached record changes
+CACHE_FORMAT = 1
+
+
+class FragmentCache(JSONCache):
+    """
+    On-disk cache of the fragments found by |Molecule| ``separate()``, so that
+    separating the same system again is a lookup instead of a search.
+
+    Records are json files in ``directory`` (~/.autochem_cache by default, or
+    the AUTOCHEM_CACHE environment variable), named by a hash of everything
+    that the fragments depend on: coordinates, atomic numbers, periodic cell,
+    grouping, bonds to split and the version of the fragment database. Any
+    change to one of those misses the cache, so records never need to be
+    invalidated by hand.
+
+    Instances of this class have the following attributes:
+
+    * ``directory`` -- where records are kept
+    * ``enabled`` -- set to False to always separate from scratch
+    * ``hits``, ``misses`` -- number of lookups found and not found
+    """
+
+    def __init__(self, directory=CACHE_DIR):
+        super().__init__(directory)
+
+    def key(self, mol, db_version):
+        """
+        Returns the hash identifying the fragments of a |Molecule|, given the
+        version of the fragment database
+        """
+        cell = b'' if mol.cell is None else np.ascontiguousarray(mol.cell, dtype=float).tobytes()
+        bonds = getattr(mol, 'bonds_to_split', None) if mol.split_on_bonds else None
+        if bonds is not None:
+            bonds = sorted(tuple(sorted(int(i) for i in bond)) for bond in bonds)
+        extra = repr((CACHE_FORMAT, getattr(mol, 'group_together', None), bonds, db_version))
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.ascontiguousarray(mol.positions, dtype=float).tobytes())
+        h.update(np.ascontiguousarray(mol.atnums, dtype=np.int64).tobytes())
+        h.update(cell)
+        h.update(extra.encode())
+        return h.hexdigest()
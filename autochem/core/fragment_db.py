@@ -0,0 +1,249 @@
+from .graph import Graph, digest
+from .neighbours import bonded_pairs
+from .utils import read_xyz
+from collections import Counter
+import os
+
+__all__ = ['FragmentDB', 'composition']
+
+
+USER_FILE = os.path.expanduser('~/.config/autochem/molecules.txt')
+
+TEMPLATE = [
+    "# Molecules should be laid out in four lines as follows:\n",
+    "# name=<NAME>\n", "# charge=<CHARGE>\n",
+    "# multiplicity=<MULTIPLICITY>\n",
+    "# atoms=<list of individual atoms in any order>\n",
+    "# hashed and blank lines are not read by python,\n",
+    '# and names should contain no spaces\n'
+    "# to tell isomers apart, also give an xyz file of the molecule as\n",
+    "# structure=<path to xyz>, either absolute or relative to this file.\n",
+    "# atoms can then be left out, and are read from the xyz file.\n",
+    "# below is an example for hydrogen peroxide:\n\n", "name=h2o2\n",
+    "charge=0\n", "multiplicity=1\n", "atoms=O,H,H,O\n"
+]
+
+
+def composition(symbols):
+    """
+    Returns the composition of a list of atomic symbols as a hashable key,
+    a sorted tuple of (symbol, count). Two fragments have the same key if
+    they contain the same atoms in any order.
+
+    >>> composition(['O', 'H', 'H'])
+    (('H', 2), ('O', 1))
+    """
+    return tuple(sorted(Counter(symbols).items()))
+
+
+def structure_hash(path):
+    """
+    Returns the Weisfeiler-Lehman hash of the bonding in an xyz file, with
+    bonds found from van der waals radii as in |Molecule|
+    """
+    atoms = read_xyz(path)
+    positions = [atom.coords for atom in atoms]
+    atnums = [atom.atnum for atom in atoms]
+    graph = Graph(len(atoms), *bonded_pairs(positions, atnums))
+    return graph.wl_hash(atom.symbol for atom in atoms)
+
+
+def read_user_molecules(path):
+    """
+    Reads molecules from a user file laid out as in TEMPLATE, returning a
+    list of dictionaries with the keys name, charge, multiplicity, atoms and
+    structure- the path to an xyz file of the molecule, or None
+    """
+    molecules = []
+    molecule = {}
+
+    def add(molecule):
+        if 'structure' in molecule and 'atoms' not in molecule:
+            if not os.path.isfile(molecule['structure']):
+                print(f"Warning: {molecule['structure']} not found, ignoring {molecule['name']}")
+                return
+            molecule['atoms'] = [atom.symbol for atom in read_xyz(molecule['structure'])]
+        molecule.setdefault('structure', None)
+        if all(key in molecule for key in ('name', 'charge', 'multiplicity', 'atoms')):
+            molecules.append(molecule)
+
+    with open(path, 'r') as f:
+        for line in f:
+            # GET RID OF EXTRA SPACES AND ANYTHING AFTER A HASH
+            line = line.strip()
+            line = line.split('#')[0]
+            # SPLIT INTO DESCRIPTOR AND VALUE
+            line = line.split('=')
+            # FIND IF ONE OF THE DESCRIPTORS AND ASSIGN VALUE
+            # A NEW NAME STARTS THE NEXT MOLECULE
+            if 'name' in line[0]:
+                add(molecule)
+                molecule = {'name': line[1]}
+            elif 'charge' in line[0]:
+                molecule['charge'] = int(line[1])
+            elif 'multiplicity' in line[0]:
+                molecule['multiplicity'] = int(line[1])
+            elif 'atoms' in line[0]:
+                molecule['atoms'] = [atom.strip() for atom in line[1].split(',')]
+            elif 'structure' in line[0]:
+                structure = os.path.expanduser(line[1].strip())
+                molecule['structure'] = os.path.join(os.path.dirname(path), structure)
+    add(molecule)
+    return molecules
+
+
+class FragmentDB:
+    """
+    Database of known fragments, compiled into a dictionary indexed by
+    composition so that identifying a fragment is a single lookup.
+
+    The database is built from a list of tables, each a dictionary of
+    {'name': [atomic symbols]} along with the type, charge and multiplicity
+    of every molecule in that table, and from the molecules added by the user
+    in ~/.config/autochem/molecules.txt. User molecules are also added to
+    the table with the matching charge and multiplicity.
+
+    Molecules in the user file can also give the structure of the molecule
+    as an xyz file. A Weisfeiler-Lehman hash of the bonding in the structure
+    is stored with the molecule, so that fragments with the same atoms but
+    different bonding (isomers) can be told apart by passing the hash of the
+    fragment to ``lookup``.
+
+    The user file is read once per process, and again only if it has been
+    modified since. Call ``reload()`` after changing the tables directly.
+
+    Usage:
+        >>> db = FragmentDB([('neutral', 0, 1, {'water': ['O', 'H', 'H']})])
+        >>> db.refresh()
+        >>> db.lookup(['H', 'O', 'H'])['name']
+        'water'
+    """
+
+    def __init__(self, tables, path=USER_FILE):
+        self.tables = tables
+        self.path = path
+        self.index = {}
+        self.version = None
+        self.structures = {}
+        self.mtime = None
+        self.loaded = False
+        # tables as defined in the source, before any user additions
+        self._builtin = [dict(table) for *_, table in tables]
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {len(self.index)} compositions from {self.path}'
+
+    __str__ = __repr__
+
+    def _user_mtime(self):
+        """Creates the template user file if needed, returning its mtime"""
+        if not os.path.isfile(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, 'w+') as f:
+                f.writelines(TEMPLATE)
+        return os.stat(self.path).st_mtime_ns
+
+    def refresh(self):
+        """
+        Compiles the database if it hasn't been yet, or if the user file has
+        changed since it was last read. Returns True if the database was
+        recompiled.
+        """
+        mtime = self._user_mtime()
+        if self.loaded and mtime == self.mtime:
+            return False
+        self.mtime = mtime
+        self.reload()
+        return True
+
+    def reload(self):
+        """Re-reads the user file and compiles the database again"""
+        by_charge_mult = {
+            (charge, mult): table for _, charge, mult, table in self.tables
+        }
+        for builtin, (*_, table) in zip(self._builtin, self.tables):
+            table.clear()
+            table.update(builtin)
+        self.structures = {}
+        if os.path.isfile(self.path):
+            for molecule in read_user_molecules(self.path):
+                key = (molecule['charge'], molecule['multiplicity'])
+                if key in by_charge_mult:
+                    by_charge_mult[key][molecule['name']] = molecule['atoms']
+                    if molecule['structure'] is not None:
+                        self.structures[key + (molecule['name'],)] = molecule['structure']
+        self.compile()
+        self.loaded = True
+
+    def compile(self):
+        """
+        Builds the composition index from the tables. Where more than one
+        molecule shares a composition, the last one in the tables is returned
+        by ``lookup``, and ``rank`` gives the position of the first, so that
+        fragments can be ordered as if the tables were searched in turn.
+        Molecules with a structure are also indexed by the hash of their
+        bonding, computed once here. ``version`` is set to a hash of the whole
+        index, so that results that depend on the database can be cached.
+        """
+        self.index = {}
+        rank = 0
+        for mol_type, charge, mult, table in self.tables:
+            for name, atoms in table.items():
+                key = composition(atoms)
+                if key not in self.index:
+                    self.index[key] = {
+                        'rank': rank,
+                        'last': None,
+                        'default': None,
+                        'by_hash': {}
+                    }
+                found = self.index[key]
+                entry = {
+                    'type': mol_type,
+                    'name': name,
+                    'charge': charge,
+                    'multiplicity': mult,
+                    'rank': found['rank'],
+                    'graph_hash': None
+                }
+                structure = self.structures.get((charge, mult, name))
+                if structure is not None:
+                    try:
+                        entry['graph_hash'] = structure_hash(structure)
+                    except (OSError, IndexError, ValueError, KeyError):
+                        print(f"Warning: could not read the structure of {name} from {structure}")
+                found['last'] = entry
+                if entry['graph_hash'] is None:
+                    found['default'] = entry
+                else:
+                    found['by_hash'][entry['graph_hash']] = entry
+                rank += 1
+        # changes whenever any entry of the database does
+        self.version = digest(repr(self.index))
+
+    def lookup(self, symbols, graph_hash=None):
+        """
+        Returns the database entry for a fragment with the given atomic
+        symbols, in any order, or None if the fragment is not known. Entries
+        are dictionaries with the keys type, name, charge, multiplicity, rank
+        and graph_hash.
+
+        If molecules with this composition have structures, and graph_hash is
+        given, the molecule with the same bonding is returned. graph_hash can
+        also be a function returning the hash, which is then only called when
+        the hash is needed. Fragments that match none of the structures fall
+        back to molecules with this composition that have no structure.
+        """
+        if not self.loaded:
+            self.refresh()
+        found = self.index.get(composition(symbols))
+        if found is None:
+            return None
+        if graph_hash is None:
+            return found['last']
+        if found['by_hash']:
+            if callable(graph_hash):
+                graph_hash = graph_hash()
+            if graph_hash in found['by_hash']:
+                return found['by_hash'][graph_hash]
+        return found['default']
@@ -0,0 +1,193 @@
+import hashlib
+import numpy as np
+
+__all__ = ['Graph']
+
+
+def digest(text):
+    """Short hash of a string that is the same in every process"""
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+
+class Graph:
+    """
+    Undirected connectivity between atoms, stored in compressed sparse row
+    (CSR) form. The neighbours of node n are
+    ``indices[indptr[n]:indptr[n + 1]]``, in ascending order. Nodes are rows of
+    a |Molecule|'s arrays, so node n is ``mol.coords[n]``.
+
+    Usage:
+        >>> graph = Graph(len(mol.coords), *mol.bonded_pairs())
+        >>> graph.neighbours(0)
+        >>> labels = graph.components()
+
+    Instances of this class have the following attributes:
+
+    * ``indptr`` -- offsets of each node's neighbours, length num_nodes + 1
+    * ``indices`` -- neighbours of every node, one after another
+    """
+
+    def __init__(self, num_nodes, i=(), j=()):
+        i = np.asarray(i, dtype=int)
+        j = np.asarray(j, dtype=int)
+        # store both directions, drop self loops and repeats
+        rows = np.concatenate((i, j))
+        cols = np.concatenate((j, i))
+        keep = rows != cols
+        rows, cols = rows[keep], cols[keep]
+        pairs = np.unique(rows * num_nodes + cols)
+        rows, cols = np.divmod(pairs, num_nodes) if num_nodes else (pairs, pairs)
+        self.indices = cols
+        self.indptr = np.searchsorted(rows, np.arange(num_nodes + 1))
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {len(self)} nodes, {len(self.indices) // 2} edges'
+
+    __str__ = __repr__
+
+    def neighbours(self, node):
+        """Returns the nodes connected to a node"""
+        return self.indices[self.indptr[node]:self.indptr[node + 1]]
+
+    def degrees(self):
+        """Returns the number of neighbours of every node"""
+        return np.diff(self.indptr)
+
+    def edges(self):
+        """Returns arrays i, j of every edge, with i < j"""
+        rows = np.repeat(np.arange(len(self)), self.degrees())
+        upper = rows < self.indices
+        return rows[upper], self.indices[upper]
+
+    def subgraph(self, nodes):
+        """
+        Returns the graph of only the given nodes, and the edges between them.
+        Node n of the new graph is nodes[n].
+        """
+        nodes = np.asarray(nodes, dtype=int)
+        new = np.full(len(self), -1)
+        new[nodes] = np.arange(len(nodes))
+        owners, neighbours = self._gather(nodes)
+        rows, cols = new[owners], new[neighbours]
+        inside = cols >= 0
+        return Graph(len(nodes), rows[inside], cols[inside])
+
+    def _gather(self, nodes):
+        """
+        Returns two arrays- a node of the given nodes, and one of its
+        neighbours- with a pair for every neighbour of every node
+        """
+        counts = self.degrees()[nodes]
+        owners = np.repeat(nodes, counts)
+        within = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        neighbours = self.indices[np.repeat(self.indptr[nodes], counts) + within]
+        return owners, neighbours
+
+    def bfs_levels(self):
+        """
+        Breadth first search from the lowest node of every component at once.
+        Returns a list of (nodes, parents) arrays for each level after the
+        roots, where parents[k] is the node that nodes[k] was reached from.
+        """
+        labels = self.components()
+        _, roots = np.unique(labels, return_index=True)
+        visited = np.zeros(len(self), dtype=bool)
+        visited[roots] = True
+        levels = []
+        frontier = roots
+        while len(frontier) > 0:
+            parents, children = self._gather(frontier)
+            unseen = ~visited[children]
+            parents, children = parents[unseen], children[unseen]
+            # a node reached from two parents keeps the first
+            children, first = np.unique(children, return_index=True)
+            parents = parents[first]
+            visited[children] = True
+            if len(children) > 0:
+                levels.append((children, parents))
+            frontier = children
+        return levels
+
+    def without_edges(self, pairs):
+        """
+        Returns a new graph with the edges between each pair of nodes removed.
+        Pairs that are not connected are ignored.
+        """
+        i, j = self.edges()
+        removed = np.asarray(list(pairs), dtype=int).reshape(-1, 2)
+        removed = np.sort(removed, axis=1)
+        keys = i * len(self) + j
+        keep = ~np.isin(keys, removed[:, 0] * len(self) + removed[:, 1])
+        return Graph(len(self), i[keep], j[keep])
+
+    def components(self):
+        """
+        Returns the connected component of each node, numbered from 0 in order
+        of the lowest node in each component.
+
+        Union-find over all edges at once: the root of each edge's higher
+        component is hooked onto the lower root, then paths are compressed by
+        pointer jumping until every node points at its root. Repeats until
+        both ends of every edge share a root.
+        """
+        parent = np.arange(len(self))
+        i, j = self.edges()
+        while True:
+            root_i, root_j = parent[i], parent[j]
+            differ = root_i != root_j
+            if not differ.any():
+                break
+            low = np.minimum(root_i[differ], root_j[differ])
+            high = np.maximum(root_i[differ], root_j[differ])
+            np.minimum.at(parent, high, low)
+            while True:
+                grandparent = parent[parent]
+                if (grandparent == parent).all():
+                    break
+                parent = grandparent
+        # roots are the lowest node of each component, so unique keeps order
+        _, labels = np.unique(parent, return_inverse=True)
+        return labels
+
+    def groups(self, labels=None):
+        """
+        Returns a list of arrays of the nodes in each component, in the order
+        of the component labels. Nodes in each group are in ascending order.
+        """
+        if labels is None:
+            labels = self.components()
+        if len(labels) == 0:
+            return []
+        order = np.argsort(labels, kind='stable')
+        starts = np.searchsorted(labels[order], np.arange(labels.max(initial=-1) + 1))
+        return np.split(order, starts[1:])
+
+    def wl_hash(self, labels):
+        """
+        Returns a Weisfeiler-Lehman hash of the graph, given a label for each
+        node such as its atomic symbol. Graphs that only differ in the order of
+        their nodes have the same hash, and most graphs that are connected
+        differently, like isomers, do not.
+
+        Each round, the label of every node is replaced by a digest of itself
+        and the sorted labels of its neighbours, until the labels stop
+        splitting the nodes into more groups. The hash is a digest of the
+        sorted labels from every round.
+        """
+        labels = [str(label) for label in labels]
+        rounds = [sorted(labels)]
+        groups = len(set(labels))
+        for _ in range(len(self)):
+            labels = [
+                digest(labels[node] + '(' + ','.join(sorted(
+                    labels[n] for n in self.neighbours(node).tolist())) + ')')
+                for node in range(len(self))
+            ]
+            rounds.append(sorted(labels))
+            if len(set(labels)) == groups:
+                break
+            groups = len(set(labels))
+        return digest(';'.join(','.join(labels) for labels in rounds))
@@ -0,0 +1,243 @@
+from .atom import Atom
+from .periodic_table import PeriodicTable as PT
+from .thermo import thermo_initial_geom_gamess
+from .utils import read_file
+import numpy as np
+import os
+
+__all__ = ['read_hessian', 'read_fchk', 'vibrations']
+
+BOHR_TO_ANG = 0.529177210903
+
+# frequency in cm⁻¹ of an eigenvalue of 1 hartree/(bohr² amu) of the mass
+# weighted hessian, sqrt(Eh / (a0² amu)) / (2 pi c)
+HESSIAN_TO_WAVENUMBER = 5140.487143715828
+
+
+def read_gamess_hessian(file):
+    """
+    Returns the cartesian hessian in hartree/bohr² from the $HESS group of a
+    GAMESS .dat file. Each row is written over lines of up to 5 values in
+    the format (I2,I3,5E15.8), so values can run into each other.
+    """
+    values = []
+    found = False
+    for line in read_file(file):
+        if line.startswith(' $HESS'):
+            found = True
+            values = []
+            continue
+        if not found or line.startswith('ENERGY IS'):
+            continue
+        if line.startswith(' $END'):
+            found = False
+            continue
+        line = line.rstrip('\n')
+        values += [float(line[i:i + 15]) for i in range(5, len(line), 15) if line[i:i + 15].strip()]
+    size = int(round(np.sqrt(len(values))))
+    if size == 0 or size**2 != len(values):
+        raise ValueError(f'No hessian found in {file}')
+    return np.array(values).reshape(size, size)
+
+
+def read_fchk(file):
+    """
+    Returns the sections of a Gaussian formatted checkpoint file as a
+    dictionary of {name: value}, where arrays are numpy arrays
+
+    >>> read_fchk('water.fchk')['Cartesian Force Constants']
+    """
+    sections = {}
+    name = None
+    kind = None
+    size = 0
+    values = []
+    for number, line in enumerate(read_file(file)):
+        # the title and the job type, method and basis come first
+        if number < 2:
+            continue
+        if name is not None:
+            values += line.split()
+            if len(values) >= size:
+                dtype = int if kind == 'I' else float if kind == 'R' else str
+                sections[name] = np.array(values[:size], dtype=dtype) if dtype is not str else ''.join(values)
+                name = None
+            continue
+        # name in columns 1-40, type in column 44, and N= for arrays
+        if len(line) < 45 or line[43] not in 'IRCL':
+            continue
+        key, kind, rest = line[:40].strip(), line[43], line[44:].split()
+        if rest and rest[0] == 'N=':
+            name, size, values = key, int(rest[1]), []
+            if size == 0:
+                sections[name] = np.zeros(0)
+                name = None
+        elif rest:
+            sections[key] = int(rest[0]) if kind == 'I' else float(rest[0]) if kind == 'R' else rest[0]
+    return sections
+
+
+def lower_triangle_to_square(values):
+    """Returns the symmetric matrix stored as its lower triangle, row by row"""
+    size = int(round((np.sqrt(8 * len(values) + 1) - 1) / 2))
+    matrix = np.zeros((size, size))
+    matrix[np.tril_indices(size)] = values
+    return matrix + np.tril(matrix, -1).T
+
+
+def read_gaussian_hessian(file):
+    """
+    Returns the cartesian hessian in hartree/bohr², the atoms as a list of
+    |Atom| and the atomic masses from a Gaussian .fchk file
+    """
+    fchk = read_fchk(file)
+    if 'Cartesian Force Constants' not in fchk:
+        raise ValueError(f'No hessian found in {file}')
+    hessian = lower_triangle_to_square(fchk['Cartesian Force Constants'])
+    coords = fchk['Current cartesian coordinates'].reshape(-1, 3) * BOHR_TO_ANG
+    atoms = [
+        Atom(atnum=int(atnum), coords=xyz)
+        for atnum, xyz in zip(fchk['Atomic numbers'], coords)
+    ]
+    masses = fchk.get('Real atomic weights')
+    return hessian, atoms, masses
+
+
+def read_orca_hessian(file):
+    """
+    Returns the cartesian hessian in hartree/bohr², the atoms as a list of
+    |Atom| and the atomic masses from an ORCA .hess file. The hessian is
+    written in blocks of columns, each under a line of the column numbers.
+    """
+    hessian = None
+    atoms = []
+    masses = []
+    section = None
+    size = None
+    columns = None
+    for line in read_file(file):
+        parts = line.split()
+        if line.startswith('$'):
+            section = parts[0]
+            size = None
+            continue
+        if not parts:
+            continue
+        if section == '$hessian':
+            if size is None:
+                size = int(parts[0])
+                hessian = np.zeros((size, size))
+            elif all('.' not in part for part in parts):
+                columns = [int(part) for part in parts]
+            else:
+                hessian[int(parts[0]), columns] = [float(v) for v in parts[1:]]
+        elif section == '$atoms':
+            if size is None:
+                size = int(parts[0])
+            else:
+                symbol, mass, *xyz = parts
+                atoms.append(Atom(symbol=symbol, coords=[float(v) * BOHR_TO_ANG for v in xyz]))
+                masses.append(float(mass))
+    if hessian is None:
+        raise ValueError(f'No hessian found in {file}')
+    return hessian, atoms, np.array(masses) if masses else None
+
+
+def read_hessian(file):
+    """
+    Returns the cartesian hessian in hartree/bohr², the atoms as a list of
+    |Atom| and the atomic masses (or None, if the file doesn't have them)
+    of a GAMESS .dat file, Gaussian .fchk file or ORCA .hess file. The
+    geometry of a GAMESS hessian is read from the .log of the same name.
+
+    >>> hessian, atoms, masses = read_hessian('water.fchk')
+    >>> freqs, modes = vibrations(hessian, atoms, masses)
+    """
+    if file.endswith('.fchk'):
+        return read_gaussian_hessian(file)
+    if file.endswith('.hess'):
+        return read_orca_hessian(file)
+    if file.endswith('.dat'):
+        log = file[:-len('.dat')] + '.log'
+        if not os.path.isfile(log):
+            raise ValueError(f'Need {log} for the geometry of {file}')
+        return read_gamess_hessian(file), thermo_initial_geom_gamess(log), None
+    raise ValueError(f'{file} is not a GAMESS .dat, Gaussian .fchk or ORCA .hess file')
+
+
+def rigid_motions(coords, masses):
+    """
+    Returns the mass weighted translations and rotations of atoms at
+    `coords`, as columns of an array of shape (..., 3N, 6). `masses` can have
+    leading dimensions for several sets of masses.
+    """
+    sqrt_m = np.sqrt(masses)[..., :, None, None]
+    centre = np.einsum('...i,ij->...j', masses, coords) / masses.sum(axis=-1)[..., None]
+    r = coords - centre[..., None, :]
+    eye = np.eye(3)
+    translations = np.broadcast_to(eye, r.shape + (3, ))
+    # rotation about axis k moves each atom by e_k x r
+    rotations = np.cross(eye[:, None, :], r[..., None, :, :], axis=-1).swapaxes(-3, -2)
+    motions = sqrt_m * np.concatenate([translations, rotations.swapaxes(-1, -2)], axis=-1)
+    return motions.reshape(motions.shape[:-3] + (-1, 6))
+
+
+def vibrations(hessian, atoms, masses=None, project=True, partial=None):
+    """
+    Returns the vibrational frequencies in cm⁻¹ (imaginary ones as negative
+    numbers), lowest first, and the normal modes as normalised cartesian
+    displacements of shape (modes, atoms, 3), from a cartesian hessian in
+    hartree/bohr² of a list of |Atom|.
+
+    The hessian is mass weighted and, with `project`, translations and
+    rotations are projected out before it is diagonalised, so that linear
+    molecules have 3N - 5 vibrations and noise in the hessian doesn't mix
+    into the low modes, rather than dropping the lowest six.
+
+    `masses` are in amu, the average atomic masses of |PeriodicTable| by
+    default. Isotopologues are found by changing them, and several at once
+    by passing an array of shape (isotopologues, atoms), which adds that
+    dimension to the front of the results.
+
+    `partial` is the indices of atoms (counting from 0) to find the
+    vibrations of with the rest held fixed, a partial hessian vibrational
+    analysis. Translations and rotations aren't projected out then, as the
+    fixed atoms hold the rest in place; modes are of the atoms in `partial`.
+
+    >>> freqs, modes = vibrations(hessian, atoms)
+    >>> heavy = [2.014 if atom.symbol == 'H' else atom.mass for atom in atoms]
+    >>> freqs, modes = vibrations(hessian, atoms, [[atom.mass for atom in atoms], heavy])
+    """
+    hessian = np.asarray(hessian, dtype=float)
+    coords = np.array([atom.coords for atom in atoms], dtype=float)
+    if masses is None:
+        masses = PT.masses[[atom.atnum for atom in atoms]]
+    masses = np.asarray(masses, dtype=float)
+    if hessian.shape != (3 * len(atoms), 3 * len(atoms)):
+        raise ValueError(f'Hessian of shape {hessian.shape} does not match {len(atoms)} atoms')
+    if partial is not None:
+        partial = np.asarray(partial, dtype=int)
+        block = (3 * partial[:, None] + np.arange(3)).ravel()
+        hessian = hessian[np.ix_(block, block)]
+        coords = coords[partial]
+        masses = masses[..., partial]
+        project = False
+
+    hessian = (hessian + hessian.T) / 2
+    weights = np.repeat(1 / np.sqrt(masses), 3, axis=-1)
+    weighted = hessian * weights[..., :, None] * weights[..., None, :]
+    if project:
+        # orthonormal basis of the motions that aren't translations or
+        # rotations, from the singular vectors beyond the rank of those
+        u, s, _ = np.linalg.svd(rigid_motions(coords, masses))
+        rank = int((s > 1e-6 * s[..., :1]).sum(axis=-1).max())
+        basis = u[..., rank:]
+        values, vectors = np.linalg.eigh(basis.swapaxes(-1, -2) @ weighted @ basis)
+        vectors = basis @ vectors
+    else:
+        values, vectors = np.linalg.eigh(weighted)
+    freqs = np.sign(values) * np.sqrt(np.abs(values)) * HESSIAN_TO_WAVENUMBER
+    # mass weighted eigenvectors to cartesian displacements
+    modes = (vectors * weights[..., :, None]).swapaxes(-1, -2)
+    modes /= np.linalg.norm(modes, axis=-1, keepdims=True)
+    return freqs, modes.reshape(modes.shape[:-1] + (-1, 3))
@@ -30,18 +30,21 @@ molecular dynamics. This class also creates job files in the same directory as t
         frags_in_subdir=False,
         user_settings=None,
         bonds_to_split=None,
+        cell=None,
         **kwargs,
     ):
         # allows for fmo=True, even if nothing done with the arguments
-        # pass on grouping/splitting to the base Molecule class
+        # pass on grouping/splitting/periodic cell to the base Molecule class
         if using is not None:
             self.molecule_name = using
+            if cell is None and user_settings is not None and "cell" in user_settings.keys():
+                cell = user_settings.cell
             if user_settings is not None and "grouped" in user_settings.keys():
                 self.mol = Molecule(
-                    using, group=user_settings.grouped, bonds_to_split=bonds_to_split
+                    using, group=user_settings.grouped, bonds_to_split=bonds_to_split, cell=cell
                 )
             else:
-                self.mol = Molecule(using, bonds_to_split=bonds_to_split)
+                self.mol = Molecule(using, bonds_to_split=bonds_to_split, cell=cell)
 
     def __repr__(self):
         return f"{self.__class__.__name__}: {self.mol.xyz}"
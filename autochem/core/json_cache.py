@@ -0,0 +1,82 @@
+import json
+import os
+from .utils import write_json
+
+__all__ = ['JSONCache']
+
+
+class JSONCache:
+    """
+    Base class of the on-disk caches that keep one small json record per
+    key in a directory, such as |FragmentCache| and |SectionIndex|. Records
+    are written then renamed, so other processes never read half of one.
+    The caches are only an optimisation, so records that can't be written
+    are skipped, and records that can't be read miss the cache.
+
+    Subclasses name the file of each key in ``name``, and check that a
+    record read back still holds in ``valid``.
+
+    Instances of this class have the following attributes:
+
+    * ``directory`` -- where records are kept
+    * ``enabled`` -- set to False to always work from scratch
+    * ``hits``, ``misses`` -- number of lookups found and not found
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.directory}, {self.hits} hits, {self.misses} misses'
+
+    __str__ = __repr__
+
+    def name(self, key):
+        """Name of the file of the record of a key, without .json"""
+        return key
+
+    def valid(self, key, record):
+        """
+        True if a record read back for a key can be used. Records missing
+        anything it looks for, raising KeyError or TypeError, are not.
+        """
+        return True
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{self.name(key)}.json')
+
+    def load(self, key):
+        """Returns the record stored under a key, or None"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self.path(key), 'r') as f:
+                record = json.load(f)
+            valid = self.valid(key, record)
+        except (OSError, ValueError, KeyError, TypeError):
+            valid = False
+        if not valid:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return record
+
+    def save(self, key, record):
+        """Stores a record under a key, replacing any stored before"""
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            write_json(record, self.path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Removes every record from the cache"""
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
@@ -0,0 +1,164 @@
+import json
+import os
+import time
+
+__all__ = ['TreeManifest']
+
+
+# kept in a directory of its own, so that writing the manifest doesn't
+# change the modification time of the root
+MANIFEST_DIR = '.autochem'
+MANIFEST_FILE = 'manifest.json'
+
+# bump if the layout of the manifest changes
+MANIFEST_FORMAT = 1
+
+# directories modified this recently may change again within the same mtime,
+# so their listing is not trusted the next time
+RACY_SECONDS = 2
+
+
+class TreeManifest:
+    """
+    Listing of a tree of calculations, kept in a manifest file at the root of
+    the tree, so that searching the tree again only lists directories that
+    have changed. On parallel filesystems listing and stat-ing every file is
+    much slower than reading one file.
+
+    The manifest stores, for each directory below the root, its modification
+    time along with the size and modification time of each file and the names
+    of its subdirectories. Adding, removing or renaming anything in a
+    directory changes its modification time, so a directory is only listed
+    again if its own modification time differs from the manifest. One stat
+    per directory replaces a listing and a stat per file.
+
+    Files that are rewritten in place don't change their directory, so sizes
+    and modification times of files are only as recent as the last listing of
+    their directory. Anything that needs them exactly, like |ResultStore|,
+    should stat the file itself.
+
+    Symlinked directories are not followed, as in ``os.walk``.
+
+    Usage:
+        >>> manifest = TreeManifest('calcs')
+        >>> files, dirs = manifest.listdir('calcs/c1mim')
+        >>> manifest.save()
+
+    Instances of this class have the following attributes:
+
+    * ``root`` -- the top of the tree
+    * ``path`` -- the manifest file, .autochem/manifest.json in ``root``
+    * ``enabled`` -- set to False to list every directory from scratch
+    * ``hits``, ``misses`` -- number of directories found unchanged and listed
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.path = os.path.join(root, MANIFEST_DIR, MANIFEST_FILE)
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._dirs = None
+        self._changed = False
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.path}, {self.hits} hits, {self.misses} misses'
+
+    __str__ = __repr__
+
+    @property
+    def dirs(self):
+        """{directory relative to root: record}, read from the manifest file when first needed"""
+        if self._dirs is None:
+            self._dirs = {}
+            if self.enabled:
+                try:
+                    with open(self.path, 'r') as f:
+                        manifest = json.load(f)
+                    if manifest.get('format') == MANIFEST_FORMAT:
+                        self._dirs = manifest['dirs']
+                except (OSError, ValueError, KeyError, AttributeError):
+                    pass
+        return self._dirs
+
+    def _key(self, directory):
+        return os.path.relpath(directory, self.root).replace(os.sep, '/')
+
+    def _forget(self, key):
+        """Drops the records of a directory that no longer exists, and everything below it"""
+        below = key + '/'
+        for k in [k for k in self.dirs if k == key or k.startswith(below)]:
+            del self.dirs[k]
+            self._changed = True
+
+    def _list(self, directory, key):
+        """Lists a directory, returning a record for the manifest"""
+        files = {}
+        dirs = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir():
+                    if not (entry.is_symlink() or
+                            (key == '.' and entry.name == MANIFEST_DIR)):
+                        dirs.append(entry.name)
+                else:
+                    try:
+                        st = entry.stat()
+                        files[entry.name] = [st.st_size, st.st_mtime_ns]
+                    except OSError:
+                        # broken symlinks are still listed, as by os.listdir
+                        files[entry.name] = [None, None]
+        return {'files': files, 'dirs': sorted(dirs)}
+
+    def listdir(self, directory):
+        """
+        Returns the files in a directory below the root, as {name: [size,
+        mtime_ns]}, and a sorted list of its subdirectories. Raises OSError if
+        the directory can't be read.
+        """
+        key = self._key(directory)
+        mtime = os.stat(directory).st_mtime_ns
+        record = self.dirs.get(key) if self.enabled else None
+        if record is not None and record['mtime_ns'] == mtime:
+            self.hits += 1
+            return record['files'], record['dirs']
+        self.misses += 1
+        try:
+            new = self._list(directory, key)
+        except OSError:
+            self._forget(key)
+            raise
+        if record is not None:
+            for name in set(record['dirs']) - set(new['dirs']):
+                self._forget(f'{key}/{name}' if key != '.' else name)
+        # only trusted next time if the directory can't change again within
+        # the same modification time
+        recent = time.time() - mtime / 1e9 < RACY_SECONDS
+        new['mtime_ns'] = None if recent else mtime
+        self.dirs[key] = new
+        self._changed = True
+        return new['files'], new['dirs']
+
+    def save(self):
+        """
+        Writes the manifest if anything has changed. The manifest is only an
+        optimisation, so one that can't be written, such as in a read-only
+        tree, is skipped.
+        """
+        # imported here, as utils imports this module
+        from .utils import write_json
+        if not (self.enabled and self._changed):
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            write_json({'format': MANIFEST_FORMAT, 'dirs': self.dirs}, self.path)
+            self._changed = False
+        except OSError:
+            pass
+
+    def clear(self):
+        """Removes the manifest file"""
+        self._dirs = {}
+        self._changed = False
+        if os.path.isfile(self.path):
+            os.remove(self.path)
@@ -1,5 +1,9 @@
 from .periodic_table import PeriodicTable as PT
-from .atom import Atom
+from .atom import Atom, AtomStore
+from .fragment_cache import FragmentCache
+from .fragment_db import FragmentDB, TEMPLATE
+from .graph import Graph
+from .neighbours import NeighbourList, bonded_pairs, cell_matrix, minimum_image
 from .utils import sort_elements
 
 import re
@@ -36,13 +40,32 @@ class Molecule:
         format of {'name': [atomic symbols]} for positively charged radicals
     Dication_radicals: dict
         format of {'name': [atomic symbols]} for doubly charged radicals
+    fragment_db: FragmentDB
+        all of the above, plus molecules from ~/.config/autochem/molecules.txt,
+        indexed by composition for `self.check_db()`
+    fragment_cache: FragmentCache
+        fragments found by `self.separate()`, kept on disk so that the same
+        system is only separated once
 
     Instance Attributes
     -------------------
     xyz: string
         name of xyz file used to create the molecule
     coords: list 
-        list of `Atom` objects for every atom in the molecule
+        list of `Atom` objects for every atom in the molecule. Each atom is a
+        view onto one row of the arrays below
+    positions, atnums, masses, mol_ids, indices: numpy arrays
+        per-atom data for the whole system, stored contiguously. `mol_ids`
+        is -1 for atoms not yet assigned to a fragment
+    cell: numpy array
+        lattice vectors of a periodic cell as the rows of a 3x3 array, or None
+        for a cluster. Read from a Lattice="..." comment line (extended xyz)
+        or given as the `cell` argument, as 3 lengths, 3 lengths and 3 angles,
+        or 3 vectors. Molecules that cross the edge of the cell are made whole
+        when the |Molecule| is created
+    graph: Graph
+        bonded connectivity between rows, created when `self.split()` or
+        `self.assign_neighbours()` is called
     fragments: dict
         format of {number: subdict} created when `self.separate()` is called.
         The subdict contains the keys: type (string), name (string),
@@ -230,12 +253,28 @@ class Molecule:
         **Dication_radicals
     }
 
+    # tables above, plus user additions, indexed by composition
+    fragment_db = FragmentDB([
+        ('cation', 1, 1, Cations),
+        ('anion', -1, 1, Anions),
+        ('neutral', 0, 1, Neutrals),
+        ('radical', 0, 2, Radicals),
+        ('anion-radical', -1, 2, Anion_radicals),
+        ('cation-radical', 1, 2, Cation_radicals),
+        ('dication', 2, 1, Dications),
+        ('dication-radical', 2, 2, Dication_radicals),
+    ])
+
+    fragment_cache = FragmentCache()
+
     def __init__(self,
                  using=None,
                  atoms=None,
                  group=None,
-                 bonds_to_split=None):
+                 bonds_to_split=None,
+                 cell=None):
         self.check_user_additions()
+        self.cell = None
         if using is not None:
             self.xyz = using
             self.coords = self.read_xyz(self.xyz)
@@ -243,13 +282,14 @@ class Molecule:
             if len(atoms) == 0:
                 sys.exit('Error: atoms argument passed into Molecule is empty')
             if not isinstance(atoms[0], Atom):
-                self.coords = []
-                for atom in atoms:
-                    sym, *coords = atom
-                    a = Atom(symbol=sym, coords=coords)
-                    self.coords.append(a)
+                symbols = [atom[0] for atom in atoms]
+                positions = [atom[1:4] for atom in atoms]
+                self.coords = Molecule.atoms_from_arrays(symbols, positions)
             else:
-                self.coords = atoms
+                # copies, so that the atoms passed in stay views of their
+                # own molecule
+                self.coords = Molecule.copy_atoms(atoms)
+        self._init_store(self.coords)
 
         self.frags_grouped_if_desired = False
         if group is not None:
@@ -260,8 +300,12 @@ class Molecule:
             self.bonds_to_split = bonds_to_split
             self.split_on_bonds = True
 
-        for index, atom in enumerate(self.coords):
-            atom.index = index + 1
+        self.indices[:] = np.arange(1, len(self.coords) + 1)
+
+        if cell is not None:
+            self.cell = cell_matrix(cell)
+        if self.cell is not None:
+            self.unwrap()
 
         if hasattr(self, 'coords'):
             # self.complex used in input files
@@ -300,20 +344,95 @@ class Molecule:
     def __iter__(self):
         return iter(self.coords)
 
+    def _init_store(self, atoms):
+        """
+        Gathers the data of every atom into one |AtomStore|. Atoms read from
+        an xyz file or made by `copy_atoms` already share a store of the
+        right size, which is used as is. Otherwise the atoms are copied into
+        a new store, leaving the atoms given untouched.
+        """
+        store = atoms[0]._store if len(atoms) > 0 else AtomStore(0)
+        if len(store) != len(atoms) or not all(
+                atom._store is store and atom._row == row
+                for row, atom in enumerate(atoms)):
+            self.coords = Molecule.copy_atoms(atoms)
+            store = self.coords[0]._store
+        self._store = store
+
+    @staticmethod
+    def atoms_from_arrays(symbols, positions):
+        """
+        Returns a list of |Atom| objects sharing one |AtomStore|, built from
+        a list of symbols and an (N, 3) sequence of coordinates
+        """
+        store = AtomStore(len(symbols))
+        store.positions[:] = np.array(positions, dtype=float).reshape(-1, 3)
+        store.set_atnums([PT.atnums[sym.capitalize()] for sym in symbols])
+        return [Atom.view(store, row) for row in range(len(symbols))]
+
+    @staticmethod
+    def copy_atoms(atoms):
+        """
+        Returns copies of a list of |Atom| objects sharing one new
+        |AtomStore|, with the same symbols, coordinates, molecule numbers and
+        fragments. The atoms copied stay views of their own store.
+        """
+        copies = Molecule.atoms_from_arrays([atom.symbol for atom in atoms],
+                                            [atom.coords for atom in atoms])
+        for copy, atom in zip(copies, atoms):
+            copy.mol = atom.mol
+            copy.fragment = atom.fragment
+        return copies
+
+    @property
+    def positions(self):
+        """(N, 3) array of coordinates in angstroms"""
+        return self._store.positions
+
+    @property
+    def atnums(self):
+        """Array of atomic numbers"""
+        return self._store.atnums
+
+    @property
+    def masses(self):
+        """Array of atomic masses in g mol⁻¹"""
+        return self._store.masses
+
+    @property
+    def mol_ids(self):
+        """Array of fragment numbers, -1 if an atom is unassigned"""
+        return self._store.mol_ids
+
+    @property
+    def indices(self):
+        """Array of 1-based atom indices"""
+        return self._store.indices
+
+    @property
+    def symbols(self):
+        """List of atomic symbols, in the order of self.coords"""
+        return [PT.ptable[atnum][0] for atnum in self.atnums.tolist()]
+
+    def rows(self, atoms):
+        """
+        Returns the rows of this molecule's arrays that hold the atoms passed in
+        """
+        return np.array([atom._row for atom in atoms], dtype=int)
+
     def translate(self, vector, frag=None):
         """
         Apply the vector to every atom in the system.
         Note that if fragmented, can specify which fragment to translate,
         by specifying a key of self.fragments
         """
-        for atom in self.coords:
-            atom.translate(vector)
-
-        if frag is not None:
+        vector = np.asarray(vector, dtype=float)
+        if frag is None:
+            self.positions[:] += vector
+        else:
             if not hasattr(self, 'fragments'):
                 raise AttributeError('Must run self.separate() first')
-            for atom in self.fragments[frag]:
-                atom.translate(vector)
+            self.positions[self.rows(self.fragments[frag]['atoms'])] += vector
 
     def formula(self, as_dict=False, as_latex=False, as_html=False):
         """
@@ -327,12 +446,14 @@ class Molecule:
         no formatting i.e. C8H18
         """
 
-        formula = {}
-        for atom in self.coords:
-            if atom.symbol not in formula:
-                formula[atom.symbol] = 1
-            else:
-                formula[atom.symbol] += 1
+        atnums, first, counts = np.unique(self.atnums,
+                                          return_index=True,
+                                          return_counts=True)
+        # keep the order in which elements first appear
+        formula = {
+            PT.ptable[atnums[i]][0]: int(counts[i])
+            for i in np.argsort(first)
+        }
         if as_dict:
             return formula
         if as_latex:
@@ -356,11 +477,7 @@ class Molecule:
         """
         Returns molecular mass in g mol⁻¹
         """
-        formula = self.formula(as_dict=True)
-        mass = 0
-        for element, number in formula.items():
-            element = Atom(element)  # PT.x requires Atom objects
-            mass += PT.get_mass(element) * number
+        mass = self.masses.sum()
         return f"{mass:.2f} g mol⁻¹"
 
     def calc_overall_charge_and_mult(self):
@@ -377,101 +494,72 @@ class Molecule:
     def read_xyz(self, using):
         """
         Reads coordinates of an xyz file and return a list of |Atom| objects,
-        one for each atom
+        one for each atom. A periodic cell in the comment line, as
+        Lattice="ax ay az bx by bz cx cy cz", is stored in self.cell
         """
-        coords = []
+        symbols = []
+        positions = []
         with open(using, "r") as f:
-            for coord in f.readlines()[2:]:
+            lines = f.readlines()
+            lattice = re.search(r'Lattice="([^"]+)"', lines[1]) if len(lines) > 1 else None
+            if lattice is not None:
+                self.cell = cell_matrix(np.array(lattice.group(1).split(), dtype=float).reshape(3, 3))
+            for coord in lines[2:]:
                 line = coord.split()
-                for val in PT.ptable.values():
-                    if line[0] == val[0]:
-                        coords.append(
-                            Atom(line[0],
-                                 coords=tuple(float(i) for i in line[1:4])))
-        return coords
+                if len(line) > 0 and line[0] in PT.atnums:
+                    symbols.append(line[0])
+                    positions.append(line[1:4])
+        return Molecule.atoms_from_arrays(symbols, positions)
 
     def write_xyz(self, atoms, filename=None):
         """
-        Writes an xyz file using a list of |Atom| instances
+        Writes an xyz file using a list of |Atom| instances. Coordinates are
+        taken straight from the arrays backing the atoms.
         """
         if filename is None:
             raise ValueError('write_xyz: Must give a path to the output file')
         else:
+            store = atoms[0]._store if len(atoms) > 0 else None
+            if all(atom._store is store for atom in atoms):
+                rows = [atom._row for atom in atoms]
+                positions = store.positions[rows].tolist()
+                symbols = [PT.ptable[i][0] for i in store.atnums[rows].tolist()]
+            else:
+                positions = [atom.coords.tolist() for atom in atoms]
+                symbols = [atom.symbol for atom in atoms]
             with open(filename, "w") as f:
                 f.write(str(len(atoms)) + '\n\n')
-                for atom in atoms:
-                    f.write(
-                        f"{atom.symbol:5s} {atom.x:>10.5f} {atom.y:>10.5f} {atom.z:>10.5f} \n"
-                    )
+                f.write(''.join(
+                    f"{sym:5s} {x:>10.5f} {y:>10.5f} {z:>10.5f} \n"
+                    for sym, (x, y, z) in zip(symbols, positions)))
 
     def check_db(self):
         """
-        Checks fragments for a match in the database
+        Checks fragments for a match in the database. Each fragment is looked
+        up by composition in the compiled |FragmentDB|, then by the hash of its
+        bonding if the database has structures for that composition.
+        Fragments are ordered by their first matching entry in the database.
         """
-
-        symbols = {}
-        for frag, atoms in self.mol_dict.items():
-            symbols[frag] = [atom.symbol for atom in atoms]
-
-        def check_dict(molecules_dict, symbols_dict, db):
-            """
-            Checking molecule database for a match, and returning the required attributes- 
-            name, atoms in molecule, type of molecule, charge, multiplicity, 
-            and elements present in the molecule"""
-            if db == Molecule.Anions:
-                charge = -1
-                mult = 1
-                mol_type = 'anion'
-            elif db == Molecule.Cations:
-                charge = 1
-                mult = 1
-                mol_type = 'cation'
-            elif db == Molecule.Neutrals:
-                charge = 0
-                mult = 1
-                mol_type = 'neutral'
-            elif db == Molecule.Radicals:
-                charge = 0
-                mult = 2
-                mol_type = 'radical'
-            elif db == Molecule.Dications:
-                charge = 2
-                mult = 1
-                mol_type = 'dication'
-            elif db == Molecule.Anion_radicals:
-                charge = -1
-                mult = 2
-                mol_type = 'anion-radical'
-            elif db == Molecule.Cation_radicals:
-                charge = 1
-                mult = 2
-                mol_type = 'cation-radical'
-            elif db == Molecule.Dication_radicals:
-                charge = 2
-                mult = 2
-                mol_type = 'dication-radical'
-
-            for name, atom_list in db.items():
-                for sym, molecule in symbols_dict.items():
-                    if sorted(molecule) == sorted(atom_list):
-                        data = {
-                            "type": mol_type,
-                            "name": name,
-                            "atoms": self.mol_dict[sym],
-                            "charge": charge,
-                            "multiplicity": mult,
-                            "elements": sort_elements(self.mol_dict[sym]),
-                            "frag_type": "frag"
-                        }
-                        molecules_dict[sym] = data
-            return molecules_dict
+        matches = []
+        for position, (frag, atoms) in enumerate(self.mol_dict.items()):
+            # bonding is only hashed for isomers given a structure in the db
+            entry = Molecule.fragment_db.lookup(
+                [atom.symbol for atom in atoms],
+                graph_hash=lambda atoms=atoms: self.fragment_hash(atoms))
+            if entry is not None:
+                matches.append((entry['rank'], position, frag, entry))
 
         self.fragments = {}
-        for db in (Molecule.Cations, Molecule.Anions, Molecule.Neutrals,
-                   Molecule.Radicals, Molecule.Anion_radicals,
-                   Molecule.Cation_radicals, Molecule.Dications,
-                   Molecule.Dication_radicals):
-            self.fragments = check_dict(self.fragments, symbols, db)
+        for *_, frag, entry in sorted(matches, key=lambda match: match[:2]):
+            self.fragments[frag] = {
+                "type": entry['type'],
+                "name": entry['name'],
+                "atoms": self.mol_dict[frag],
+                "charge": entry['charge'],
+                "multiplicity": entry['multiplicity'],
+                "elements": sort_elements(self.mol_dict[frag]),
+                "frag_type": "frag"
+            }
 
         #sort order of atoms
         for data in self.fragments.values():
@@ -486,18 +574,12 @@ class Molecule:
         This function takes the molecules and gives them a number from 1 to the 
         number of fragments
         """
-        current = set([atom.mol for atom in self.coords])
-        convert_keys = {k: v
-                        for k, v in enumerate(self.fragments.keys(), 1)
-                        }  # old: new
-        frags = list(self.fragments.items())
-        self.fragments.clear()
-        for k, v in frags:
-            for key, val in convert_keys.items():
-                if k == val:
-                    self.fragments[key] = v
-                    for atom in self.fragments[key]['atoms']:
-                        atom.mol = key
+        self.fragments = {
+            num: frag for num, frag in enumerate(self.fragments.values(), 1)
+        }
+        for num, frag in self.fragments.items():
+            for atom in frag['atoms']:
+                atom.mol = num
 
     def give_atoms_a_fragment_name(self):
         for num, frag in self.fragments.items():
@@ -566,8 +648,7 @@ class Molecule:
             self.mol_dict.clear()
             mols = set([atom.mol for atom in self.coords])
             for mol in mols:
-                self.mol_dict[mol] = Molecule(
-                    atoms=[atom for atom in self.coords if atom.mol == mol])
+                self.mol_dict[mol] = [atom for atom in self.coords if atom.mol == mol]
             self.check_db()
             self.print_frags()
 
@@ -592,17 +673,41 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         Checks each atom, either per fragment or in whole list, for bonded 
         atoms by considering separation and van der waals radii
         """
+        self.graph = Graph(len(self.coords), *self.bonded_pairs())
+        self.connect(self.graph)
 
-        for i, atom_i in enumerate(self.coords):
-            for j, atom_j in enumerate(self.coords):
-                if i != j:
-                    dist = atom_i.distance_to(atom_j)
-                    vdw_dist = PT.get_vdw(atom_i) + PT.get_vdw(atom_j)
-                    if dist < vdw_dist:
-                        if atom_j not in atom_i.connected_atoms:
-                            atom_i.connected_atoms.append(atom_j)
-                        if atom_i not in atom_j.connected_atoms:
-                            atom_j.connected_atoms.append(atom_i)
+    def bonded_pairs(self):
+        """
+        Returns arrays i, j of the rows of every pair of atoms closer than the
+        sum of their van der waals radii, with i < j
+        """
+        return bonded_pairs(self.positions, self.atnums, self.cell)
+
+    def unwrap(self):
+        """
+        Makes every fragment of a periodic system whole. Walking outwards
+        along bonds from the first atom of each fragment, every atom is moved
+        by whole lattice vectors to the image nearest the atom it is bonded to.
+        Does nothing if the system has no periodic cell.
+        """
+        if self.cell is None:
+            return
+        if not hasattr(self, 'graph'):
+            self.assign_neighbours()
+        positions = self.positions
+        for nodes, parents in self.graph.bfs_levels():
+            bonds = minimum_image(positions[nodes] - positions[parents], self.cell)
+            positions[nodes] = positions[parents] + bonds
+
+    def connect(self, graph):
+        """
+        Sets the connected atoms of every atom from a |Graph| of this molecule.
+        Connected atoms are kept in order of index.
+        """
+        for row, atom in enumerate(self.coords):
+            atom.connected_atoms = [
+                self.coords[n] for n in graph.neighbours(row).tolist()
+            ]
 
     def add_ionic_network(self):
         """
@@ -623,22 +728,12 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
 
             return charge, multiplicity
 
-        coord_list = [coord for coord in self.coords]
+        removed = set()
         for k, frag in self.fragments.items():
-            # remove neutrals
-            if frag['charge'] == 0:
-                for coord in frag['atoms']:
-                    # remove coord from coord_list
-                    for i, atom in enumerate(coord_list):
-                        if coord.index == atom.index:
-                            del coord_list[i]
-            # remove Li, Na, Cl, Br etc...
-            elif len(frag['atoms']) == 1:
-                for coord in frag['atoms']:
-                    # remove coord from coord_list
-                    for i, atom in enumerate(coord_list):
-                        if coord.index == atom.index:
-                            del coord_list[i]
+            # remove neutrals, and Li, Na, Cl, Br etc...
+            if frag['charge'] == 0 or len(frag['atoms']) == 1:
+                removed.update(atom.index for atom in frag['atoms'])
+        coord_list = [atom for atom in self.coords if atom.index not in removed]
         if len(coord_list) != len(self.coords) and len(coord_list) != 0:
             # split and add charges and multiplicities up
             # charge, multiplicity = ionic_mol_properties(coord_list)
@@ -743,7 +838,16 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         Separates coordinates into specific fragments using the intermolecular 
         distances along with van der waals radii. Note this function only works 
         with intermolecular fragments and cannot split molecules on bonds.
+
+        The fragments are stored in Molecule.fragment_cache, so separating the
+        same system again, with the same grouping, bonds to split and
+        fragment database, restores them instead.
         """
+        key = Molecule.fragment_cache.key(self, Molecule.fragment_db.version)
+        record = Molecule.fragment_cache.load(key)
+        if record is not None:
+            self.restore_fragments(record)
+            return
         self.split()
         self.check_db()
         self.renumber_molecules()
@@ -766,6 +870,67 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
             self.fragments = self.fragments_after_merge
         if self.split_on_bonds:
             self.fragment_on_bonds()
+        Molecule.fragment_cache.save(key, self.fragment_record())
+
+    def fragment_record(self):
+        """
+        Returns the results of `self.separate()` as a json serialisable
+        dictionary, with atoms given by their row in self.coords
+        """
+        def frag_record(frag):
+            record = {k: v for k, v in frag.items() if k not in ('atoms', 'elements')}
+            record['rows'] = self.rows(frag['atoms']).tolist()
+            record['elements'] = [list(element) for element in frag['elements']]
+            # merged fragments keep their elements in a set
+            record['elements_as_set'] = isinstance(frag['elements'], set)
+            return record
+
+        i, j = self.graph.edges()
+        record = {
+            'edges': [i.tolist(), j.tolist()],
+            'mol_ids': self.mol_ids.tolist(),
+            'mol_dict': [[k, self.rows(v).tolist()] for k, v in self.mol_dict.items()],
+            'numbers': [getattr(atom, 'number', 0) for atom in self.coords],
+            'fragment_names': [atom.fragment for atom in self.coords],
+            'fragments': [[k, frag_record(v)] for k, v in self.fragments.items()]
+        }
+        if hasattr(self, 'ionic'):
+            record['ionic'] = frag_record(self.ionic)
+        if hasattr(self, 'split_fragments'):
+            record['split_fragments'] = [[k, self.rows(v).tolist()]
+                                         for k, v in self.split_fragments.items()]
+        return record
+
+    def restore_fragments(self, record):
+        """
+        Sets fragments, connectivity and molecule numbers from a dictionary
+        made by `self.fragment_record()`
+        """
+        def frag_from_record(record):
+            frag = {k: v for k, v in record.items() if k not in ('rows', 'elements_as_set')}
+            frag['atoms'] = [self.coords[row] for row in record['rows']]
+            elements = [tuple(element) for element in record['elements']]
+            frag['elements'] = set(elements) if record['elements_as_set'] else elements
+            return frag
+
+        self.graph = Graph(len(self.coords), *record['edges'])
+        self.connect(self.graph)
+        self.mol_dict = {k: [self.coords[row] for row in rows] for k, rows in record['mol_dict']}
+        self.mol_ids[:] = record['mol_ids']
+        for atom, number, name in zip(self.coords, record['numbers'], record['fragment_names']):
+            if number:
+                atom.number = number
+            atom.fragment = name
+        self.fragments = {k: frag_from_record(v) for k, v in record['fragments']}
+        if 'ionic' in record:
+            self.ionic = frag_from_record(record['ionic'])
+        if 'split_fragments' in record:
+            self.split_fragments = {
+                k: [self.coords[row] for row in rows] for k, rows in record['split_fragments']
+            }
+        if hasattr(self, 'group_together'):
+            self.frags_grouped_if_desired = True
+            self.fragments_after_merge = self.fragments
 
     def fragment_on_bonds(self):
         """
@@ -775,64 +940,19 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         indicating which bond to break. For example, [(4,9)] indicates a bond between
         atoms 4 and 9 of the original xyz file that should be broken. 
         """
-        def remove_connection(connections, atom1, atom2):
-            if atom2 in connections[atom1]:
-                connections[atom1].remove(atom2)
-            if atom1 in connections[atom2]:
-                connections[atom2].remove(atom1)
-            return connections
-
-        connections = {
-            atom.index: [con.index for con in atom.connected_atoms]
-            for atom in self
-        }
-        # apply split
-        for bond in self.bonds_to_split:
-            a1, a2 = bond
-            connections = remove_connection(connections, a1, a2)
-
-        # convert indices back to atom objects
-        connections = {
-            k: [self.coords[i - 1] for i in v]
-            for k, v in connections.items()
-        }
-
-        # now have {original_atom: [connections_to_original_atom]}
-        # but need include original_atom in that dict
-
-        for k, v in connections.items():
-            # include as first, why not
-            v.insert(0, self.coords[k - 1])
-
-        # collect up frags after applying split
-        for index, connected_atoms in connections.items():
-            # now check rest of indices of connections
-            # for connections to any of current atoms in fragment
-            for index2, connected2 in connections.items():
-                if index != index2:
-                    if any(atom in connected2
-                           for atom in connected_atoms):  # frags are connected
-                        # add the rest of connected2 into connected_atoms and empty 'old' frag
-                        for a2 in connected2:
-                            if a2 not in connected_atoms:
-                                connected_atoms.append(a2)
-                        connections[index2] = []
-
-        connections = {
-            k: sorted(v, key=lambda atom: atom.index)
-            for k, v in connections.items() if len(v) != 0
-        }
+        if not hasattr(self, 'graph'):
+            self.assign_neighbours()
+        # apply split- bonds are given as indices, graph nodes are rows
+        graph = self.graph.without_edges(
+            (a1 - 1, a2 - 1) for a1, a2 in self.bonds_to_split)
+        labels = graph.components()
 
         # redefine molecule number for each atom, starting from 1
-        redefined = {}
-
-        for new_index, kv in enumerate(connections.items(), 1):
-            key, value = kv
-            redefined[new_index] = value
-
-        for k, v in redefined.items():
-            for atom in v:
-                atom.mol = k
+        self.mol_ids[:] = labels + 1
+        redefined = {
+            num: [self.coords[row] for row in rows.tolist()]
+            for num, rows in enumerate(graph.groups(labels), 1)
+        }
 
         self.split_fragments = redefined
 
@@ -861,32 +981,12 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
             in that order.
             If not found, returns a neutral species with no unpaired electrons.
             """
-            anions = [sorted(v) for v in Molecule.Anions]
-            cations = [sorted(v) for v in Molecule.Cations]
-            neutrals = [sorted(v) for v in Molecule.Neutrals]
-            rads = [sorted(v) for v in Molecule.Radicals]
-            dicats = [sorted(v) for v in Molecule.Dications]
-            an_rads = [sorted(v) for v in Molecule.Anion_radicals]
-            cat_rads = [sorted(v) for v in Molecule.Cation_radicals]
-            dicat_rads = [sorted(v) for v in Molecule.Dication_radicals]
-            if atoms in anions:
-                return -1, 1
-            elif atoms in cations:
-                return 1, 1
-            elif atoms in neutrals:
-                return 0, 1
-            elif atoms in rads:
-                return 0, 2
-            elif atoms in dicats:
-                return 2, 1
-            elif atoms in an_rads:
-                return -1, 2
-            elif atoms in cat_rads:
-                return 1, 2
-            elif atoms in dicat_rads:
-                return 2, 2
-            else:
+            entry = Molecule.fragment_db.lookup(
+                [atom.symbol for atom in atoms],
+                graph_hash=lambda: self.fragment_hash(atoms, graph))
+            if entry is None:
                 return 0, 1
+            return entry['charge'], entry['multiplicity']
 
         #sort order of atoms
         for data in self.fragments.values():
@@ -909,68 +1009,49 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
                 'frag_type': 'fragmented_on_bond'
             }
 
+    def fragment_hash(self, atoms, graph=None):
+        """
+        Returns the Weisfeiler-Lehman hash of the bonding between the atoms of
+        a fragment, using self.graph unless another |Graph| is given
+        """
+        if graph is None:
+            if not hasattr(self, 'graph'):
+                self.assign_neighbours()
+            graph = self.graph
+        rows = self.rows(atoms)
+        return graph.subgraph(rows).wl_hash(PT.ptable[atnum][0] for atnum in self.atnums[rows].tolist())
+
     def distance_matrix(self):
         """
         Creates an N x N matrix of interatomic distances
         between every atom in the system. N = number of 
         atoms in system.
         """
-        num_atoms = len(self.coords)
+        positions = self.positions
+        num_atoms = len(positions)
         matrix = np.zeros((num_atoms, num_atoms))
-
-        for i, atom_i in enumerate(self.coords):
-            for j, atom_j in enumerate(self.coords):
-                matrix[i, j] = atom_i.distance_to(atom_j)
+        # rows in blocks, to bound the size of the (block, N, 3) difference array
+        block = max(1, 2**22 // max(num_atoms, 1))
+        for start in range(0, num_atoms, block):
+            diff = positions[start:start + block, None, :] - positions[None, :, :]
+            matrix[start:start + block] = np.sqrt((diff**2).sum(axis=2))
         return matrix
 
     def split(self):
         """
-        Split a system into fragments using van der waals radii. Modifies
-        attributes of atoms in self.coords directly in loop, instead of creating
-        a dictionary and appending to the dictionary as we go. This
-        significantly speeds up the fragmentation.
-        """
-        mol_count = 0
-        dists = self.distance_matrix()
-        for i, atom_i in enumerate(self.coords):
-            connected = False
-            for j, atom_j in enumerate(self.coords):
-                if i != j:
-                    vdw_dist = PT.get_vdw(atom_i) + PT.get_vdw(atom_j)
-                    if dists[i, j] < vdw_dist:
-                        # connected
-                        connected = True
-                        if atom_i not in atom_j.connected_atoms:
-                            atom_j.connected_atoms.append(atom_i)
-                        if atom_j not in atom_i.connected_atoms:
-                            atom_i.connected_atoms.append(atom_j)
-                        if atom_i.mol is None and atom_j.mol is None:
-                            atom_i.mol = mol_count
-                            atom_j.mol = mol_count
-                            mol_count += 1
-                        elif atom_i.mol is None and atom_j.mol is not None:
-                            atom_i.mol = atom_j.mol
-                        elif atom_j.mol is None and atom_i.mol is not None:
-                            atom_j.mol = atom_i.mol
-                        # if different assignments, remove original assignment
-                        # combine the two fragments together, as they are connected
-                        elif atom_i.mol is not None and atom_j.mol is not None:
-                            if atom_i.mol != atom_j.mol:
-                                orig = atom_j.mol
-                                for atom in self.coords:
-                                    if atom.mol is orig:
-                                        atom.mol = atom_i.mol
-            if not connected:
-                atom_i.mol = mol_count
-                mol_count += 1
-
-        nums = set([atom.mol for atom in self.coords])
+        Split a system into fragments using van der waals radii. Bonded atoms
+        are found with a neighbour list, and fragments are the connected
+        components of the resulting |Graph|, numbered from 0 in order of their
+        first atom. Molecule numbers are written straight to the mol_ids array
+        instead of creating a dictionary and appending to the dictionary as we go.
+        """
+        self.assign_neighbours()
+        labels = self.graph.components()
+        self.mol_ids[:] = labels
         self.mol_dict = {
-            val: [atom for atom in self.coords if atom.mol == val]
-            for val in nums
+            num: [self.coords[row] for row in rows.tolist()]
+            for num, rows in enumerate(self.graph.groups(labels))
         }
-        for mol in self.mol_dict.values():
-            mol.sort(key=lambda atom: atom.index)
 
     def find_h_bonds(self, distance=2.0):
         """
@@ -1036,12 +1117,21 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
 
                 return True
 
+            def image_of(atom, near):
+                """
+                Position of an atom, or in a periodic system the position of
+                its image nearest to another atom
+                """
+                if self.cell is None:
+                    return atom.coords
+                return near.coords + minimum_image(atom.coords - near.coords, self.cell)
+
             def within_hbond_distance(atom1, atom2, dist):
                 """
                 Checks that atoms are within hydrogen-bonding distances, set to
                 2 Å by default.
                 """
-                return atom1.distance_to(atom2) < dist
+                return atom2.distance_to(image_of(atom1, atom2)) < dist
 
             def bond_angle(atom1, atom2):
                 """
@@ -1057,8 +1147,8 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
                 first in the list.
                 """
                 connected_to_atom2 = atom2.connected_atoms[0]
-                return atom2.angle_between(atom1.coords,
-                                           connected_to_atom2.coords)
+                return atom2.angle_between(image_of(atom1, atom2),
+                                           image_of(connected_to_atom2, atom2))
 
             def within_angle_tolerance(atom1, atom2):
                 """
@@ -1080,23 +1170,37 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
             self.assign_neighbours()
             frag_list = [frag['atoms'] for frag in self.fragments.values()]
 
-            counted = []
-            h_bonded = []
+            # fragment of each row, and position of the row in that fragment
+            frag_of = np.full(len(self.coords), -1)
+            place_in_frag = np.zeros(len(self.coords), dtype=int)
             for i, mol in enumerate(frag_list):
-                for j, mol2 in enumerate(frag_list):
-                    if i != j:
-                        for atom1 in mol:
-                            for atom2 in mol2:
-                                if valid_bond(atom1, atom2, distance):
-                                    pair = sorted([atom1.index, atom2.index])
-                                    if pair not in counted:
-                                        dist = atom1.distance_to(atom2)
-                                        angle = bond_angle(atom1, atom2)
-                                        h_bonded.append(
-                                            [atom1, atom2, dist, angle])
-                                        counted.append(pair)
-
-            return h_bonded
+                rows = self.rows(mol)
+                frag_of[rows] = i
+                place_in_frag[rows] = np.arange(len(rows))
+
+            # only pairs within the cutoff can form hydrogen bonds
+            first, second, _ = NeighbourList(self.positions, distance, self.cell).pairs()
+            between_frags = (frag_of[first] >= 0) & (frag_of[second] >= 0) & \
+                (frag_of[first] != frag_of[second])
+
+            h_bonded = []
+            for a, b in zip(first[between_frags].tolist(), second[between_frags].tolist()):
+                # try the atom of the earlier fragment as atom1 first
+                if frag_of[a] > frag_of[b]:
+                    a, b = b, a
+                for atom1, atom2 in ((self.coords[a], self.coords[b]),
+                                     (self.coords[b], self.coords[a])):
+                    if valid_bond(atom1, atom2, distance):
+                        dist = atom2.distance_to(image_of(atom1, atom2))
+                        angle = bond_angle(atom1, atom2)
+                        row1, row2 = atom1._row, atom2._row
+                        order = (frag_of[row1], frag_of[row2],
+                                 place_in_frag[row1], place_in_frag[row2])
+                        h_bonded.append((order, [atom1, atom2, dist, angle]))
+                        break
+
+            # same order as looping over each pair of fragments
+            return [bond for _, bond in sorted(h_bonded, key=lambda b: b[0])]
 
         def find_molecule_type(molecule):
             """
@@ -1166,76 +1270,23 @@ molecules, include the number without brackets: [1, 3], 4, [5, 7]
         # extend multiplicity for biradicals etc...
 
     def mol_template(self):
-        lines = [
-            "# Molecules should be laid out in four lines as follows:\n",
-            "# name=<NAME>\n", "# charge=<CHARGE>\n",
-            "# multiplicity=<MULTIPLICITY>\n",
-            "# atoms=<list of individual atoms in any order>\n",
-            "# hashed and blank lines are not read by python,\n",
-            '# and names should contain no spaces\n'
-            "# below is an example for hydrogen peroxide:\n\n", "name=h2o2\n",
-            "charge=0\n", "multiplicity=1\n", "atoms=O,H,H,O\n"
-        ]
-        return lines
+        return list(TEMPLATE)
 
     def check_user_additions(self):
         """
-        Reads ~/.config/autochem/molecules.txt for 
-        any additional molecules
-        """
-        confdir = os.path.expanduser('~/.config/autochem/')
-        if not os.path.exists(confdir):
-            os.makedirs(confdir, exist_ok=True)
-        userfile = os.path.join(confdir, 'molecules.txt')
-        # CREATE TEMPLATE FILE IF NOT EXISTS
-        if not os.path.isfile(userfile):
-            open(userfile, 'w+').writelines(self.mol_template())
-        # READ USER MOLECULES IF FILE EXISTS
-        else:
-            name = False
-            charge = False
-            mult = False
-            atoms = False
-            with open(userfile, 'r+') as f:
-                for line in f:
-                    # GET RID OF EXTRA SPACES AND ANYTHING AFTER A HASH
-                    line = line.strip()
-                    line = line.split('#')[0]
-                    # SPLIT INTO DESCRIPTOR AND VALUE
-                    line = line.split('=')
-                    # FIND IF ONE OF THE DESCRIPTORS AND ASSIGN VALUE
-                    if 'name' in line[0]:
-                        name = line[1]
-                    elif 'charge' in line[0]:
-                        charge = int(line[1])
-                    elif 'multiplicity' in line[0]:
-                        mult = int(line[1])
-                    elif 'atoms' in line[0]:
-                        atoms = line[1].split(',')
-                        for i in range(len(atoms)):
-                            atoms[i] = atoms[i].strip()
-
-                    # ONCE ALL DEFINED ADD TO DICTIONARY
-                    if not name is False and not charge is False:
-                        if not mult is False and not atoms is False:
-                            if charge == 0 and mult == 1:
-                                Molecule.Neutrals[name] = atoms
-                            elif charge == -1 and mult == 1:
-                                Molecule.Anions[name] = atoms
-                            if charge == 1 and mult == 1:
-                                Molecule.Cations[name] = atoms
-                            if charge == 0 and mult == 2:
-                                Molecule.Radicals[name] = atoms
-                            if charge == -1 and mult == 2:
-                                Molecule.Anion_radicals[name] = atoms
-                            if charge == 1 and mult == 2:
-                                Molecule.Cation_radicals[name] = atoms
-                            if charge == 2 and mult == 1:
-                                Molecule.Dications[name] = atoms
-                            if charge == 2 and mult == 2:
-                                Molecule.Dication_radicals[name] = atoms
-                            # RESET VARS
-                            name = False
-                            charge = False
-                            mult = False
-                            atoms = False
+        Makes sure the fragment database includes any additional molecules
+        in ~/.config/autochem/molecules.txt. The file is only read again if it
+        has changed since the last |Molecule| was created.
+        """
+        if Molecule.fragment_db.refresh():
+            Molecule.molecules.clear()
+            Molecule.molecules.update({
+                **Molecule.Cations,
+                **Molecule.Anions,
+                **Molecule.Neutrals,
+                **Molecule.Radicals,
+                **Molecule.Dications,
+                **Molecule.Anion_radicals,
+                **Molecule.Cation_radicals,
+                **Molecule.Dication_radicals
+            })
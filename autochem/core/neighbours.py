@@ -0,0 +1,195 @@
+from .periodic_table import PeriodicTable as PT
+import itertools
+import numpy as np
+
+__all__ = ['NeighbourList', 'bonded_pairs', 'cell_matrix', 'minimum_image']
+
+
+# (0, 0, 0) and the 13 neighbouring cells that come after it, so that every
+# pair of cells is visited once
+HALF_SHELL = [(0, 0, 0)] + [
+    offset for offset in itertools.product((-1, 0, 1), repeat=3)
+    if offset > (0, 0, 0)
+]
+
+
+def cell_matrix(cell):
+    """
+    Returns the lattice vectors of a periodic cell as the rows of a 3x3 array.
+    The cell can be given as the lengths of an orthorhombic box (a, b, c), as
+    lengths and angles in degrees (a, b, c, alpha, beta, gamma), or as the
+    three lattice vectors.
+
+    >>> cell_matrix([10, 10, 12])
+    """
+    cell = np.asarray(cell, dtype=float)
+    if cell.shape == (3, 3):
+        return cell
+    if cell.shape == (3,):
+        return np.diag(cell)
+    if cell.shape == (6,):
+        a, b, c = cell[:3]
+        cos_alpha, cos_beta, cos_gamma = np.cos(np.radians(cell[3:]))
+        sin_gamma = np.sin(np.radians(cell[5]))
+        cx = c * cos_beta
+        cy = c * (cos_alpha - cos_beta * cos_gamma) / sin_gamma
+        return np.array([
+            [a, 0, 0],
+            [b * cos_gamma, b * sin_gamma, 0],
+            [cx, cy, np.sqrt(c**2 - cx**2 - cy**2)],
+        ])
+    raise ValueError('cell must be given as 3 lengths, 3 lengths and 3 angles, '
+                     'or a 3x3 array of lattice vectors')
+
+
+def minimum_image(vectors, cell):
+    """
+    Returns displacement vectors shifted by whole lattice vectors to their
+    shortest image in a periodic cell, given as a 3x3 array of lattice vectors
+    """
+    frac = np.asarray(vectors, dtype=float) @ np.linalg.inv(cell)
+    frac -= np.round(frac)
+    return frac @ cell
+
+
+class NeighbourList:
+    """
+    Finds every pair of atoms closer than a cutoff using a cell list.
+    Space is divided into cubic cells with sides of at least the cutoff, so
+    that an atom can only be in range of atoms in its own cell or one of the
+    26 cells around it. The cost scales roughly linearly with the number of
+    atoms, instead of quadratically for a full distance matrix.
+
+    If a periodic cell is given, atoms are binned by their fractional
+    coordinates, cells at the edges of the box neighbour the cells on the
+    opposite side, and distances follow the minimum image convention.
+
+    Usage:
+        >>> nl = NeighbourList(mol.positions, cutoff=2.0)
+        >>> i, j, dist = nl.pairs()
+        >>> nl = NeighbourList(mol.positions, cutoff=2.0, cell=[30, 30, 30])
+
+    Instances of this class have the following attributes:
+
+    * ``positions`` -- (N, 3) array of coordinates in angstroms
+    * ``cutoff`` -- largest separation of a pair, in angstroms
+    * ``cell`` -- lattice vectors of a periodic cell as rows, or None
+    """
+
+    def __init__(self, positions, cutoff, cell=None):
+        self.positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+        self.cutoff = float(cutoff)
+        self.cell = None if cell is None else cell_matrix(cell)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {len(self.positions)} atoms, cutoff {self.cutoff} Å'
+
+    __str__ = __repr__
+
+    def _cells(self):
+        """
+        Returns the integer cell coordinates of each atom and the number of
+        cells along each axis
+        """
+        if self.cell is None:
+            origin = self.positions.min(axis=0)
+            cells = np.floor((self.positions - origin) / self.cutoff).astype(np.int64)
+            return cells, cells.max(axis=0) + 1
+        # bins are slices of the cell at least as thick as the cutoff
+        frac = self.positions @ np.linalg.inv(self.cell)
+        frac -= np.floor(frac)
+        volume = abs(np.linalg.det(self.cell))
+        areas = np.linalg.norm(np.cross(self.cell[[1, 2, 0]], self.cell[[2, 0, 1]]), axis=1)
+        dims = np.maximum(1, np.floor(volume / areas / self.cutoff)).astype(np.int64)
+        cells = np.minimum(np.floor(frac * dims).astype(np.int64), dims - 1)
+        return cells, dims
+
+    @staticmethod
+    def _cell_ids(cells, dims):
+        return (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+
+    def _separations(self, i, j):
+        """Returns distances between rows i and j"""
+        diff = self.positions[i] - self.positions[j]
+        if self.cell is not None:
+            diff = minimum_image(diff, self.cell)
+        return np.sqrt((diff**2).sum(axis=1))
+
+    def pairs(self):
+        """
+        Returns three arrays- i, j and the distance between them- for every
+        pair of atoms closer than the cutoff, with i < j.
+        """
+        num_atoms = len(self.positions)
+        if num_atoms < 2 or self.cutoff <= 0:
+            empty = np.zeros(0, dtype=int)
+            return empty, empty, np.zeros(0)
+
+        cells, dims = self._cells()
+        ids = self._cell_ids(cells, dims)
+        # atoms sorted by cell, so the atoms of each cell are contiguous
+        order = np.argsort(ids, kind='stable')
+        occupied, starts, counts = np.unique(ids[order],
+                                             return_index=True,
+                                             return_counts=True)
+
+        if self.cell is None:
+            offsets = HALF_SHELL
+        else:
+            # every neighbouring cell once, even when the box is only one or
+            # two cells across
+            offsets = itertools.product(
+                *[(-1, 0, 1) if n >= 3 else range(n) for n in dims.tolist()])
+
+        found_i = []
+        found_j = []
+        for offset in offsets:
+            neighbours = cells + offset
+            if self.cell is None:
+                in_box = np.all((neighbours >= 0) & (neighbours < dims), axis=1)
+                atoms = np.nonzero(in_box)[0]
+            else:
+                neighbours %= dims
+                atoms = np.arange(num_atoms)
+            targets = self._cell_ids(neighbours[atoms], dims)
+            slots = np.minimum(np.searchsorted(occupied, targets),
+                               len(occupied) - 1)
+            hit = occupied[slots] == targets
+            atoms, slots = atoms[hit], slots[hit]
+
+            # pair each atom with every atom of the neighbouring cell
+            per_atom = counts[slots]
+            i = np.repeat(atoms, per_atom)
+            within = np.arange(per_atom.sum()) - np.repeat(
+                np.cumsum(per_atom) - per_atom, per_atom)
+            j = order[np.repeat(starts[slots], per_atom) + within]
+
+            if self.cell is None and offset != (0, 0, 0):
+                keep = i != j
+            else:
+                keep = i < j
+            i, j = i[keep], j[keep]
+            close = self._separations(i, j) < self.cutoff
+            found_i.append(i[close])
+            found_j.append(j[close])
+
+        i = np.concatenate(found_i)
+        j = np.concatenate(found_j)
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        order = np.lexsort((j, i))
+        i, j = i[order], j[order]
+        return i, j, self._separations(i, j)
+
+
+def bonded_pairs(positions, atnums, cell=None):
+    """
+    Returns arrays i, j of every pair of atoms closer than the sum of their
+    van der waals radii, with i < j. Candidate pairs come from a
+    |NeighbourList| with cells as large as the biggest van der waals
+    separation in the system, rather than a full distance matrix.
+    """
+    radii = PT.vdw_radii[np.asarray(atnums, dtype=int)]
+    cutoff = 2 * radii.max(initial=0.0)
+    i, j, dists = NeighbourList(positions, cutoff, cell).pairs()
+    bonded = dists < radii[i] + radii[j]
+    return i[bonded], j[bonded]
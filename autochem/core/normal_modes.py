@@ -0,0 +1,163 @@
+from .hessian import BOHR_TO_ANG, vibrations
+from .periodic_table import PeriodicTable as PT
+import numpy as np
+
+__all__ = ['NormalModes', 'mode_reduced_masses', 'write_molden', 'write_xyz_animation']
+
+
+def mode_reduced_masses(displacements, masses):
+    """
+    Returns the reduced mass in amu of each normal mode, from cartesian
+    displacements of shape (modes, atoms, 3) and the masses of the atoms,
+    as sum(m d²) / sum(d²) over the atoms. This is the reduced mass printed
+    by Gaussian, and doesn't depend on how the displacements are normalised.
+    """
+    squared = np.asarray(displacements, dtype=float)**2
+    return (squared.sum(axis=-1) @ np.asarray(masses, dtype=float)) / squared.sum(axis=(-1, -2))
+
+
+def format_rows(fmt, values):
+    """
+    Returns the rows of a 2D array written with `fmt`, one row per line.
+    The whole array is formatted with a single %, rather than a call for
+    each number.
+    """
+    values = np.asarray(values, dtype=float)
+    return ((fmt + '\n') * len(values)) % tuple(values.ravel())
+
+
+def write_molden(filename, atoms, frequencies, displacements, intensities=None):
+    """
+    Writes the normal modes of a list of |Atom| to a Molden file, for
+    animating in Molden, Jmol, Avogadro or similar. `frequencies` are in
+    cm⁻¹, with imaginary frequencies as negative numbers, and
+    `displacements` has shape (modes, atoms, 3).
+
+    >>> write_molden('water.molden', atoms, freqs, modes)
+    """
+    symbols = [atom.symbol for atom in atoms]
+    coords = np.array([atom.coords for atom in atoms], dtype=float) / BOHR_TO_ANG
+    atom_rows = ''.join(f'{symbol:2s} %15.8f %15.8f %15.8f\n' for symbol in symbols)
+    parts = ['[Molden Format]\n[FREQ]\n']
+    parts.append(format_rows('%12.4f', np.reshape(frequencies, (-1, 1))))
+    parts.append('[FR-COORD]\n')
+    parts.append(atom_rows % tuple(coords.ravel()))
+    parts.append('[FR-NORM-COORD]\n')
+    for number, mode in enumerate(np.asarray(displacements, dtype=float), 1):
+        parts.append(f'vibration {number}\n')
+        parts.append(format_rows('%12.6f %12.6f %12.6f', mode))
+    if intensities is not None:
+        parts.append('[INT]\n')
+        parts.append(format_rows('%12.4f', np.nan_to_num(np.reshape(intensities, (-1, 1)))))
+    with open(filename, 'w') as f:
+        f.write(''.join(parts))
+
+
+def write_xyz_animation(filename, atoms, displacement, frames=20, amplitude=0.5, title=''):
+    """
+    Writes one normal mode of a list of |Atom| as an xyz file of `frames`
+    geometries, over one period of the vibration, for viewers that play
+    multi-frame xyz files as a movie. `displacement` has shape (atoms, 3),
+    and is scaled so that the largest displacement of any atom is
+    `amplitude` Å.
+
+    >>> write_xyz_animation('mode7.xyz', atoms, modes[6])
+    """
+    coords = np.array([atom.coords for atom in atoms], dtype=float)
+    displacement = np.asarray(displacement, dtype=float)
+    largest = np.linalg.norm(displacement, axis=-1).max()
+    if largest > 0:
+        displacement = displacement * amplitude / largest
+    phases = np.sin(2 * np.pi * np.arange(frames) / frames)
+    geometries = coords + phases[:, None, None] * displacement
+    atom_rows = ''.join(
+        f'{atom.symbol:5s} %15.10f %15.10f %15.10f \n' for atom in atoms)
+    with open(filename, 'w') as f:
+        for number, geometry in enumerate(geometries, 1):
+            f.write(f'{len(atoms)}\n' + f'{title} frame {number}'.strip() + '\n')
+            f.write(atom_rows % tuple(geometry.ravel()))
+
+
+class NormalModes:
+    """
+    Normal modes of a vibrational analysis, as numpy arrays. Found from the
+    logs of frequency calculations by the ``vibrations`` property of each
+    Results class, in a single pass over the vibrational section, or from a
+    cartesian hessian with `NormalModes.from_hessian`.
+
+    Modes printed as all zeros, as ORCA prints the translations and
+    rotations, are left out. Reduced masses that the program doesn't print
+    are found from the displacements, using the average atomic masses.
+
+    Usage:
+        >>> modes = GaussianResults('water.log').vibrations
+        >>> modes.displacements.shape
+        (3, 3, 3)
+        >>> modes.write_molden('water.molden')
+
+    Instances of this class have the following attributes:
+
+    * ``atoms`` -- list of |Atom|, the geometry the modes are of
+    * ``frequencies`` -- frequencies in cm⁻¹, imaginary ones as negative numbers
+    * ``displacements`` -- cartesian displacements, of shape (modes, atoms, 3)
+    * ``reduced_masses`` -- reduced mass of each mode in amu
+    * ``intensities`` -- IR intensities in the units printed by the program
+      (km/mol, except for GAMESS), or None if there aren't any
+    """
+
+    def __init__(self, atoms, frequencies, displacements, reduced_masses=None, intensities=None):
+        self.atoms = atoms
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        self.displacements = np.asarray(displacements, dtype=float).reshape(len(self.frequencies), -1, 3)
+        if self.displacements.shape[1] != len(atoms):
+            raise ValueError(
+                f'Normal modes of {self.displacements.shape[1]} atoms do not match {len(atoms)} atoms')
+        moving = self.displacements.any(axis=(1, 2))
+        self.frequencies = self.frequencies[moving]
+        self.displacements = self.displacements[moving]
+        if reduced_masses is None:
+            masses = PT.masses[[atom.atnum for atom in atoms]]
+            self.reduced_masses = mode_reduced_masses(self.displacements, masses)
+        else:
+            self.reduced_masses = np.asarray(reduced_masses, dtype=float)[moving]
+        if intensities is not None:
+            intensities = np.asarray(intensities, dtype=float)[moving]
+        self.intensities = intensities
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {len(self)} modes of {len(self.atoms)} atoms'
+
+    __str__ = __repr__
+
+    def __len__(self):
+        return len(self.frequencies)
+
+    @classmethod
+    def from_hessian(cls, hessian, atoms, masses=None, **kwargs):
+        """
+        Normal modes from a cartesian hessian in hartree/bohr², found by
+        `vibrations`, which is passed any other arguments. Only one set of
+        masses can be given.
+
+        >>> NormalModes.from_hessian(*read_hessian('water.fchk')).write_molden('water.molden')
+        """
+        freqs, modes = vibrations(hessian, atoms, masses, **kwargs)
+        if kwargs.get('partial') is not None:
+            atoms = [atoms[i] for i in kwargs['partial']]
+        if masses is None:
+            masses = PT.masses[[atom.atnum for atom in atoms]]
+        elif kwargs.get('partial') is not None:
+            masses = np.asarray(masses, dtype=float)[kwargs['partial']]
+        return cls(atoms, freqs, modes, mode_reduced_masses(modes, masses))
+
+    def write_molden(self, filename):
+        """Writes the modes to a Molden file- see `write_molden`"""
+        write_molden(filename, self.atoms, self.frequencies, self.displacements, self.intensities)
+
+    def write_xyz_animation(self, filename, mode, frames=20, amplitude=0.5):
+        """
+        Writes mode number `mode`, counting from 0, as a multi-frame xyz
+        file- see `write_xyz_animation`
+        """
+        write_xyz_animation(filename, self.atoms, self.displacements[mode], frames, amplitude,
+                            title=f'{self.frequencies[mode]:.2f} cm-1')
@@ -1,3 +1,5 @@
+import numpy as np
+
 __all__ = ['PeriodicTable']
 
 class PeriodicTable:
@@ -125,16 +127,19 @@ class PeriodicTable:
     ptable[116] = ['Lv', 293.00000, 2.00 ,  8, 0.000]
     ptable[117] = ['Ts', 294.00000, 2.00 ,  8, 0.000]
     ptable[118] = ['Og', 294.00000, 2.00 ,  8, 0.000]
-                                               
+
+    # lookups used by array-backed atoms, indexed by symbol/atomic number
+    atnums = {v[0]: k for k, v in ptable.items()}
+    masses = np.array([v[1] for k, v in sorted(ptable.items())])
+    vdw_radii = np.array([v[4] for k, v in sorted(ptable.items())])
+
     def __init__(self): 
         raise AttributeError('The PeriodicTable class cannot be instantiated.')
 
     @classmethod
     def get_atnum(cls, atom):
         """Converts symbol to atomic number"""
-        for key in cls.ptable.keys():
-            if cls.ptable[key][0] == atom.symbol.capitalize():
-                return key
+        return cls.atnums.get(atom.symbol.capitalize())
 
     @classmethod
     def get_symbol(cls, atom):
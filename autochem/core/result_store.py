@@ -0,0 +1,173 @@
+import json
+import os
+from .fragment_cache import CACHE_DIR
+from .sqlite_cache import SQLiteCache
+
+__all__ = ['ResultStore']
+
+
+STORE_FILE = os.path.join(CACHE_DIR, 'results.sqlite')
+
+# bump if the layout of the logs table changes, which empties the store
+STORE_FORMAT = 2
+
+
+class ResultStore(SQLiteCache):
+    """
+    SQLite database of values parsed from log files, so that scanning a tree
+    of calculations again only parses logs that are new or have changed.
+
+    Each log is stored under its absolute path, with the size, modification
+    time and inode of the file when it was parsed, and the ``version`` of the
+    parsers that parsed it. If any of those differ the entry is out of date,
+    and ``load`` returns None so that the log is parsed again. The stat is
+    the 'stat' of the entry, taken before the log was parsed, so that a log
+    that changes while it is parsed is parsed again next time rather than
+    kept with its old values.
+
+    Values that could not be parsed, named in the 'errors' dictionary of an
+    entry, are not stored, so that they are parsed again next time rather
+    than kept as None. An entry with a column that could not be parsed is
+    not stored at all.
+
+    An entry is a dictionary of values. The values in ``columns`` are kept as
+    columns of the ``logs`` table so that they can be queried directly; the
+    rest, such as energies, HOMO-LUMO gaps and frequencies, are stored as json.
+
+    Usage:
+        >>> store = ResultStore()
+        >>> store.select(completed=True, is_spec=True, path_includes='c4mim')
+        >>> store.query("method LIKE ? AND completed", ('%MP2%',))
+
+    Instances of this class have the following attributes:
+
+    * ``path`` -- the database file (results.sqlite in ~/.autochem_cache, or
+      the AUTOCHEM_CACHE environment variable)
+    * ``version`` -- version of the parsers, such as `LOG_FIELDS_VERSION`
+      in grep_results.py, so that entries parsed by older code are ignored
+    * ``enabled`` -- set to False to parse every log from scratch
+    * ``hits``, ``misses`` -- number of logs found and not found
+    """
+
+    columns = ('program', 'completed', 'runtype', 'is_spec',
+               'is_optimisation', 'is_hessian', 'method', 'basis')
+
+    flags = ('completed', 'is_spec', 'is_optimisation', 'is_hessian')
+
+    table = 'logs'
+
+    def __init__(self, path=STORE_FILE, version=None):
+        super().__init__(path)
+        self.version = None if version is None else str(version)
+
+    def create(self, connection):
+        """Creates the logs table, replacing one of an older layout"""
+        if connection.execute('PRAGMA user_version').fetchone()[0] != STORE_FORMAT:
+            with connection:
+                connection.execute('DROP TABLE IF EXISTS logs')
+                connection.execute(f'PRAGMA user_version = {STORE_FORMAT}')
+        columns = ', '.join(self.columns)
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS logs ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, '
+            f'inode INTEGER, version TEXT, {columns}, fields TEXT)')
+
+    @staticmethod
+    def stat(log):
+        """Returns the size, modification time and inode of a file"""
+        st = os.stat(log)
+        return st.st_size, st.st_mtime_ns, st.st_ino
+
+    def _entry(self, row, stat=None):
+        """Turns a row of (path, *columns, fields) into an entry"""
+        path, *values, fields = row
+        entry = {'path': path}
+        entry.update(zip(self.columns, values))
+        for flag in self.flags:
+            if entry[flag] is not None:
+                entry[flag] = bool(entry[flag])
+        entry.update(json.loads(fields))
+        if stat is not None:
+            entry['stat'] = stat
+        return entry
+
+    def load(self, log):
+        """
+        Returns the entry stored for a log, or None if there isn't one or the
+        log has changed since it was stored
+        """
+        if not self.enabled:
+            return None
+        path = os.path.abspath(log)
+        row = self.connection.execute(
+            f'SELECT size, mtime_ns, inode, version, path, {", ".join(self.columns)}, fields '
+            'FROM logs WHERE path = ?', (path, )).fetchone()
+        if row is None or tuple(row[:3]) != self.stat(log) or row[3] != self.version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._entry(row[4:], tuple(row[:3]))
+
+    def save(self, log, entry):
+        """
+        Stores the entry for a log, replacing any entry stored before, leaving
+        out values that could not be parsed. The entry is stored under its
+        'stat' (see `stat`), taken before it was parsed, or under the stat of
+        the log now if it has none.
+        """
+        if not self.enabled:
+            return
+        failed = entry.get('errors') or {}
+        if any(column in failed for column in self.columns):
+            return
+        path = os.path.abspath(log)
+        values = [entry.get(column) for column in self.columns]
+        fields = {
+            k: v
+            for k, v in entry.items()
+            if k not in self.columns and k not in failed and k not in ('path', 'stat')
+        }
+        if 'errors' in fields:
+            fields['errors'] = {}
+        self.connection.execute(
+            f'INSERT OR REPLACE INTO logs VALUES ({", ".join("?" * (len(values) + 6))})',
+            (path, *(entry.get('stat') or self.stat(log)), self.version, *values,
+             json.dumps(fields)))
+        self.saved()
+
+    def query(self, where='1', params=()):
+        """
+        Returns every stored entry matching an SQL condition, which can use
+        the path, size, mtime_ns and inode of each log as well as `columns`.
+        Entries are as they were when each log was last parsed, by parsers of
+        the same ``version``.
+        """
+        rows = self.connection.execute(
+            f'SELECT path, {", ".join(self.columns)}, fields FROM logs '
+            f'WHERE version IS ? AND ({where}) ORDER BY path', (self.version, *params))
+        return [self._entry(row) for row in rows]
+
+    def select(self, path_includes=None, **values):
+        """
+        Returns stored entries with the given column values, and optionally
+        with `path_includes` in their path.
+
+        >>> store.select(completed=True, is_spec=True, method='MP2', path_includes='c4mim')
+        """
+        conditions = []
+        params = []
+        for column, value in values.items():
+            if column not in self.columns:
+                raise ValueError(f'{column} is not one of {self.columns}')
+            conditions.append(f'{column} IS ?')
+            params.append(value)
+        if path_includes is not None:
+            conditions.append("instr(path, ?) > 0")
+            params.append(path_includes)
+        return self.query(' AND '.join(conditions) or '1', params)
+
+    def remove(self, log):
+        """Removes the entry for a log"""
+        with self.connection:
+            self.connection.execute('DELETE FROM logs WHERE path = ?',
+                                    (os.path.abspath(log), ))
@@ -1,11 +1,481 @@
+import copy
+import io
+import mmap
 import re
 import os
-from .utils import write_xyz, eof, read_file
+import numpy as np
+from .normal_modes import NormalModes
+from .section_index import SectionIndex
+from .utils import (write_xyz, eof, compression, open_log, read_backwards, read_file,
+                    decode_line, decompressed_tail, lines_backwards)
+
+__all__ = [
+    'AllLines',
+    'AnyLine',
+    'Block',
+    'Extractor',
+    'FirstLine',
+    'LastLine',
+    'LinesBefore',
+    'MappedLog',
+    'NormalModeBlocks',
+    'Results',
+    'Section',
+]
+
+
+def matcher(match):
+    """
+    Returns a function of a line that is True if the line matches- `match`
+    can be a string to find in the line, or already a function of the line
+    """
+    if callable(match):
+        return match
+    return lambda line: match in line
+
+
+def search_markers(match, marker, *others):
+    """
+    Returns the fixed strings found in every line that can change an
+    extractor- `marker`, or `match` if it is a string, along with any
+    `others` that aren't None. Returns None if `match` is a function and
+    no marker is given, as then any line could match.
+    """
+    if marker is None:
+        if callable(match):
+            return None
+        marker = match
+    markers = (marker, ) if isinstance(marker, str) else tuple(marker)
+    return markers + tuple(other for other in others if other is not None)
+
+
+def decode(line):
+    """Decodes a line of a |MappedLog|, as it would be read in text mode"""
+    line = line.decode('utf-8', errors='replace')
+    if line.endswith('\r\n'):
+        line = line[:-2] + '\n'
+    return line
+
+
+class MappedLog:
+    """
+    A log file memory-mapped as bytes, so that lines containing a marker can
+    be found with ``bytes.find`` without decoding the rest of the file.
+    Bytes that aren't valid text are replaced rather than ending the read.
+
+    Usage:
+        >>> with MappedLog('water.log') as log:
+        ...     for line in log.lines_with(['TOTAL ENERGY =']):
+        ...         print(line)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files can't be mapped
+            self.data = b''
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.path}'
+
+    __str__ = __repr__
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def line_around(self, offset):
+        """Returns the start and end of the line containing an offset"""
+        start = self.data.rfind(b'\n', 0, offset) + 1
+        end = self.data.find(b'\n', offset)
+        end = len(self.data) if end == -1 else end + 1
+        return start, end
+
+    def lines(self):
+        """Yields every line, in order"""
+        data = self.data
+        start = 0
+        while start < len(data):
+            end = data.find(b'\n', start)
+            end = len(data) if end == -1 else end + 1
+            yield decode(data[start:end])
+            start = end
+
+    def line_offsets(self, marker):
+        """Returns the offset of the start of every line containing a marker"""
+        marker = marker.encode()
+        data = self.data
+        offsets = []
+        found = data.find(marker)
+        while found != -1:
+            start, end = self.line_around(found)
+            offsets.append(start)
+            found = data.find(marker, end)
+        return offsets
+
+    def lines_with(self, markers, reverse=False):
+        """
+        Yields each line containing any of `markers`, in order, or from the
+        last line back to the first if `reverse` is True. Each marker is only
+        searched for as far as is needed to find the next line.
+        """
+        markers = [marker.encode() for marker in markers]
+        data = self.data
+        if reverse:
+            found = {marker: data.rfind(marker) for marker in markers}
+            while True:
+                offset = max(found.values(), default=-1)
+                if offset == -1:
+                    return
+                start, end = self.line_around(offset)
+                yield decode(data[start:end])
+                for marker, position in found.items():
+                    if position >= start:
+                        found[marker] = data.rfind(marker, 0, start)
+        else:
+            found = {marker: data.find(marker) for marker in markers}
+            while True:
+                live = [offset for offset in found.values() if offset != -1]
+                if not live:
+                    return
+                start, end = self.line_around(min(live))
+                yield decode(data[start:end])
+                for marker, position in found.items():
+                    if position != -1 and position < end:
+                        found[marker] = data.find(marker, end)
+
+
+class Extractor:
+    """
+    Base class for extractors, which find one property of a log file while
+    being fed the lines of the file one at a time. Each Results class lists
+    its extractors in `extractors`, and `Results.parse()` feeds every line of
+    the log to all of them, so that every property is found in a single read.
+
+    Extractors only collect lines- turning them into values is left to the
+    property that uses them, so that one property that can't be read doesn't
+    stop the others from being found.
+
+    Subclasses define `feed(line)`, storing what they find in self.value, and
+    set self.done once nothing more is needed from the rest of the file.
+
+    Extractors that are only changed by lines containing one of a few fixed
+    strings list them in `markers`. Those lines are then found by searching
+    the memory-mapped log for the strings with `search(log)`, instead of
+    feeding the extractor every line.
+    """
+
+    markers = None
+
+    def __init__(self, name, default=None):
+        self.name = name
+        self.default = default
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.name}'
+
+    __str__ = __repr__
+
+    def start(self):
+        """Returns a copy of this extractor, ready to read a new log"""
+        extractor = copy.copy(self)
+        extractor.value = copy.copy(self.default)
+        extractor.done = False
+        extractor.reset()
+        return extractor
+
+    def reset(self):
+        """Sets up any state needed by `feed()`, other than value and done"""
+
+    def feed(self, line):
+        raise NotImplementedError
+
+    def search(self, log):
+        """Feeds the lines of a |MappedLog| containing any of `markers`"""
+        for line in log.lines_with(self.markers):
+            self.feed(line)
+            if self.done:
+                break
+
+
+class FirstLine(Extractor):
+    """
+    The first line that matches. If `after` is given, only lines after the
+    first line containing it are searched, and if `stop` is given, the search
+    ends at the first line containing it.
+
+    `marker` is a string, or list of strings, that every line matching a
+    function `match` contains- see |Extractor|. The same goes for the
+    extractors below.
+    """
+
+    def __init__(self, name, match, after=None, stop=None, marker=None):
+        super().__init__(name)
+        self.match = matcher(match)
+        self.after = after
+        self.stop = stop
+        self.markers = search_markers(match, marker, after, stop)
+
+    def reset(self):
+        self.searching = self.after is None
+
+    def feed(self, line):
+        if self.searching and self.match(line):
+            self.value = line
+            self.done = True
+        elif self.after is not None and self.after in line:
+            self.searching = True
+        elif self.stop is not None and self.stop in line:
+            self.done = True
+
+
+class LastLine(Extractor):
+    """The last line that matches"""
+
+    def __init__(self, name, match, marker=None):
+        super().__init__(name)
+        self.match = matcher(match)
+        self.markers = search_markers(match, marker)
+
+    def feed(self, line):
+        if self.match(line):
+            self.value = line
+
+    def search(self, log):
+        """Searches backwards from the end of the log"""
+        for line in log.lines_with(self.markers, reverse=True):
+            if self.match(line):
+                self.value = line
+                break
+        self.done = True
+
+
+class AnyLine(Extractor):
+    """
+    True if any line matches. If `stop` is given, only lines up to and
+    including the first line containing it are searched.
+    """
+
+    def __init__(self, name, match, stop=None, marker=None):
+        super().__init__(name, default=False)
+        self.match = matcher(match)
+        self.stop = stop
+        self.markers = search_markers(match, marker, stop)
+
+    def feed(self, line):
+        if self.match(line):
+            self.value = True
+            self.done = True
+        elif self.stop is not None and self.stop in line:
+            self.done = True
+
+
+class AllLines(Extractor):
+    """
+    Every line that matches, in a list. If `stop` is given, only lines up to
+    and including the first line containing it are searched.
+    """
+
+    def __init__(self, name, match, stop=None, marker=None):
+        super().__init__(name, default=[])
+        self.match = matcher(match)
+        self.stop = stop
+        self.markers = search_markers(match, marker, stop)
+
+    def feed(self, line):
+        if self.match(line):
+            self.value.append(line)
+        if self.stop is not None and self.stop in line:
+            self.done = True
+
+
+class Section(Extractor):
+    """
+    Lines of every section of the log, where a section starts at a line
+    containing `begin` and ends at the next line containing `end`. The first
+    line of each section is included, the last is not. If `match` is given,
+    only lines of the sections that match are kept.
+    """
+
+    def __init__(self, name, begin, end, match=None):
+        super().__init__(name, default=[])
+        self.begin = begin
+        self.end = end
+        self.match = matcher(match) if match is not None else None
+
+    def reset(self):
+        self.inside = False
+
+    def feed(self, line):
+        if self.begin in line:
+            self.inside = True
+        if self.end in line:
+            self.inside = False
+        if self.inside and (self.match is None or self.match(line)):
+            self.value.append(line)
+
+
+class Block(Extractor):
+    """
+    Lines from the first line that matches `begin`, up to but not including
+    the next line containing `end`
+    """
+
+    def __init__(self, name, begin, end):
+        super().__init__(name, default=[])
+        self.begin = matcher(begin)
+        self.end = end
+
+    def reset(self):
+        self.inside = False
+
+    def feed(self, line):
+        if not self.inside and self.begin(line):
+            self.inside = True
+        if self.inside:
+            if self.end in line:
+                self.done = True
+            else:
+                self.value.append(line)
+
+
+class LinesBefore(Extractor):
+    """The last `count` lines before the first line containing `match`"""
+
+    def __init__(self, name, match, count=1):
+        super().__init__(name, default=[])
+        self.match = matcher(match)
+        self.count = count
+
+    def feed(self, line):
+        if self.match(line):
+            self.done = True
+        else:
+            self.value.append(line)
+            del self.value[:-self.count]
+
+
+class NormalModeBlocks(Extractor):
+    """
+    Base class for extractors of the normal modes of a vibrational analysis,
+    which programs print in blocks of a few modes side by side. Subclasses
+    parse each line in `feed()` as it is read, so the section is parsed in
+    the same pass that reads it, adding to the lists of self.value:
+
+    * ``frequencies``, ``reduced_masses``, ``intensities`` -- values of each mode
+    * ``displacements`` -- an array of shape (modes, atoms, 3) for each block
+
+    The rows of displacements of a block are kept in self.rows, and turned
+    into an array by `flush()` when the next block starts, or at the end.
+    """
+
+    # True if each row is one atom, with x, y and z of each mode in turn
+    # (Gaussian, PSI4), False if each row is one coordinate of one atom with
+    # a value for each mode (GAMESS, ORCA)
+    atom_rows = True
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def reset(self):
+        self.value = {
+            "frequencies": [],
+            "reduced_masses": [],
+            "intensities": [],
+            "displacements": [],
+        }
+        self.rows = []
+
+    def flush(self):
+        """Adds the displacements of the rows read since the last block"""
+        if self.rows:
+            rows = np.array(self.rows, dtype=float)
+            if self.atom_rows:
+                block = rows.reshape(len(rows), -1, 3).swapaxes(0, 1)
+            else:
+                block = rows.reshape(-1, 3, rows.shape[1]).transpose(2, 0, 1)
+            self.value["displacements"].append(block)
+            self.rows = []
+
+
+def stream_offsets(path, headers):
+    """
+    Returns {header: [offset of each line containing the header]} for a
+    file that can't be mapped, such as a compressed log, in one pass.
+    The bytes from the first of those lines to the end of the file are
+    kept in the same pass, so that the sections can be read without
+    decompressing the file again, and returned with their offset, as
+    (offsets, start, data).
+    """
+    markers = [(header, header.encode()) for header in headers]
+    offsets = {header: [] for header in headers}
+    position = 0
+    start = None
+    kept = []
+    with open_log(path) as f:
+        for line in f:
+            for header, marker in markers:
+                if marker in line:
+                    offsets[header].append(position)
+                    if start is None:
+                        start = position
+            if start is not None:
+                kept.append(line)
+            position += len(line)
+    return offsets, position if start is None else start, b"".join(kept)
+
+
+def feed(extractors, lines):
+    """
+    Feeds lines to extractors, stopping early once every extractor has found
+    what it needs
+    """
+    active = extractors
+    for line in lines:
+        finished = False
+        for extractor in active:
+            extractor.feed(line)
+            finished = finished or extractor.done
+        if finished:
+            active = [extractor for extractor in active if not extractor.done]
+            if not active:
+                break
 
-__all__ = ['Results']
 
 class Results:
-    """Base class, only for inheritance"""
+    """
+    Base class, only for inheritance.
+
+    Subclasses list the extractors for their properties in `extractors`.
+    The first property asked for reads the log once with `self.parse()`, and
+    every property after that is served from `self.record`.
+
+    Properties that need one section of the log find it with
+    `self.offsets(header)`, from an index of the offsets of every header in
+    `section_headers` that is built once per log and kept in `section_index`.
+    """
+
+    extractors = []
+
+    section_headers = ()
+
+    section_index = SectionIndex()
+
+    # header of the section with the normal modes of a vibrational analysis,
+    # and the |NormalModeBlocks| extractor that reads them from there
+    normal_modes_header = None
+
+    normal_modes_extractor = None
 
     def __init__(self, log):
         self.log = log
@@ -13,27 +483,276 @@ class Results:
         self.basename = self.file.split('.')[0]
         self.abspath = os.path.abspath(log)
         self.parent_dir = self.abspath.split('/')[-2]
+        self._record = None
+        self._vibrations = None
+        # (offset, bytes) of the end of a compressed log decompressed so far
+        self._stream = None
 
     def __repr__(self):
         return f'{self.__class__.__name__}: {self.log}'
 
     __str__ = __repr__
 
-        
+
     def read(self):
         """
-        Memory-efficient reading of large log files, using a generator 
+        Memory-efficient reading of large log files, using a generator
         returning lines as required
         """
         for line in read_file(self.log):
             yield line
 
+    def parse(self):
+        """
+        Finds every property of `self.extractors` from the memory-mapped log.
+        Extractors with `markers` search the log for them, decoding only the
+        lines found; every line is fed once to the rest, stopping early once
+        they have all found what they need.
+        Returns what was found as a dictionary of {extractor name: value},
+        which is also kept as `self.record`.
+        """
+        extractors = [extractor.start() for extractor in self.extractors]
+        if compression(self.abspath) is not None:
+            # can't be mapped, so every extractor is fed the decompressed lines
+            feed(extractors, self.read())
+        else:
+            with MappedLog(self.abspath) as log:
+                active = []
+                for extractor in extractors:
+                    if extractor.markers is None:
+                        active.append(extractor)
+                    else:
+                        extractor.search(log)
+                if active:
+                    feed(active, log.lines())
+        self._record = {extractor.name: extractor.value for extractor in extractors}
+        return self._record
+
+    @property
+    def record(self):
+        """Everything found by `self.parse()`, parsing the log if needed"""
+        if self._record is None:
+            self.parse()
+        return self._record
+
     def get_error(self):
         print(f'{self.log}: Incomplete calculation')
 
+    def offsets(self, header):
+        """
+        Returns the byte offset of the start of every line of the log that
+        contains `header`. The first call for a log searches it for every
+        header of `section_headers` at once, and stores the offsets in
+        `section_index` for any later call, in this process or another.
+        """
+        offsets = self.section_index.load(self.abspath)
+        if header not in offsets:
+            # before searching, so headers written meanwhile aren't missed
+            stat = self.section_index.stat(self.abspath)
+            missing = [h for h in dict.fromkeys((*self.section_headers, header)) if h not in offsets]
+            if compression(self.abspath) is not None:
+                found, start, data = stream_offsets(self.abspath, missing)
+                offsets.update(found)
+                if self._stream is None or start < self._stream[0]:
+                    self._stream = start, data
+            else:
+                with MappedLog(self.abspath) as log:
+                    for h in missing:
+                        offsets[h] = log.line_offsets(h)
+            self.section_index.save(self.abspath, offsets, stat)
+        return offsets[header]
+
+    def decompressed(self, offset=None, fraction=None):
+        """
+        Returns (start, data), the bytes of a compressed log from `start` to
+        the end, once decompressed, where `start` is no later than a byte
+        offset, or than the start of the last `fraction` of the log as a
+        decimal. Compressed logs can only be read forwards, so the longest
+        end of the log decompressed so far is kept, and any later call that
+        it covers is served from it rather than decompressing the log again.
+        """
+        if self._stream is not None:
+            start, data = self._stream
+            size = start + len(data)
+            wanted = offset if fraction is None else size - int(fraction * size)
+            if wanted >= start:
+                return self._stream
+        if fraction is None:
+            with open_log(self.abspath) as f:
+                f.seek(offset)
+                self._stream = offset, f.read()
+        else:
+            self._stream = decompressed_tail(self.abspath, fraction=fraction)
+        return self._stream
+
+    def open_at(self, offset):
+        """
+        Opens the log in bytes at a byte offset. Compressed logs are read
+        from the end kept by `decompressed`.
+        """
+        if compression(self.abspath) is None:
+            f = open(self.abspath, 'rb')
+            f.seek(offset)
+            return f
+        start, data = self.decompressed(offset=offset)
+        f = io.BytesIO(data)
+        f.seek(offset - start)
+        return f
+
+    def read_from(self, offset):
+        """Yields the lines of the log from a byte offset to the end"""
+        with self.open_at(offset) as f:
+            for line in f:
+                yield decode(line)
+
+    def read_section(self, offset, end):
+        """
+        Returns the lines of the log from a byte offset up to and including
+        the next line containing `end`, or for which `end` is True if it is a
+        function, or up to the end of the log if there is no such line
+        """
+        return self._section(offset, end)[0]
+
+    def _section(self, offset, end):
+        """`read_section`, also returning the offset of the end of the section"""
+        end = matcher(end)
+        lines = []
+        with self.open_at(offset) as f:
+            for line in f:
+                offset += len(line)
+                lines.append(decode(line))
+                if end(lines[-1]):
+                    break
+        return lines, offset
+
+    def sections(self, header, end):
+        """
+        Yields the lines of each section of the log, from a line containing
+        `header` up to and including the next line matching `end`, as for
+        `read_section`. Headers inside the section before are skipped.
+        Only the sections are read, so the rest of the log is never decoded.
+        """
+        read_to = 0
+        for offset in self.offsets(header):
+            if offset < read_to:
+                continue
+            lines, read_to = self._section(offset, end)
+            yield lines
+
     def eof(self, percentage):
         """
         Include percentage as decimal.
         i.e. self.eof(0.05) returns the last 5% of the file
         """
-        return eof(self.abspath, percentage) 
+        if compression(self.abspath) is None:
+            return eof(self.abspath, percentage)
+        return (decode_line(line, self.abspath) for line in io.BytesIO(self._tail(percentage)))
+
+    def tail(self, percentage=1):
+        """
+        Lines of the log in reverse order, from the last line back to the
+        start of the last `percentage` of the file, as a decimal. The file is
+        read backwards in blocks, so stopping once a line near the end is
+        found doesn't read the rest of the file.
+
+        >>> any("TERMINATED NORMALLY" in line for line in self.tail(0.1))
+        """
+        if compression(self.abspath) is None:
+            return read_backwards(self.abspath, fraction=percentage)
+        return lines_backwards([self._tail(percentage)], self.abspath)
+
+    def _tail(self, percentage):
+        """The last `percentage` of a compressed log, in bytes"""
+        start, data = self.decompressed(fraction=percentage)
+        size = start + len(data)
+        return data[max(len(data) - int(percentage * size), 0):]
+
+    def last_section_before(self, header, offset, end):
+        """
+        Returns the lines of the last section starting at a line containing
+        `header` before a byte offset, or anywhere if `offset` is None, up to
+        the next line matching `end` as for `read_section`. Returns an empty
+        list if there is no such section.
+        """
+        before = [start for start in self.offsets(header) if offset is None or start < offset]
+        if len(before) == 0:
+            return []
+        return self.read_section(before[-1], end)
+
+    def vib_get_geom(self, offset=None):
+        """
+        Returns the geometry, as a list of |Atom|, of the normal modes whose
+        section starts at a byte offset, or of the last modes of the log
+        """
+        raise NotImplementedError
+
+    @property
+    def vibrations(self):
+        """
+        |NormalModes| of the last vibrational analysis of the log, or None if
+        there isn't one. Its section is found from the section index, and
+        read and parsed in a single pass by `normal_modes_extractor`, from
+        `normal_modes_header` to the end of the modes, so the rest of the
+        log is never read.
+
+        >>> calc.vibrations.write_molden(f"{calc.basename}.molden")
+        """
+        if self._vibrations is None and self.normal_modes_header is not None:
+            offsets = self.offsets(self.normal_modes_header)
+            if len(offsets) == 0:
+                return None
+            extractor = self.normal_modes_extractor.start()
+            lines = self.read_from(offsets[-1])
+            feed([extractor], lines)
+            lines.close()
+            extractor.flush()
+            found = extractor.value
+            if len(found["displacements"]) == 0:
+                return None
+            displacements = np.concatenate(found["displacements"])
+            if len(displacements) != len(found["frequencies"]):
+                raise ValueError(
+                    f"{self.log}: found {len(displacements)} normal modes "
+                    f"for {len(found['frequencies'])} frequencies")
+            self._vibrations = NormalModes(
+                self.vib_get_geom(offsets[-1]),
+                found["frequencies"],
+                displacements,
+                found["reduced_masses"] or None,
+                found["intensities"] or None,
+            )
+        return self._vibrations
+
+    @property
+    def normal_modes(self):
+        """
+        Normal modes of the last vibrational analysis as cartesian
+        displacements, an array of shape (modes, atoms, 3)
+        """
+        if self.vibrations is not None:
+            return self.vibrations.displacements
+
+    @property
+    def reduced_masses(self):
+        """Reduced masses of the normal modes in amu, as an array"""
+        if self.vibrations is not None:
+            return self.vibrations.reduced_masses
+
+    @property
+    def ir_intensities(self):
+        """IR intensities of the normal modes as an array, if printed"""
+        if self.vibrations is not None:
+            return self.vibrations.intensities
+
+    def write_molden(self, filename=None):
+        """
+        Writes the normal modes of the last vibrational analysis to a Molden
+        file, by default the name of the log with .molden in place of its
+        extension. Returns the filename, or None if there are no modes.
+        """
+        if self.vibrations is None:
+            return None
+        if filename is None:
+            filename = os.path.join(self.path, f"{self.basename}.molden")
+        self.vibrations.write_molden(filename)
+        return filename
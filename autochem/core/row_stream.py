@@ -0,0 +1,174 @@
+import csv
+import json
+import os
+import time
+from .utils import COLUMNAR, table_format, write_json
+
+__all__ = ['RowStream']
+
+
+def json_value(value):
+    """Turns numpy scalars and anything else json can't write into plain values"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+class RowStream:
+    """
+    Writes rows of results to a csv file, or a json lines file if the
+    filename ends in .jsonl, as each log is read, rather than keeping every
+    row in memory until the end. Whatever has been written is kept if the
+    scan is interrupted.
+
+    A checkpoint is written next to the output every few seconds, holding the
+    last log whose rows are in the file and the size of the file at that
+    point. If the checkpoint is still there the next time, the scan was
+    interrupted: the output is cut back to that size, and logs up to and
+    including the last one are skipped, so the scan resumes where it
+    stopped. Logs are found in sorted order by `find_files`, so logs added
+    before that point in the meantime are not picked up. The checkpoint is
+    removed once the scan completes, and the next scan starts again.
+
+    Skipping logs only makes sense for the scan that was interrupted, so the
+    checkpoint also holds ``scan``, what the scan was asked for, such as its
+    directory and arguments. A checkpoint of any other scan is not resumed.
+
+    Usage:
+        >>> with RowStream('energies.csv', ('File', 'Energy'), {'root': '.'}) as out:
+        >>>     for log in find_files('.', ('log', 'out')):
+        >>>         if out.done(log):
+        >>>             continue
+        >>>         out.write([(log, energy(log))], log)
+
+    Instances of this class have the following attributes:
+
+    * ``filename`` -- the output
+    * ``columns`` -- the names of the columns, written as the header of a csv
+    * ``checkpoint_file`` -- the checkpoint, the output with .checkpoint added
+    * ``scan`` -- the columns, and anything json can write describing the
+      scan, which must be the same to resume it
+    * ``last`` -- the last log written before resuming, or None
+    * ``rows`` -- number of rows written, including before resuming
+    """
+
+    # seconds between checkpoints
+    interval = 5
+
+    def __init__(self, filename, columns, scan=None):
+        self.filename = filename
+        self.columns = tuple(columns)
+        # as read back from the checkpoint, so that they can be compared
+        self.scan = json.loads(json.dumps({'columns': self.columns, **(scan or {})},
+                                          default=json_value))
+        self.checkpoint_file = f'{filename}.checkpoint'
+        self.json = filename.endswith('.jsonl')
+        if table_format(filename) in COLUMNAR.values():
+            raise ValueError(f'{filename}: rows can only be streamed to csv or .jsonl files')
+        self.last = None
+        self.rows = 0
+        self._last_written = None
+        self._checked = time.time()
+        self._file = None
+        self._writer = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.rows} rows to {self.filename}'
+
+    __str__ = __repr__
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(completed=exc_type is None)
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                checkpoint = json.load(f)
+            return checkpoint['last'], checkpoint['size'], checkpoint['rows'], checkpoint['scan']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def open(self):
+        """
+        Opens the output, resuming from the checkpoint if there is one.
+        Raises ValueError if the checkpoint is of another scan.
+        """
+        checkpoint = self._load_checkpoint()
+        if checkpoint is not None and os.path.isfile(self.filename):
+            self.last, size, self.rows, scan = checkpoint
+            if scan != self.scan:
+                raise ValueError(
+                    f'{self.filename} is from an interrupted scan of {scan}, not {self.scan}. '
+                    f'Repeat that scan to resume it, or remove {self.checkpoint_file} '
+                    'to start again')
+            # anything written after the checkpoint is written again
+            with open(self.filename, 'r+b') as f:
+                f.truncate(size)
+            print(f'Resuming {self.filename} after {self.last}')
+            mode = 'a'
+        else:
+            mode = 'w'
+        self._last_written = self.last
+        # csv files start with a byte order mark, as from write_csv_from_dict
+        encoding = 'utf-8' if self.json else 'utf-8-sig'
+        self._file = open(self.filename, mode, encoding=encoding)
+        if not self.json:
+            self._writer = csv.writer(self._file)
+            if mode == 'w':
+                self._writer.writerow(self.columns)
+        self.checkpoint()
+
+    def done(self, log):
+        """Returns True if the rows of a log were written before resuming"""
+        return self.last is not None and log <= self.last
+
+    def write(self, rows, log=None):
+        """
+        Appends rows to the output, each a sequence of values in the order of
+        ``columns``. `log` is the log the rows came from; pass it once every
+        row of the log is written, even if there were none, so that it isn't
+        read again when resuming.
+        """
+        for row in rows:
+            if self.json:
+                self._file.write(
+                    json.dumps(dict(zip(self.columns, row)), default=json_value) + '\n')
+            else:
+                self._writer.writerow(row)
+            self.rows += 1
+        if log is not None:
+            self._last_written = log
+            if time.time() - self._checked > self.interval:
+                self.checkpoint()
+
+    def checkpoint(self):
+        """Writes the rows so far to disk, and records the last log written"""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        size = os.fstat(self._file.fileno()).st_size
+        checkpoint = {
+            'last': self._last_written,
+            'size': size,
+            'rows': self.rows,
+            'scan': self.scan
+        }
+        write_json(checkpoint, self.checkpoint_file)
+        self._checked = time.time()
+
+    def close(self, completed=True):
+        """
+        Closes the output. Once the scan has completed the checkpoint is
+        removed; otherwise it is kept up to date, so that the next scan
+        resumes.
+        """
+        if self._file is None:
+            return
+        self.checkpoint()
+        self._file.close()
+        self._file = None
+        if completed:
+            os.remove(self.checkpoint_file)
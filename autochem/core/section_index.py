@@ -0,0 +1,65 @@
+import hashlib
+import os
+from .fragment_cache import CACHE_DIR
+from .json_cache import JSONCache
+
+__all__ = ['SectionIndex']
+
+
+INDEX_DIR = os.path.join(CACHE_DIR, 'sections')
+
+
+class SectionIndex(JSONCache):
+    """
+    On-disk index of the byte offsets of section headers in log files, so
+    that reading one section of a large log seeks straight to it instead of
+    reading the log from the start.
+
+    Each log has a small json record in ``directory`` (sections in
+    ~/.autochem_cache by default, or in the AUTOCHEM_CACHE environment
+    variable) of {header: [offset of each line containing the header]},
+    along with the size, modification time and inode of the log. Records
+    of logs that have changed since are ignored.
+
+    Offsets are found and stored by |Results| ``offsets()``.
+
+    Instances of this class have the following attributes:
+
+    * ``directory`` -- where records are kept
+    * ``enabled`` -- set to False to always search logs from scratch
+    * ``hits``, ``misses`` -- number of lookups found and not found
+    """
+
+    def __init__(self, directory=INDEX_DIR):
+        super().__init__(directory)
+
+    @staticmethod
+    def stat(log):
+        """Returns the size, modification time and inode of a file"""
+        st = os.stat(log)
+        return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+    def name(self, log):
+        return hashlib.blake2b(os.path.abspath(log).encode(), digest_size=16).hexdigest()
+
+    def valid(self, log, record):
+        """True if the log hasn't changed since its offsets were stored"""
+        return isinstance(record['offsets'], dict) and record['stat'] == self.stat(log)
+
+    def load(self, log):
+        """
+        Returns the offsets stored for a log as {header: [offsets]}, or an
+        empty dictionary if there are none or the log has changed since
+        """
+        record = super().load(log)
+        return {} if record is None else record['offsets']
+
+    def save(self, log, offsets, stat=None):
+        """
+        Stores the offsets of a log, replacing any stored before, under
+        `stat`, taken before the log was searched, or else the stat of the
+        log now. A log that grows while it is searched is then searched
+        again next time, rather than missing the headers written meanwhile.
+        """
+        stat = self.stat(log) if stat is None else list(stat)
+        super().save(log, {'stat': stat, 'offsets': offsets})
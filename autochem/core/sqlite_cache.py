@@ -0,0 +1,75 @@
+import atexit
+import os
+import sqlite3
+
+__all__ = ['SQLiteCache']
+
+
+class SQLiteCache:
+    """
+    Base class of the SQLite databases that keep results between runs, such
+    as |ResultStore| and |ThermoCache|. The database is opened, and its
+    directory made, the first time it is used. Rows saved are committed in
+    batches, rather than one at a time, and when python exits.
+
+    Subclasses set ``table``, the table emptied by ``clear``, and create
+    their tables in ``create``, calling ``saved`` after each row they write.
+
+    Instances of this class have the following attributes:
+
+    * ``path`` -- the database file
+    * ``enabled`` -- set to False to always work from scratch
+    * ``hits``, ``misses`` -- number of lookups found and not found
+    """
+
+    table = None
+
+    # uncommitted rows are written in batches, rather than one at a time
+    batch_size = 200
+
+    def __init__(self, path):
+        self.path = path
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self._connection = None
+        self._pending = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}: {self.path}, {self.hits} hits, {self.misses} misses'
+
+    __str__ = __repr__
+
+    @property
+    def connection(self):
+        """Connection to the database, creating it if needed"""
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._connection = sqlite3.connect(self.path, timeout=60)
+            self.create(self._connection)
+            atexit.register(self.commit)
+        return self._connection
+
+    def create(self, connection):
+        """Creates the tables of a new database"""
+        raise NotImplementedError
+
+    def saved(self):
+        """Counts a row written, committing once there are `batch_size`"""
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.commit()
+
+    def commit(self):
+        """Writes any rows saved since the last commit to disk"""
+        if self._connection is not None and self._pending:
+            self._connection.commit()
+            self._pending = 0
+
+    def clear(self):
+        """Removes every row from the database"""
+        with self.connection:
+            self.connection.execute(f'DELETE FROM {self.table}')
+        self._pending = 0
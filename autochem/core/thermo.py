@@ -1,12 +1,164 @@
 from .atom import Atom
+from .periodic_table import PeriodicTable as PT
+from .thermo_cache import ThermoCache
 from .utils import read_file, write_csv_from_dict
+import json
+import numpy as np
 import os
 from glob import glob
 import re
 import subprocess
 import sys
 
-__all__ = ['thermo_data', 'freq_data_gamess', 'freq_data_gauss']
+__all__ = [
+    'thermo_data', 'thermo_properties', 'thermo_rows', 'reduced_moment',
+    'temperature_grid', 'freq_data_gamess', 'freq_data_gauss', 'read_rotors'
+]
+
+# bump if anything that changes the results of thermo_properties changes, so
+# that results in THERMO_CACHE are calculated again
+THERMO_VERSION = 2
+
+# thermochemistry already calculated, see |ThermoCache|
+THERMO_CACHE = ThermoCache()
+
+# constants as in thermo.f, so that results agree with it
+KB = 1.380658E-23  # J/K
+R = 8.31441  # J/(mol K)
+H = 6.6260755E-34  # J s
+CLIGHT = 2.99792458E+10  # cm/s
+PA = 101325  # 1 atm in Pa
+AMU = 1.6605402E-27  # kg
+# amu Å² in kg m², from amu bohr² as in thermo.f
+AMU_A2 = 1.66054202E-27 * (5.29177249E-11 / 0.5291772108)**2
+
+# atomic masses from IUPAC used by thermo.f, by atomic number; elements it
+# has no mass for use the masses of |PeriodicTable|
+THERMO_MASSES = np.array([
+    0.0, 1.00794, 4.002602, 6.941, 9.012182, 10.811, 12.0107, 14.0067,
+    15.9994, 18.9984032, 20.1797, 22.989770, 24.3050, 26.981538, 28.0855,
+    30.973761, 32.065, 35.453, 39.948
+] + [0.0] * 13 + [72.64] + [0.0] * 17 + [118.71])
+
+# the compiled thermo.f, built by setup.py
+THERMO_EXE = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'thermo.exe')
+
+# modes below this are low enough to be treated as hindered rotors
+LOW_MODE = 300  # cm-1
+
+# Pitzer's tables for hindered rotors, of H/T and S in cal/(mol K), with a
+# row for each barrier V/RT in PITZER_V and a column for each 1/Q of the
+# free rotor in PITZER_Q
+PITZER_V = np.array([
+    0.0, 0.2, 0.4, 0.6, 0.8, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.5, 5.0, 6.0,
+    7.0, 8.0, 9.0, 10.0, 12.0, 14.0, 16.0, 18.0, 20.0
+])
+PITZER_Q = np.array([
+    0.0, 0.05, 0.10, 0.15, 0.20, 0.25, 0.30, 0.35, 0.40, 0.45, 0.50, 0.55,
+    0.60, 0.65, 0.70, 0.75, 0.80, 0.85, 0.90, 0.95
+])
+
+PITZER_H = np.array([
+    [0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994,
+     0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994, 0.994],
+    [1.1822, 1.142, 1.106, 1.074, 1.05, 1.032, 1.022, 1.015, 1.008, 1.004,
+     1.0, 0.996, 0.994, 0.994, 0.994, 0.992, 0.992, 0.991, 0.99, 0.989],
+    [1.3513, 1.3, 1.249, 1.2, 1.151, 1.106, 1.073, 1.051, 1.036, 1.025,
+     1.015, 1.006, 0.999, 0.994, 0.992, 0.99, 0.988, 0.988, 0.986, 0.985],
+    [1.5011, 1.437, 1.374, 1.311, 1.251, 1.19, 1.138, 1.099, 1.072, 1.049,
+     1.03, 1.014, 1.004, 0.995, 0.99, 0.987, 0.984, 0.982, 0.98, 0.979],
+    [1.6324, 1.556, 1.482, 1.411, 1.34, 1.272, 1.211, 1.157, 1.114, 1.077,
+     1.048, 1.026, 1.009, 0.996, 0.984, 0.98, 0.976, 0.974, 0.972, 0.971],
+    [1.746, 1.66, 1.576, 1.495, 1.418, 1.344, 1.275, 1.211, 1.155, 1.106,
+     1.065, 1.038, 1.014, 0.996, 0.982, 0.972, 0.965, 0.962, 0.96, 0.959],
+    [1.9607, 1.856, 1.753, 1.654, 1.561, 1.472, 1.385, 1.306, 1.23, 1.164,
+     1.103, 1.059, 1.019, 0.987, 0.962, 0.945, 0.932, 0.922, 0.916, 0.915],
+    [2.0934, 1.971, 1.854, 1.742, 1.636, 1.536, 1.44, 1.35, 1.265, 1.19,
+     1.12, 1.057, 1.005, 0.962, 0.928, 0.904, 0.886, 0.873, 0.864, 0.86],
+    [2.1657, 2.031, 1.9, 1.779, 1.662, 1.55, 1.448, 1.351, 1.26, 1.179,
+     1.104, 1.032, 0.972, 0.922, 0.882, 0.85, 0.827, 0.811, 0.801, 0.796],
+    [2.1971, 2.049, 1.909, 1.777, 1.651, 1.535, 1.426, 1.321, 1.224, 1.14,
+     1.06, 0.988, 0.924, 0.87, 0.828, 0.791, 0.763, 0.744, 0.732, 0.728],
+    [2.203, 2.043, 1.893, 1.753, 1.621, 1.497, 1.382, 1.275, 1.176, 1.088,
+     1.006, 0.933, 0.868, 0.811, 0.765, 0.727, 0.697, 0.676, 0.663, 0.659],
+    [2.1944, 2.024, 1.864, 1.715, 1.577, 1.448, 1.329, 1.221, 1.121, 1.03,
+     0.947, 0.872, 0.806, 0.749, 0.701, 0.661, 0.63, 0.609, 0.595, 0.59],
+    [2.1788, 1.998, 1.829, 1.673, 1.529, 1.394, 1.273, 1.162, 1.061, 0.968,
+     0.884, 0.81, 0.744, 0.687, 0.638, 0.599, 0.567, 0.545, 0.531, 0.526],
+    [2.1607, 1.971, 1.794, 1.631, 1.481, 1.344, 1.218, 1.104, 1.002, 0.909,
+     0.824, 0.75, 0.685, 0.628, 0.58, 0.54, 0.508, 0.485, 0.47, 0.465],
+    [2.1261, 1.918, 1.727, 1.552, 1.392, 1.247, 1.115, 0.999, 0.893, 0.799,
+     0.714, 0.644, 0.58, 0.523, 0.476, 0.437, 0.406, 0.383, 0.368, 0.361],
+    [2.0984, 1.875, 1.67, 1.484, 1.315, 1.164, 1.029, 0.908, 0.802, 0.708,
+     0.624, 0.554, 0.491, 0.437, 0.392, 0.354, 0.324, 0.302, 0.286, 0.279],
+    [2.0781, 1.84, 1.623, 1.427, 1.251, 1.095, 0.955, 0.833, 0.725, 0.631,
+     0.549, 0.48, 0.42, 0.368, 0.326, 0.29, 0.261, 0.239, 0.223, 0.215],
+    [2.0634, 1.811, 1.583, 1.379, 1.196, 1.035, 0.892, 0.768, 0.661, 0.569,
+     0.488, 0.421, 0.363, 0.312, 0.273, 0.24, 0.211, 0.191, 0.176, 0.168],
+    [2.0526, 1.787, 1.548, 1.335, 1.147, 0.982, 0.838, 0.715, 0.608, 0.515,
+     0.437, 0.37, 0.314, 0.269, 0.231, 0.2, 0.174, 0.154, 0.14, 0.132],
+    [2.0382, 1.749, 1.492, 1.264, 1.067, 0.896, 0.745, 0.624, 0.519, 0.431,
+     0.356, 0.296, 0.244, 0.202, 0.17, 0.143, 0.121, 0.104, 0.091, 0.084],
+    [2.0292, 1.717, 1.441, 1.202, 0.997, 0.823, 0.672, 0.551, 0.45, 0.365,
+     0.295, 0.24, 0.195, 0.158, 0.127, 0.103, 0.084, 0.072, 0.062, 0.056],
+    [2.0229, 1.69, 1.401, 1.15, 0.937, 0.76, 0.613, 0.493, 0.394, 0.314,
+     0.249, 0.198, 0.157, 0.127, 0.098, 0.076, 0.061, 0.051, 0.044, 0.038],
+    [2.0182, 1.666, 1.363, 1.102, 0.886, 0.707, 0.561, 0.443, 0.347, 0.271,
+     0.211, 0.164, 0.128, 0.099, 0.077, 0.06, 0.047, 0.036, 0.029, 0.026],
+    [2.0147, 1.646, 1.329, 1.061, 0.841, 0.66, 0.515, 0.399, 0.307, 0.236,
+     0.181, 0.138, 0.105, 0.08, 0.061, 0.047, 0.036, 0.028, 0.022, 0.018],
+])
+
+PITZER_S = np.array([
+    [0.0, 6.946, 5.569, 4.763, 4.192, 3.748, 3.386, 3.079, 2.814, 2.58,
+     2.371, 2.182, 2.009, 1.85, 1.703, 1.567, 1.438, 1.316, 1.203, 1.097],
+    [0.0, 6.941, 5.565, 4.759, 4.188, 3.743, 3.382, 3.076, 2.811, 2.578,
+     2.369, 2.18, 2.003, 1.848, 1.701, 1.563, 1.433, 1.312, 1.196, 1.091],
+    [0.0, 6.926, 5.551, 4.745, 4.174, 3.73, 3.37, 3.065, 2.801, 2.568,
+     2.359, 2.17, 1.996, 1.837, 1.691, 1.555, 1.428, 1.307, 1.193, 1.085],
+    [0.0, 6.902, 5.526, 4.72, 4.152, 3.709, 3.347, 3.043, 2.78, 2.547,
+     2.34, 2.151, 1.98, 1.823, 1.677, 1.541, 1.415, 1.295, 1.184, 1.076],
+    [0.0, 6.869, 5.492, 4.688, 4.12, 3.679, 3.318, 3.013, 2.75, 2.519,
+     2.315, 2.125, 1.957, 1.8, 1.654, 1.523, 1.399, 1.284, 1.171, 1.068],
+    [0.0, 6.828, 5.452, 4.648, 4.08, 3.638, 3.279, 2.974, 2.714, 2.485,
+     2.279, 2.094, 1.928, 1.744, 1.629, 1.499, 1.377, 1.262, 1.153, 1.052],
+    [0.0, 6.694, 5.319, 4.515, 3.95, 3.512, 3.156, 2.854, 2.6, 2.376,
+     2.173, 1.997, 1.833, 1.685, 1.552, 1.428, 1.31, 1.201, 1.094, 1.0],
+    [0.0, 6.529, 5.154, 4.353, 3.79, 3.355, 3.004, 2.709, 2.458, 2.241,
+     2.048, 1.874, 1.718, 1.578, 1.45, 1.332, 1.224, 1.122, 1.024, 0.936],
+    [0.0, 6.347, 4.975, 4.178, 3.615, 3.18, 2.836, 2.548, 2.303, 2.091,
+     1.907, 1.739, 1.589, 1.456, 1.335, 1.224, 1.126, 1.031, 0.942, 0.86],
+    [0.0, 6.163, 4.792, 3.995, 3.435, 3.008, 2.667, 2.38, 2.138, 1.933,
+     1.756, 1.576, 1.456, 1.33, 1.217, 1.114, 1.021, 0.936, 0.855, 0.779],
+    [0.0, 5.982, 4.612, 3.819, 3.263, 2.838, 2.5, 2.18, 1.978, 1.782,
+     1.61, 1.458, 1.323, 1.206, 1.1, 1.004, 0.919, 0.841, 0.769, 0.703],
+    [0.0, 5.813, 4.443, 3.652, 3.098, 2.678, 2.343, 2.069, 1.834, 1.643,
+     1.475, 1.328, 1.199, 1.087, 0.988, 0.901, 0.821, 0.748, 0.683, 0.623],
+    [0.0, 5.657, 4.289, 3.498, 2.948, 2.528, 2.199, 1.926, 1.698, 1.511,
+     1.348, 1.209, 1.086, 0.978, 0.884, 0.804, 0.73, 0.662, 0.607, 0.551],
+    [0.0, 5.515, 4.148, 3.359, 2.812, 2.396, 2.068, 1.798, 1.579, 1.392,
+     1.233, 1.097, 0.982, 0.881, 0.794, 0.716, 0.648, 0.588, 0.535, 0.486],
+    [0.0, 5.272, 3.907, 3.12, 2.576, 2.166, 1.844, 1.585, 1.37, 1.192,
+     1.04, 0.915, 0.808, 0.715, 0.637, 0.568, 0.509, 0.457, 0.412, 0.372],
+    [0.0, 5.072, 3.709, 2.926, 2.385, 1.983, 1.665, 1.411, 1.204, 1.033,
+     0.891, 0.774, 0.672, 0.588, 0.516, 0.453, 0.401, 0.357, 0.319, 0.285],
+    [0.0, 4.906, 3.545, 2.765, 2.23, 1.83, 1.519, 1.272, 1.071, 0.906,
+     0.77, 0.66, 0.566, 0.486, 0.422, 0.366, 0.32, 0.281, 0.248, 0.22],
+    [0.0, 4.766, 3.406, 2.629, 2.097, 1.703, 1.397, 1.156, 0.962, 0.804,
+     0.674, 0.57, 0.483, 0.407, 0.35, 0.3, 0.258, 0.223, 0.195, 0.171],
+    [0.0, 4.643, 3.285, 2.511, 1.984, 1.593, 1.295, 1.06, 0.872, 0.719,
+     0.596, 0.496, 0.414, 0.348, 0.293, 0.248, 0.211, 0.18, 0.154, 0.134],
+    [0.0, 4.438, 3.084, 2.316, 1.798, 1.417, 1.125, 0.904, 0.728, 0.588,
+     0.476, 0.388, 0.315, 0.255, 0.213, 0.176, 0.146, 0.122, 0.101, 0.084],
+    [0.0, 4.27, 2.919, 2.156, 1.645, 1.275, 0.994, 0.783, 0.62, 0.492,
+     0.388, 0.309, 0.247, 0.196, 0.157, 0.126, 0.1, 0.084, 0.069, 0.056],
+    [0.0, 4.127, 2.781, 2.023, 1.518, 1.157, 0.89, 0.688, 0.533, 0.414,
+     0.322, 0.251, 0.196, 0.155, 0.119, 0.092, 0.075, 0.059, 0.048, 0.038],
+    [0.0, 4.003, 2.659, 1.908, 1.411, 1.058, 0.801, 0.609, 0.464, 0.353,
+     0.27, 0.205, 0.158, 0.121, 0.093, 0.072, 0.056, 0.042, 0.034, 0.026],
+    [0.0, 3.892, 2.552, 1.807, 1.32, 0.975, 0.727, 0.542, 0.405, 0.303,
+     0.228, 0.17, 0.129, 0.097, 0.073, 0.056, 0.042, 0.032, 0.024, 0.018],
+])
 
 
 def get_filetype(file):
@@ -46,7 +198,7 @@ def thermo_initial_geom_gamess(file):
     """
     Parses GAMESS output for the initial geometry.
     Takes the nuclear coordinates from the 'coord 0 vib 0' run,
-    and converts from Bohrs to angstroms.
+    and converts from Bohrs to angstroms. Returns a list of |Atom|.
     """
     atoms = []
     BOHR_TO_ANG = 0.529177
@@ -61,16 +213,27 @@ def thermo_initial_geom_gamess(file):
             _, sym, x, y, z = line.split()
             x, y, z = map(lambda v: float(v) * BOHR_TO_ANG, (x, y, z))
             atoms.append(Atom(symbol=sym, coords=(x, y, z)))
-    write_geom_input(atoms)
+    return atoms
+
+
+def rots_and_trans(atoms):
+    """
+    Returns the number of rotations and translations of a list of |Atom|:
+    3 for an atom, 5 for a linear molecule and 6 otherwise
+    """
+    if len(atoms) == 1:
+        return 3
+    return 5 if is_linear(atoms) else 6
 
 
-def rm_additional_rots_and_trans(results):
+def rm_additional_rots_and_trans(results, modes):
     """
-    Removes the first 6 rotations and translations, to leave
-    the required 3N vibrations.
+    Removes the rotations and translations, the mode numbers in `modes`,
+    to leave the 3N - 6 (or 3N - 5) vibrations.
     """
+    keep = [mode not in modes for mode in results['Modes']]
     for key, value in results.items():
-        results[key] = value[6:]
+        results[key] = [v for v, k in zip(value, keep) if k]
     return results
 
 
@@ -78,7 +241,8 @@ def thermo_initial_geom_gauss(file):
     """
     Parses Gaussian frequency calculation log file for the initial 
     geometry. Note that coordinates here are stored in .job files by     
-    default. Only works with xyz coordinates, not z-matrices.
+    default. Only works with xyz coordinates, not z-matrices. Returns a
+    list of |Atom|.
     """
     atoms = []
     regex = '\s+[A-z]{1,2}(\s+-?[0-9]+\.[0-9]+){3}'
@@ -93,31 +257,37 @@ def thermo_initial_geom_gauss(file):
             sym, x, y, z = line.split()
             x, y, z = map(float, (x, y, z))
             atoms.append(Atom(symbol=sym, coords=(x, y, z)))
-
-    write_geom_input(atoms)
+    return atoms
 
 
 def freq_data_gamess(file):
-    """Parses GAMESS hessian log files for frequency data"""
+    """
+    Parses GAMESS hessian log files for frequency data. The rotations and
+    translations are the modes GAMESS says it takes as them, or the first 5
+    or 6 modes if it doesn't say.
+    """
     regex = '[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$'
     found_region = False
     modes = []
     freqs = []
     ints = []
-    with open(file, "r") as f:
-        for line in f:
-            if 'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.' in line:
-                found_region = True
-            if line == '\n':
-                found_region = False
-            if found_region:
-                if re.search(regex, line):
-                    mode, vib, *_, intensity = line.split()
-                    mode = int(mode)
-                    vib, intensity = map(float, (vib, intensity))
-                    modes.append(mode)
-                    freqs.append(vib)
-                    ints.append(intensity)
+    rots = None
+    for line in read_file(file):
+        taken = re.search('MODES\s+([0-9]+)\s+TO\s+([0-9]+)\s+ARE TAKEN AS ROTATIONS', line)
+        if taken:
+            rots = range(int(taken.group(1)), int(taken.group(2)) + 1)
+        if 'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.' in line:
+            found_region = True
+        if line == '\n':
+            found_region = False
+        if found_region:
+            if re.search(regex, line):
+                mode, vib, *_, intensity = line.split()
+                mode = int(mode)
+                vib, intensity = map(float, (vib, intensity))
+                modes.append(mode)
+                freqs.append(vib)
+                ints.append(intensity)
 
     results = {
         'Modes': modes,
@@ -125,45 +295,291 @@ def freq_data_gamess(file):
         'Intensities [Debye^2/(amu Å^2)]': ints
     }  # keys used as headers for csv
 
-    results = rm_additional_rots_and_trans(results)
-    write_freq_out_file(results)
+    if rots is None:
+        rots = range(1, rots_and_trans(thermo_initial_geom_gamess(file)) + 1)
+    results = rm_additional_rots_and_trans(results, rots)
     return results
 
 
 def freq_data_gauss(file):
-    """Parses Gaussian frequency log files for frequency data"""
+    """
+    Parses Gaussian frequency log files for frequency data. Gaussian only
+    prints the vibrations, so nothing is removed. The high precision modes of
+    freq=HPModes ('Frequencies ---') are left out, as they repeat the others.
+    """
     freqs = []
     ints = []
-    with open(file, "r") as f:
-        for line in f:
-            if 'Frequencies --' in line:
-                freqs += line.split()[2:]
-            if 'IR Inten    --' in line:
-                ints += line.split()[3:]
+    for line in read_file(file):
+        if line.split()[:2] == ['Frequencies', '--']:
+            freqs += line.split()[2:]
+        if line.split()[:3] == ['IR', 'Inten', '--']:
+            ints += line.split()[3:]
 
     freqs = [float(i) for i in freqs]
     ints = [float(i) for i in ints]
-    modes = [i for i in range(len(freqs))]
+    modes = [i for i in range(1, len(freqs) + 1)]
     results = {
         'Modes': modes,
         'Frequencies [cm-1]': freqs,
         'Intensities [Debye^2/(amu Å^2)]': ints
     }  # keys used as headers for csv
 
-    results = rm_additional_rots_and_trans(results)
-    write_freq_out_file(results)
-
     return results
 
 
-def run(file, mult, temp):
+def thermo_masses(atoms):
+    """Masses of `atoms` in amu, from `THERMO_MASSES` where it has them"""
+    atnums = np.array([atom.atnum for atom in atoms], dtype=int)
+    masses = np.zeros(len(atnums))
+    known = atnums < len(THERMO_MASSES)
+    masses[known] = THERMO_MASSES[atnums[known]]
+    missing = masses == 0
+    masses[missing] = PT.masses[atnums[missing]]
+    return masses
+
+
+def moments_of_inertia(coords, masses):
+    """
+    Principal moments of inertia in amu Å², smallest first, of atoms at
+    `coords` in Å
+    """
+    centred = coords - masses @ coords / masses.sum()
+    tensor = -np.einsum('i,ij,ik->jk', masses, centred, centred)
+    tensor[np.diag_indices(3)] += masses @ (centred**2).sum(axis=1)
+    return np.linalg.eigvalsh(tensor)
+
+
+def is_linear(atoms):
+    """
+    True if a list of |Atom| is linear, when its smallest moment of inertia
+    is next to nothing
+    """
+    coords = np.array([atom.coords for atom in atoms], dtype=float)
+    moments = moments_of_inertia(coords, thermo_masses(atoms))
+    return len(atoms) <= 2 or moments[0] < 1e-4 * moments[2]
+
+
+def reduced_moment(atoms, top):
+    """
+    Reduced moment of inertia I(2,3) in amu Å² for the internal rotation of
+    the atoms at the indices `top` (counting from 0) against the rest of the
+    molecule, about the axis through the centres of mass of both, as
+    calculated by thermo.f.
+
+    >>> reduced_moment(ethane.atoms, [0, 1, 2, 3])
+    """
+    coords = np.array([atom.coords for atom in atoms], dtype=float)
+    masses = thermo_masses(atoms)
+    in_top = np.zeros(len(atoms), dtype=bool)
+    in_top[list(top)] = True
+    if in_top.all() or not in_top.any():
+        raise ValueError('wrong number of the rotating fragments')
+    fragments = (in_top, ~in_top)
+    centres = [masses[f] @ coords[f] / masses[f].sum() for f in fragments]
+    axis = centres[1] - centres[0]
+    axis /= np.linalg.norm(axis)
+    moments = []
+    for f, centre in zip(fragments, centres):
+        r = coords[f] - centre
+        perpendicular = r - np.outer(r @ axis, axis)
+        moments.append(masses[f] @ (perpendicular**2).sum(axis=1))
+    if min(moments) < 1e-8:
+        raise ValueError('a rotating fragment has no moment of inertia about the axis')
+    return 1 / (1 / moments[0] + 1 / moments[1])
+
+
+def hindered_rotor(moment, symmetry, barrier, temp):
+    """
+    Returns the thermal correction in kJ/mol and entropy in J/(mol K) of a
+    hindered rotor with reduced moment of inertia `moment` in amu Å²,
+    internal symmetry number `symmetry` and rotational barrier `barrier` in
+    kJ/mol, interpolated from Pitzer's tables.
+    """
+    # partition function of the free rotor
+    q = np.sqrt(8 * np.pi**3 * moment * AMU * 1e-20 * KB * temp) / (symmetry * H)
+    v = barrier * 1000 / (R * temp)
+    i = np.clip(np.searchsorted(PITZER_Q, 1 / q, side='right') - 1, 0,
+                len(PITZER_Q) - 2)
+    j = np.clip(np.searchsorted(PITZER_V, v, side='right') - 1, 0,
+                len(PITZER_V) - 2)
+    t = (1 / q - PITZER_Q[i]) / (PITZER_Q[i + 1] - PITZER_Q[i])
+    u = (v - PITZER_V[j]) / (PITZER_V[j + 1] - PITZER_V[j])
+
+    def interpolate(table):
+        return ((1 - t) * (1 - u) * table[j, i] + t * (1 - u) * table[j, i + 1] +
+                t * u * table[j + 1, i + 1] + (1 - t) * u * table[j + 1, i])
+
+    # the tables are in calories
+    return temp * 4.184 * interpolate(PITZER_H) / 1000, 4.184 * interpolate(PITZER_S)
+
+
+def thermo_properties(freqs, atoms, mult, temp, rotors=None, sqrt_pi=False):
+    """
+    Calculates the thermochemistry of a molecule from its vibrational
+    frequencies in cm⁻¹, as a list of |Atom| at its geometry, its
+    multiplicity and the temperature in K, at 1 atm. `temp` can also be an
+    array of temperatures, in which case every value returned is an array
+    over them, calculated at once for every mode. This is the calculation
+    of thermo.f, with the same constants, masses and unscaled frequencies,
+    using harmonic oscillators for vibrations, a rigid rotor with a
+    rotational symmetry number of 1, and an ideal gas. Imaginary modes
+    (frequencies of zero or less) are left out.
+
+    thermo.f loses the factor of √π in the rotational partition function of
+    nonlinear molecules to a line past column 72, and by default S rot is
+    calculated the same way, to agree with it. With `sqrt_pi` the factor is
+    included, so S rot and S tot are R ln √π (4.75887 J/(mol K)) higher.
+    Linear molecules use the partition function of a linear rotor, rather
+    than dividing by their zero moment of inertia.
+
+    Returns a dictionary of ZPVE, TC (thermal correction) and TC - TS in
+    kJ/mol, and S elec, S trans, S rot, S vib and S tot in J/(mol K).
+
+    At frequencies below 300 cm⁻¹ harmonic oscillators are poor descriptions
+    of internal rotations. Those to treat as hindered rotors are passed in
+    `rotors`, as {index of the mode in `freqs`: (top, symmetry, barrier)},
+    where top is the indices of the atoms rotating against the rest (see
+    `reduced_moment`), symmetry is the internal symmetry number of the
+    rotation and barrier is the rotational barrier in kJ/mol. The results
+    then also include TC HR, S vib HR and S tot HR, which replace those modes
+    with hindered rotors.
+
+    >>> thermo_properties([1600.1, 3800.2, 3900.3], water.atoms, 1, 298.15)
+    >>> thermo_properties([1600.1, 3800.2, 3900.3], water.atoms, 1, np.arange(200, 405, 5))
+    >>> thermo_properties(freqs, ethane.atoms, 1, 298.15, rotors={0: ([0, 1, 2, 3], 3, 12.0)})
+    """
+    freqs = np.asarray(freqs, dtype=float)
+    temp = np.asarray(temp, dtype=float)
+    if len(atoms) == 0 or len(freqs) == 0:
+        raise ValueError('No frequencies or geometry found')
+    rotors = rotors or {}
+    # imaginary modes come first
+    imaginary = np.count_nonzero(freqs <= 0)
+    theta = freqs[imaginary:] * CLIGHT * H / KB
+    # modes x temperatures
+    x = np.divide.outer(theta, temp)
+    theta = theta.reshape(theta.shape + (1, ) * temp.ndim)
+    with np.errstate(over='ignore'):
+        h_vib = R * theta / np.expm1(x) / 1000
+        s_vib = R * (x / np.expm1(x) - np.log(-np.expm1(-x)))
+    zpve = R * theta.sum() / 2 / 1000
+
+    coords = np.array([atom.coords for atom in atoms], dtype=float)
+    masses = thermo_masses(atoms)
+    moments = moments_of_inertia(coords, masses)
+    linear = is_linear(atoms)
+
+    q_trans = (2 * np.pi * masses.sum() * AMU * KB * temp / H**2)**1.5 * KB * temp / PA
+    s_trans = R * (np.log(q_trans) + 2.5)
+    s_elec = R * np.log(mult)
+    theta_rot = H**2 / (8 * np.pi**2 * KB * moments * AMU_A2)
+    if len(atoms) == 1:
+        tc_rot = s_rot = 0.0
+    elif linear:
+        tc_rot = R * temp / 1000
+        s_rot = R * (np.log(temp / theta_rot[2]) + 1)
+    else:
+        tc_rot = 1.5 * R * temp / 1000
+        s_rot = R * (np.log(np.sqrt(temp**3 / theta_rot.prod())) + 1.5)
+        if sqrt_pi:
+            s_rot = s_rot + R * np.log(np.sqrt(np.pi))
+
+    tc = h_vib.sum(axis=0) + 2.5 * R * temp / 1000 + tc_rot
+    s_tot = s_trans + s_elec + s_rot + s_vib.sum(axis=0)
+    data = {
+        'ZPVE': zpve,
+        'TC': tc,
+        'S elec': s_elec,
+        'S trans': s_trans,
+        'S rot': s_rot,
+        'S vib': s_vib.sum(axis=0),
+        'S tot': s_tot,
+        'TC - TS': tc - temp * s_tot / 1000
+    }
+    if rotors:
+        h_hr = 0.0
+        s_hr = 0.0
+        for mode, (top, symmetry, barrier) in rotors.items():
+            if not 0 < freqs[mode] <= LOW_MODE:
+                raise ValueError(
+                    f'Mode {mode} at {freqs[mode]} cm⁻¹ is not a real mode below {LOW_MODE} cm⁻¹')
+            h_rotor, s_rotor = hindered_rotor(reduced_moment(atoms, top),
+                                              symmetry, barrier, temp)
+            h_hr = h_hr + h_rotor - h_vib[mode - imaginary]
+            s_hr = s_hr + s_rotor - s_vib[mode - imaginary]
+        data['TC HR'] = tc + h_hr
+        data['S vib HR'] = s_vib.sum(axis=0) + s_hr
+        data['S tot HR'] = s_tot + s_hr
+    if temp.ndim == 0:
+        return {k: float(v) for k, v in data.items()}
+    return {k: np.broadcast_to(v, temp.shape) for k, v in data.items()}
+
+
+def temperature_grid(temp):
+    """
+    Returns temperatures in K as an array, from a number, a sequence of
+    numbers, or a string of one temperature, temperatures separated by
+    commas, or a range start:stop:step that includes both ends.
+
+    >>> temperature_grid('200:400:5')
+    >>> temperature_grid('298.15,310')
+    """
+    if isinstance(temp, str):
+        if ':' in temp:
+            try:
+                start, stop, step = map(float, temp.split(':'))
+            except ValueError:
+                raise ValueError(f'{temp} is not a range of temperatures start:stop:step')
+            if step <= 0 or stop < start:
+                raise ValueError(f'{temp} is not a range of temperatures start:stop:step')
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            # rounded so that the steps don't collect floating point errors
+            return np.round(start + step * np.arange(count), 6)
+    try:
+        temps = np.atleast_1d(
+            np.asarray(temp.split(',') if isinstance(temp, str) else temp, dtype=float))
+    except ValueError:
+        temps = np.zeros(0)
+    if temps.ndim != 1 or len(temps) == 0 or (temps <= 0).any():
+        raise ValueError(f'{temp} is not a list of temperatures above 0 K')
+    return temps
+
+
+def read_rotors(file):
     """
-    Calls thermo.exe with geom.input and freq.out written to the same 
-    directory.
+    Reads the hindered rotors of several logs from a json file of
+    {log: {mode: [top, symmetry, barrier]}}, as `rotors` of
+    `thermo_properties` for each log, where mode counts from 0 over the
+    vibrations, lowest first.
+
+    >>> read_rotors('rotors.json')
+    {'ethane.log': {0: ([0, 2, 3, 4], 3, 12.0)}}
+    """
+    try:
+        with open(file) as f:
+            logs = json.load(f)
+    except (OSError, json.JSONDecodeError) as error:
+        raise ValueError(f'Could not read hindered rotors from {file}: {error}')
+    rotors = {}
+    try:
+        for log, modes in logs.items():
+            rotors[log] = {
+                int(mode): ([int(i) for i in top], int(symmetry), float(barrier))
+                for mode, (top, symmetry, barrier) in modes.items()
+            }
+    except (AttributeError, TypeError, ValueError):
+        raise ValueError(
+            f'{file} should be {{log: {{mode: [top, symmetry, barrier]}}}}, '
+            'i.e. {"ethane.log": {"0": [[0, 2, 3, 4], 3, 12.0]}}')
+    return rotors
+
+
+def run(file, mult, temp, exe=THERMO_EXE):
     """
-    thermo_exe = os.path.join(os.path.dirname(os.path.realpath(__file__)),
-                              'thermo.exe')
-    p = subprocess.Popen(thermo_exe,
+    Calls thermo.exe, or another build of thermo.f at `exe`, with geom.input
+    and freq.out written to the same directory.
+    """
+    p = subprocess.Popen(exe,
                          shell=True,
                          stdin=subprocess.PIPE,
                          stdout=subprocess.PIPE,
@@ -205,31 +621,102 @@ def cleanup():
     os.system('rm fort.10 moments geom.input freq.out')
 
 
-def setup_and_run_fortran_script(file, mult, temp):
+def read_thermo_input(file):
     """
-    Runs fortran script to produce 'fort.10' files etc...
+    Returns the vibrational frequencies and the geometry as a list of |Atom|
+    of a GAMESS hessian or Gaussian frequency log file
     """
     filetype = get_filetype(file)
     if filetype == 'gamess':
-        thermo_initial_geom_gamess(file)
-        freq_data_gamess(file)
-        run(file, mult, temp)
-    if filetype == 'gauss':
-        thermo_initial_geom_gauss(file)
-        freq_data_gauss(file)
-        run(file, mult, temp)
+        atoms = thermo_initial_geom_gamess(file)
+        freqs = freq_data_gamess(file)
+    elif filetype == 'gauss':
+        atoms = thermo_initial_geom_gauss(file)
+        freqs = freq_data_gauss(file)
+    else:
+        raise ValueError(f'{file} is not a GAMESS or Gaussian log file')
+    return freqs['Frequencies [cm-1]'], atoms
+
+
+def thermo_input_record(file):
+    """
+    `read_thermo_input` as a dictionary of lists, that can be stored as json
+    by |ResultStore|. Pass it to `thermo_rows` as thermo_rows(**record, ...)
+    """
+    freqs, atoms = read_thermo_input(file)
+    return {
+        'freqs': [float(freq) for freq in freqs],
+        'atoms': [[atom.symbol, *map(float, atom.coords)] for atom in atoms]
+    }
+
+
+def setup_and_run_fortran_script(file, mult, temp, exe=THERMO_EXE):
+    """
+    Runs fortran script to produce 'fort.10' files etc...
+    """
+    freqs, atoms = read_thermo_input(file)
+    write_geom_input(atoms)
+    write_freq_out_file({'Frequencies [cm-1]': freqs})
+    run(file, mult, temp, exe)
 
 
-def thermo_data(file, mult, temp):
+def thermo_data_fortran(file, mult, temp, exe=THERMO_EXE):
     """
-    Uses a fortran script to produce thermochemical data for GAMESS 
-    Hessian calculations and GAUSSIAN frequency calculations- the results 
-    produced in the GAMESS files have been shown to be 
-    inaccurate. At < 300 cm⁻¹, rigid rotor fails, and the fortran code 
-    implements hindered rotor.
+    `thermo_data` from thermo.exe, the compiled thermo.f (or the build of it
+    at `exe`), which writes its input and output to the working directory.
+    Kept to check `thermo_properties` against.
     """
-    setup_and_run_fortran_script(file, mult, temp)
+    setup_and_run_fortran_script(file, str(mult), str(temp), exe)
     fort = read_fort()
     data = grep_data(fort)
     cleanup()
     return data
+
+
+def thermo_data(file, mult, temp, rotors=None, sqrt_pi=False):
+    """
+    Produces thermochemical data for GAMESS Hessian calculations and
+    GAUSSIAN frequency calculations- the results produced in the GAMESS
+    files have been shown to be inaccurate. See `thermo_properties`; at
+    < 300 cm⁻¹ rigid rotor fails, and modes can be treated as hindered
+    rotors with `rotors`, and the √π thermo.f leaves out of S rot included
+    with `sqrt_pi`.
+
+    Values are strings with 5 decimals, as written by thermo.f. If `temp` is
+    several temperatures (see `temperature_grid`), the log is read once and a
+    list is returned, with the data at each temperature in turn.
+
+    >>> thermo_data('water.log', 1, 298.15)
+    >>> thermo_data('water.log', 1, '200:400:5')
+    """
+    freqs, atoms = read_thermo_input(file)
+    rows = thermo_rows(freqs, atoms, mult, temp, rotors, sqrt_pi=sqrt_pi)
+    if np.ndim(temp) == 0 and len(rows) == 1:
+        return rows[0]
+    return rows
+
+
+def thermo_rows(freqs, atoms, mult, temp, rotors=None, cache=None, sqrt_pi=False):
+    """
+    Returns a list of the results of `thermo_properties` at each temperature
+    in `temp` (see `temperature_grid`), with values as strings with 5
+    decimals. `atoms` is a list of |Atom|, or of [symbol, x, y, z]. See
+    `thermo_properties` for `rotors` and `sqrt_pi`.
+
+    Results are taken from `cache` (THERMO_CACHE by default) if the same
+    molecule has been calculated at the same temperatures before.
+    """
+    if cache is None:
+        cache = THERMO_CACHE
+    temps = temperature_grid(temp)
+    atoms = [
+        atom if isinstance(atom, Atom) else Atom(symbol=atom[0], coords=atom[1:])
+        for atom in atoms
+    ]
+    key = cache.key(freqs, atoms, mult, temps, rotors, sqrt_pi, version=THERMO_VERSION)
+    data = cache.load(key)
+    if data is None:
+        data = thermo_properties(freqs, atoms, int(mult), temps, rotors, sqrt_pi)
+        data = {k: [float(x) for x in v] for k, v in data.items()}
+        cache.save(key, data)
+    return [{k: f'{v[i]:.5f}' for k, v in data.items()} for i in range(len(temps))]
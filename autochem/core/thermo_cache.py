@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import numpy as np
+from .fragment_cache import CACHE_DIR
+from .sqlite_cache import SQLiteCache
+
+__all__ = ['ThermoCache']
+
+
+CACHE_FILE = os.path.join(CACHE_DIR, 'thermo.sqlite')
+
+
+class ThermoCache(SQLiteCache):
+    """
+    SQLite database of thermochemistry already calculated, so that analysing
+    the same hessians again is a lookup.
+
+    Results are stored under a hash of everything they depend on: the
+    frequencies, atomic numbers and coordinates, the multiplicity, the
+    temperatures, any hindered rotors, whether S rot includes √π and the
+    version of the calculation (`THERMO_VERSION` in thermo.py). Any change
+    to one of those misses the cache, so results never need to be
+    invalidated by hand.
+
+    Usage:
+        >>> cache = ThermoCache()
+        >>> key = cache.key(freqs, atoms, 1, [298.15], version=THERMO_VERSION)
+        >>> cache.load(key)
+
+    Instances of this class have the following attributes:
+
+    * ``path`` -- the database file (thermo.sqlite in ~/.autochem_cache, or
+      the AUTOCHEM_CACHE environment variable)
+    * ``enabled`` -- set to False to always calculate from scratch
+    * ``hits``, ``misses`` -- number of lookups found and not found
+    """
+
+    table = 'thermo'
+
+    def __init__(self, path=CACHE_FILE):
+        super().__init__(path)
+
+    def create(self, connection):
+        """Creates the thermo table"""
+        connection.execute('CREATE TABLE IF NOT EXISTS thermo (key TEXT PRIMARY KEY, data TEXT)')
+
+    @staticmethod
+    def key(freqs, atoms, mult, temps, rotors=None, sqrt_pi=False, version=None):
+        """
+        Returns the hash identifying the thermochemistry of a molecule, from
+        its frequencies and list of |Atom|, and the arguments of
+        `thermo_properties`
+        """
+        if rotors:
+            rotors = sorted((int(mode), tuple(int(i) for i in top), int(symmetry), float(barrier))
+                            for mode, (top, symmetry, barrier) in rotors.items())
+        h = hashlib.blake2b(digest_size=16)
+        h.update(np.ascontiguousarray(freqs, dtype=float).tobytes())
+        h.update(np.array([atom.atnum for atom in atoms], dtype=np.int64).tobytes())
+        h.update(np.array([atom.coords for atom in atoms], dtype=float).tobytes())
+        h.update(np.ascontiguousarray(temps, dtype=float).tobytes())
+        h.update(repr((int(mult), rotors or None, bool(sqrt_pi), version)).encode())
+        return h.hexdigest()
+
+    def load(self, key):
+        """Returns the results stored under a key, or None"""
+        if not self.enabled:
+            return None
+        row = self.connection.execute('SELECT data FROM thermo WHERE key = ?',
+                                      (key, )).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def save(self, key, data):
+        """Stores results, a dictionary of numbers or lists, under a key"""
+        if not self.enabled:
+            return
+        self.connection.execute('INSERT OR REPLACE INTO thermo VALUES (?, ?)',
+                                (key, json.dumps(data)))
+        self.saved()
@@ -1,34 +1,53 @@
+import collections
 import csv
+import fnmatch
+import io
+import itertools
+import json
+import numpy as np
 import os
 import pandas as pd
 import re
 import sys
 import time
 from .atom import Atom
+from .manifest import TreeManifest
 from .periodic_table import PeriodicTable as PT
 
 __all__ = [
     "assign_molecules_from_dict_keys",
     "cd",
     "check_user_input",
+    "compression",
     "consecutive",
     "df_from_namedtuples",
     "eof",
+    "find_files",
     "get_files",
     "get_log_type",
     "list_of_dicts_to_one_level_dict",
     "module_exists",
+    "open_log",
+    "pool_map",
+    "prefetch",
     "read_file",
+    "read_backwards",
+    "read_table",
+    "read_header",
     "read_xyz",
     "remove_nones_from_dict",
+    "report_errors",
     "responsive_table",
     "search_dict_recursively",
     "sort_data",
     "sort_elements",
+    "strip_compression",
     "timeit",
     "write_csv_from_dict",
     "write_csv_from_nested",
+    "write_frame",
     "write_geom_input_for_thermo",
+    "write_json",
     "write_xyz",
 ]
 
@@ -78,17 +97,79 @@ def timeit(method):
     return timed
 
 
+# module that decompresses files with each extension. zstandard isn't part
+# of the standard library, so is only needed for .zst files
+COMPRESSION = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "lzma",
+    ".lzma": "lzma",
+    ".zst": "zstandard",
+}
+
+
+def compression(file):
+    """Returns the extension of a compressed file, such as '.gz', or None"""
+    for ext in COMPRESSION:
+        if file.endswith(ext):
+            return ext
+    return None
+
+
+def strip_compression(file):
+    """
+    Returns the name of a file without any compression extension, so that
+    both water.log and water.log.gz give water.log
+    """
+    ext = compression(file)
+    return file if ext is None else file[:-len(ext)]
+
+
+def open_log(file, mode="rb", errors=None):
+    """
+    Opens a file for reading, in bytes or in text with mode="r". Compressed
+    files (see COMPRESSION) are decompressed as they are read, so they never
+    need to be decompressed on disk. They can only be read forwards, and
+    seeking to a position decompresses everything before it.
+    """
+    ext = compression(file)
+    if ext is None:
+        return open(file, mode, errors=errors)
+    if ext == ".zst":
+        if not module_exists("zstandard"):
+            raise ValueError(f"{file}: install zstandard to read .zst files")
+        import zstandard
+        stream = zstandard.open(file, "rb")
+    else:
+        import importlib
+        stream = importlib.import_module(COMPRESSION[ext]).open(file, "rb")
+    if "b" in mode:
+        return stream
+    return io.TextIOWrapper(stream, errors=errors)
+
+
 def read_file(file):
-    with open(file, "r") as f:
-        try:
-            for line in f:
-                yield line
-        except UnicodeDecodeError:
-            pass
+    """
+    Yields the lines of a file one at a time, decompressing it if needed.
+    Bytes that aren't valid text are replaced, so that one bad character
+    doesn't end the file early.
+    """
+    with open_log(file, "r", errors="replace") as f:
+        for line in f:
+            yield line
+
+
+def read_header(file, size=32768):
+    """
+    Returns the first `size` bytes of a file as text, without reading the
+    rest of the file. Bytes that aren't valid text are dropped.
+    """
+    with open_log(file) as f:
+        return f.read(size).decode("utf-8", errors="ignore")
 
 
 def get_log_type(file):
-    for line in read_file(file):
+    for line in read_header(file).splitlines():
         if "PSI4" in line:
             return "psi4"
         elif "GAMESS" in line:
@@ -138,10 +219,110 @@ def write_xyz(atoms, filename=None):
                     )
 
 
-def get_files(directory, ext, filepath_includes=None):
+def glob_matcher(patterns):
+    """
+    Returns one compiled regex matching any of a list of glob patterns, or
+    None if there are none
+    """
+    if not patterns:
+        return None
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns))
+
+
+def find_files(directory,
+               ext,
+               filepath_includes=None,
+               compressed=False,
+               depth=None,
+               prune=(),
+               include=(),
+               exclude=(),
+               manifest=True):
+    """
+    Yields the files in a directory and its subdirectories with any of a
+    tuple of extensions, as paths starting with the directory, in sorted
+    order. Files are yielded as they are found, so they can be read while
+    the rest of the tree is searched. See `get_files` for a list.
+
+    * ``filepath_includes`` -- only files with this string in their path
+    * ``compressed`` -- also find compressed files such as water.log.gz
+    * ``depth`` -- how many levels of subdirectories to search, where 0 only
+      searches the directory itself. All levels by default
+    * ``prune`` -- glob patterns of names of directories not to search, such
+      as ['rerun', 'cp-hf', 'scratch*']
+    * ``include``, ``exclude`` -- glob patterns of paths, relative to the
+      directory, to keep or leave out, such as '*spec/*'
+    * ``manifest`` -- a |TreeManifest| to list directories with. By default
+      the manifest at the top of the directory is used and updated, so that
+      only directories that have changed since the last search are listed.
+      False lists every directory
+
+    Usage:
+        >>> for log in find_files('.', ('log', 'out'), depth=1, prune=['rerun']):
+        >>>     parse_file(log)
+    """
+    extension = re.compile("(?:" + "|".join(ext) + ")$")
+    prune = glob_matcher(prune)
+    include = glob_matcher(include)
+    exclude = glob_matcher(exclude)
+
+    def wanted(path, name):
+        if compressed:
+            name = strip_compression(name)
+        # freq.out used for thermo calculations with the fortran code
+        if not extension.search(name) or name == "freq.out":
+            return False
+        if filepath_includes is not None and not any(
+                filepath_includes in string for string in (path, name)):
+            return False
+        relative = os.path.relpath(os.path.join(path, name), directory)
+        if include is not None and not include.match(relative):
+            return False
+        return exclude is None or not exclude.match(relative)
+
+    if manifest is True:
+        manifest = TreeManifest(directory)
+    elif not manifest:
+        manifest = TreeManifest(directory)
+        manifest.enabled = False
+
+    def walk(path, level):
+        try:
+            files, dirs = manifest.listdir(path)
+        except OSError:
+            return
+        # sorting directories as if followed by a slash gives the same order
+        # as sorting every path found
+        keyed = [(name, False) for name in files]
+        keyed += [(name + "/", True) for name in dirs]
+        for name, is_dir in sorted(keyed):
+            if not is_dir:
+                if wanted(path, name):
+                    yield os.path.join(path, name)
+            elif depth is not None and level >= depth:
+                continue
+            elif prune is None or not prune.match(name[:-1]):
+                yield from walk(os.path.join(path, name[:-1]), level + 1)
+
+    def search():
+        try:
+            yield from walk(directory, 0)
+        finally:
+            manifest.save()
+
+    return search()
+
+
+def get_files(directory, ext, filepath_includes=None, compressed=False, **search):
     """
     Accepts a tuple of file extensions, searches in all subdirectories of the directory given for relevant files. Returns a list of
     files with their relative path to the directory passed in.
+    With `compressed=True`, compressed files such as water.log.gz are found
+    as well, for the functions that read them with `open_log`.
+    The search can be limited with the `depth`, `prune`, `include` and
+    `exclude` arguments of `find_files`.
 
     Usage:
         >>> for filepath in get_files('.', ("log", "out")):
@@ -153,21 +334,8 @@ def get_files(directory, ext, filepath_includes=None):
         >>> for filepath in get_files('.', ("log", "out"), filepath_includes='spec'):
         >>>     parse_file(filepath)
     """
-    import os
-
-    file_list = []
-    for path, _, files in os.walk(directory):
-        for file in files:
-            for e in ext:
-                if re.search(f"{e}$", file) and file != "freq.out":
-                    # freq.out used for thermo calculations
-                    # with the fortran code
-                    if filepath_includes is not None:
-                        if any(filepath_includes in string for string in (path, file)):
-                            file_list.append(os.path.join(path, file))
-                    else:
-                        file_list.append(os.path.join(path, file))
-    return sorted(file_list)
+    return list(
+        find_files(directory, ext, filepath_includes, compressed, **search))
 
 
 def module_exists(module_name):
@@ -179,6 +347,149 @@ def module_exists(module_name):
         return True
 
 
+def call_catching_errors(function, args):
+    """
+    Returns (function(*args), None), or (None, error) if the call raised an
+    exception, where error is the type and message of the exception
+    """
+    try:
+        return function(*args), None
+    except Exception as error:
+        return None, f"{error.__class__.__name__}: {error}"
+
+
+def pool_map(function, arguments, workers=1):
+    """
+    Calls function(*args) for each tuple of args, returning a list of
+    (result, error) in the same order as the arguments- error is None if
+    the call succeeded, otherwise result is None. An error in one call
+    doesn't stop the others.
+
+    With more than one worker, the calls are shared between a pool of
+    processes, so `function` must be defined at module level.
+
+    `arguments` can also be a generator, in which case each call is started
+    as soon as its arguments are yielded. Arguments are only taken from the
+    generator as workers are free for them, so that the generator, such as
+    `prefetch`, never gets far ahead of the pool.
+
+    >>> pool_map(divmod, [(7, 2), (1, 0)], workers=2)
+    [((3, 1), None), (None, 'ZeroDivisionError: integer division or modulo by zero')]
+    """
+    if workers is None or workers <= 1:
+        return [call_catching_errors(function, args) for args in arguments]
+    from concurrent.futures import ProcessPoolExecutor
+    if not hasattr(arguments, "__len__"):
+        results = []
+        running = collections.deque()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for args in arguments:
+                # one call waiting for each worker, so none are left idle
+                if len(running) >= 2 * workers:
+                    results.append(running.popleft().result())
+                running.append(pool.submit(call_catching_errors, function, args))
+            results.extend(call.result() for call in running)
+        return results
+    if len(arguments) <= 1:
+        return [call_catching_errors(function, args) for args in arguments]
+    workers = min(workers, len(arguments))
+    # a few chunks per worker keeps them all busy without sending every
+    # call separately
+    chunksize = max(1, len(arguments) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(call_catching_errors, itertools.repeat(function),
+                     arguments, chunksize=chunksize))
+
+
+# bytes of files read ahead by `prefetch` that have not been used yet
+PREFETCH_BUDGET = 256 * 2**20
+
+
+def read_ahead(file, budget=PREFETCH_BUDGET, block_size=2**20):
+    """
+    Reads a file so that reading it again is served from memory, returning
+    the number of bytes read. Files larger than `budget` only have their
+    first and last blocks read, which is where the program and whether the
+    calculation completed are found. The data itself is thrown away.
+    """
+    read = 0
+    try:
+        with open(file, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if size > budget:
+                read += len(f.read(block_size))
+                f.seek(max(read, size - block_size))
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                read += len(block)
+    except OSError:
+        # the file is read again later, which reports the error
+        pass
+    return read
+
+
+def prefetch(items, threads=4, budget=PREFETCH_BUDGET, key=None):
+    """
+    Yields each of `items` in order, after reading it ahead on a pool of
+    `threads` threads, so that waiting on slow storage such as a network
+    filesystem overlaps with whatever is done with the previous items.
+    `key(item)` gives the file to read for each item, by default the item
+    itself, or None for items that don't need reading.
+
+    Reading carries on ahead of the items yielded until `budget` bytes are
+    read but not yet used, or until the next item is ready. The data read is
+    kept by the operating system's page cache rather than in python, so it
+    is found again by other processes, like the workers of `pool_map`.
+    With no threads, items are yielded without reading ahead.
+
+    Usage:
+        >>> for log in prefetch(find_files('.', ('log', 'out')), threads=8):
+        >>>     parse_file(log)
+    """
+    if not threads or threads <= 0:
+        yield from items
+        return
+    from concurrent.futures import Future, ThreadPoolExecutor
+    reading = collections.deque()
+
+    def ahead():
+        return sum(read.result() for _, read in reading if read.done())
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        for item in items:
+            file = item if key is None else key(item)
+            if file is None:
+                read = Future()
+                read.set_result(0)
+            else:
+                read = pool.submit(read_ahead, file, budget)
+            reading.append((item, read))
+            # hand over items that are ready, and the oldest ones while too
+            # much has been read ahead
+            while reading and (reading[0][1].done() or
+                               len(reading) > 4 * threads or
+                               ahead() > budget):
+                item, read = reading.popleft()
+                read.result()
+                yield item
+        for item, read in reading:
+            read.result()
+            yield item
+
+
+def report_errors(errors):
+    """Prints a list of (file, error) for files that could not be read"""
+    if len(errors) == 0:
+        return
+    print(f"\n{len(errors)} file(s) could not be read:")
+    for file, error in errors:
+        print(f"    {file}: {error}")
+    print()
+
+
 def sort_elements(lst):
     """
     Sort a list of |Atom| objects by atomic number. 
@@ -229,8 +540,98 @@ def list_of_dicts_to_one_level_dict(lst):
     return output
 
 
+# tables written in a columnar format, by extension, with the pandas method
+# writing them
+COLUMNAR = {".parquet": "parquet", ".pq": "parquet", ".feather": "feather"}
+
+
+def table_format(filename):
+    """
+    Returns the format of a table from its extension: "csv", "parquet" or
+    "feather", or None for any other file
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == ".csv":
+        return "csv"
+    return COLUMNAR.get(ext)
+
+
+def is_table_name(filename):
+    return table_format(filename) is not None
+
+
+TABLE_NAME_ERROR = "Please give a filename ending in '.csv', '.parquet' or '.feather'"
+
+
+def typed_frame(df):
+    """
+    Returns a DataFrame with text columns of numbers, where "NA" marks
+    missing values, as float or integer columns, with NaN for "NA". Text
+    columns that mostly repeat, like the path of each atom in a table of
+    charges, become categories, which are stored and read once per value.
+    """
+    df = df.copy()
+    for column in df.columns:
+        if df[column].dtype == "category" or pd.api.types.is_numeric_dtype(df[column]):
+            continue
+        values = df[column].replace({"NA": np.nan, None: np.nan})
+        try:
+            df[column] = pd.to_numeric(values)
+        except (ValueError, TypeError):
+            if df[column].nunique() <= len(df) // 2:
+                df[column] = df[column].astype("category")
+    return df
+
+
+def write_frame(df, filename):
+    """
+    Writes a DataFrame to csv, or to a typed columnar file if the filename
+    ends in .parquet or .feather, which needs pyarrow installed
+    """
+    fmt = table_format(filename)
+    if fmt in (None, "csv"):
+        df.to_csv(filename, index=False)
+        return
+    if not (module_exists("pyarrow") or
+            (fmt == "parquet" and module_exists("fastparquet"))):
+        raise ValueError(f"{filename}: install pyarrow to write {fmt} files")
+    df = typed_frame(df).reset_index(drop=True)
+    if fmt == "parquet":
+        df.to_parquet(filename, index=False)
+    else:
+        df.to_feather(filename)
+
+
+def read_table(filename):
+    """
+    Reads a table written by autochem, as csv, parquet or feather by its
+    extension, into a DataFrame. Columnar files keep their types, so numbers
+    aren't parsed from text again.
+    """
+    fmt = table_format(filename)
+    if fmt == "parquet":
+        return pd.read_parquet(filename)
+    if fmt == "feather":
+        return pd.read_feather(filename)
+    return pd.read_csv(filename)
+
+
+def write_json(data, filename):
+    """
+    Writes data to a json file, to a temporary file first that is then
+    renamed, so that other processes never read half a file
+    """
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, filename)
+
+
 def write_csv_from_dict(data, filename=None, autosave=False):
-    """Write to file from dictionary"""
+    """
+    Write to file from dictionary. Filenames ending in .parquet or .feather
+    are written as typed columnar files, see `write_frame`
+    """
     write = True if autosave else False
     if not autosave:
         done = False
@@ -243,12 +644,14 @@ def write_csv_from_dict(data, filename=None, autosave=False):
                     if filename is None:
                         filename = check_user_input(
                             "Filename",
-                            lambda item: item.endswith(".csv"),
-                            "Please give a filename ending in '.csv'",
+                            is_table_name,
+                            TABLE_NAME_ERROR,
                         )
             else:
                 print("Please select 'Y' or 'N'")
-    if write:
+    if write and table_format(filename) in COLUMNAR.values():
+        write_frame(pd.DataFrame(data), filename)
+    elif write:
         with open(filename, "w", encoding="utf-8-sig") as f:
             writer = csv.writer(f)
             writer.writerow(data.keys())
@@ -261,6 +664,8 @@ def write_csv_from_nested(
 ):
     """
     Write to csv from nested data structure; list of tuples, list of lists. 
+    Filenames ending in .parquet or .feather are written as typed columnar
+    files, see `write_frame`
     
     NB: requires a list or tuple of column names passed to the `col_names` parameter
     """
@@ -282,12 +687,14 @@ def write_csv_from_nested(
                     if filename is None:
                         filename = check_user_input(
                             "Filename",
-                            lambda item: item.endswith(".csv"),
-                            "Please give a filename ending in '.csv'",
+                            is_table_name,
+                            TABLE_NAME_ERROR,
                         )
             else:
                 print("Please select 'Y' or 'N'")
-    if write:
+    if write and table_format(filename) in COLUMNAR.values():
+        write_frame(pd.DataFrame(list(data), columns=list(col_names)), filename)
+    elif write:
         with open(filename, "w", encoding="utf-8-sig") as f:
             writer = csv.writer(f)
             writer.writerow(col_names)
@@ -442,24 +849,138 @@ def responsive_table(data, strings, min_width=13, decimal_places=5):
     print("+" + "-" * line_length + "+")
 
 
+def decode_line(line, file):
+    """Decodes a line read in bytes, converting windows line endings"""
+    try:
+        line = line.decode("utf-8")
+    except UnicodeDecodeError:
+        print("eof function passed a corrupt line in file ", file)
+        return "CORRUPTLINE"
+    if line.endswith("\r\n"):
+        line = line[:-2] + "\n"
+    return line
+
+
 def eof(file, percFile):
+    """
+    Yields the lines of the last `percFile` of a file, as a decimal-
+    eof(file, 0.05) gives the last 5 %. Lines are read one at a time.
+    To find something near the end of a file, `read_backwards` only reads
+    as far back as it needs to.
+    """
+    if compression(file) is not None:
+        for line in io.BytesIO(compressed_tail(file, fraction=percFile)):
+            yield decode_line(line, file)
+        return
     # OPEN IN BYTES
     with open(file, "rb") as f:
         f.seek(0, 2)  # Seek @ EOF
         fsize = f.tell()  # Get size
         Dsize = int(percFile * fsize)
         f.seek(max(fsize - Dsize, 0), 0)  # Set pos @ last n chars lines
-        lines = f.readlines()  # Read to end
+        for line in f:
+            yield decode_line(line, file)
 
-    # RETURN DECODED LINES
-    for i in range(len(lines)):
-        try:
-            lines[i] = lines[i].decode("utf-8")
-        except:
-            lines[i] = "CORRUPTLINE"
-            print("eof function passed a corrupt line in file ", File)
-        # FOR LETTER IN SYMBOL
-    return lines
+
+def compressed_tail(file, limit=None, fraction=None, block_size=65536):
+    """
+    Returns the last `limit` bytes, or the last `fraction` as a decimal, of
+    a compressed file once decompressed, or all of it if neither is given.
+    Compressed files can't be read from the end, so the file is decompressed
+    in one pass, keeping only the blocks that could still be in the tail.
+    """
+    return decompressed_tail(file, limit, fraction, block_size)[1]
+
+
+def decompressed_tail(file, limit=None, fraction=None, block_size=65536):
+    """
+    `compressed_tail`, returning (offset, data), where offset is the
+    position of the tail in the decompressed file
+    """
+    blocks = collections.deque()
+    kept = 0
+    total = 0
+    keep = 0
+    with open_log(file) as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            blocks.append(block)
+            kept += len(block)
+            total += len(block)
+            if fraction is not None:
+                # never shrinks, as the file only gets longer
+                keep = int(fraction * total)
+            elif limit is not None:
+                keep = int(limit)
+            else:
+                keep = total
+            while blocks and kept - len(blocks[0]) >= keep:
+                kept -= len(blocks.popleft())
+    data = b"".join(blocks)
+    if keep < len(data):
+        data = data[len(data) - keep:]
+    return total - len(data), data
+
+
+def blocks_backwards(file, limit=None, fraction=None, block_size=65536):
+    """
+    Yields blocks of bytes from the end of a file back to the start, or to
+    `limit` bytes or the `fraction` of the file from the end
+    """
+    if compression(file) is not None:
+        yield compressed_tail(file, limit, fraction, block_size)
+        return
+    with open(file, "rb") as f:
+        position = f.seek(0, 2)
+        if fraction is not None:
+            limit = fraction * position
+        stop = 0 if limit is None else max(position - int(limit), 0)
+        while position > stop:
+            size = min(block_size, position - stop)
+            position -= size
+            f.seek(position)
+            yield f.read(size)
+
+
+def read_backwards(file, limit=None, block_size=65536, fraction=None):
+    """
+    Yields the lines of a file in reverse order, last line first, reading
+    the file backwards in blocks of `block_size` bytes. Only the end of the
+    file is read if the caller stops early, so finding a line near the end
+    of a large log takes as long as reading the lines after it.
+
+    If `limit` is given, nothing more than `limit` bytes from the end of the
+    file is read, or if `fraction` is given, no more than that fraction of
+    the file as a decimal. Compressed files are decompressed in one pass,
+    keeping only that much of the end, see `compressed_tail`.
+
+    >>> any("TERMINATED NORMALLY" in line for line in read_backwards(log))
+    """
+    return lines_backwards(blocks_backwards(file, limit, fraction, block_size), file)
+
+
+def lines_backwards(blocks, file):
+    """
+    Yields the lines of blocks of bytes running backwards through a file,
+    each block coming just before the one before, as from
+    `blocks_backwards`, last line first
+    """
+    # start of the file up to the end of the last line not yet returned
+    buffer = b""
+    for block in blocks:
+        buffer = block + buffer
+        end = len(buffer)
+        while True:
+            # newline ending the line before the one that ends at `end`
+            start = buffer.rfind(b"\n", 0, end - 1) + 1
+            if start == 0:
+                break
+            yield decode_line(buffer[start:end], file)
+            end = start
+        buffer = buffer[:end]
+    # the first line of the file, or the part of the line crossing the
+    # limit after it, as with eof()
+    if buffer:
+        yield decode_line(buffer, file)
 
 
 def remove_nones_from_dict(orig_dict):
@@ -1,5 +1,6 @@
 __all__ = []
 
+from .detect import *
 from .gamess import *
 from .gamess_results import *
 from .gaussian import *
@@ -10,6 +11,7 @@ from .psi import *
 from .psi_results import *
 
 
+__all__ += detect.__all__
 __all__ += gamess.__all__
 __all__ += gaussian.__all__
 __all__ += orca.__all__
@@ -0,0 +1,73 @@
+from ..core.utils import read_header
+from .gamess_results import GamessResults
+from .gaussian_results import GaussianResults
+from .orca_results import OrcaResults
+from .psi_results import PsiResults
+
+import re
+
+__all__ = ["detect_program", "register_program", "results_class"]
+
+# logs print the name of the program in their first few lines, so only the
+# start of a file is read to find what wrote it. Other files, such as slurm
+# output, are then ruled out without reading them to the end
+SNIFF_BYTES = 32768
+
+# (program, signature, Results class) for each program that can be read.
+# If a line matches more than one signature, the first program listed wins
+PROGRAMS = []
+
+
+def register_program(program, signature, results):
+    """
+    Adds a program to those recognised by `detect_program`- `signature` is
+    a regex matching a line near the start of its logs, and `results` the
+    Results class used to read them. Programs registered later are checked
+    after the ones already registered.
+
+    >>> register_program("qchem", r"Q-Chem", QChemResults)
+    """
+    PROGRAMS.append((program, re.compile(signature), results))
+    # one pattern for every signature, so the header is searched once
+    global SIGNATURES
+    SIGNATURES = re.compile("|".join(
+        f"(?:{pattern.pattern})" for _, pattern, _ in PROGRAMS))
+
+
+register_program("gamess", "GAMESS", GamessResults)
+register_program("psi", "Psi4|PSI4", PsiResults)
+register_program("gaussian", "Gaussian", GaussianResults)
+register_program("orca", "O   R   C   A", OrcaResults)
+
+
+def detect_program(log, size=SNIFF_BYTES):
+    """
+    Returns the program that wrote a log file- 'gamess', 'psi', 'gaussian',
+    'orca' or any added with `register_program`- or None if the file isn't
+    a log. Only the first `size` bytes of the file are read.
+    """
+    header = read_header(log, size)
+    found = SIGNATURES.search(header)
+    if found is None:
+        return None
+    # the first line with any signature decides
+    start = header.rfind("\n", 0, found.start()) + 1
+    end = header.find("\n", found.end())
+    line = header[start:] if end == -1 else header[start:end]
+    for program, signature, _ in PROGRAMS:
+        if signature.search(line):
+            return program
+
+
+def results_class(log, program=None):
+    """
+    Returns an instance of the Results class for a log file, such as
+    |GamessResults|, or None if the file isn't a log of a known program.
+    Pass `program` if it is already known, to skip reading the file.
+    """
+    if program is None:
+        program = detect_program(log)
+    for name, _, results in PROGRAMS:
+        if name == program:
+            return results(log)
+    return None
@@ -1,5 +1,14 @@
-from ..core.utils import write_geom_input_for_thermo, write_xyz, eof
-from ..core.results import Results
+from ..core.utils import write_geom_input_for_thermo, write_xyz
+from ..core.results import (
+    AnyLine,
+    FirstLine,
+    LastLine,
+    NormalModeBlocks,
+    Results,
+    Section,
+)
+from ..core.atom import Atom
+from ..core.hessian import BOHR_TO_ANG
 
 import re
 import os
@@ -9,6 +18,96 @@ import sys
 __all__ = ["GamessResults"]
 
 
+def has_word(word):
+    """Returns a function that is True for lines with `word` as a whole word"""
+    return lambda line: word in line and word in line.split()
+
+
+class OrbitalEnergies(Section):
+    """
+    Lines of orbital energies from the EIGENVECTORS sections, stopping once
+    there are energies for every occupied orbital and the LUMO
+    """
+
+    def __init__(self, name):
+        super().__init__(
+            name, "EIGENVECTORS", "CPU",
+            match=lambda line: re.search("^(\s+-?[0-9]+.[0-9]+){1,5}$", line))
+
+    def reset(self):
+        super().reset()
+        self.occupied = None
+        self.count = 0
+
+    def feed(self, line):
+        if self.occupied is None and "ORBITALS ARE OCCUPIED" in line:
+            number = line.split()[0]
+            if number.isdigit():
+                self.occupied = int(number)
+        found = len(self.value)
+        super().feed(line)
+        if len(self.value) > found:
+            self.count += len(line.split())
+            if self.occupied is not None and self.count > self.occupied + 1:
+                self.done = True
+
+
+class GamessModes(NormalModeBlocks):
+    """
+    Normal modes of the NORMAL COORDINATE ANALYSIS section, translations and
+    rotations included, printed in blocks of up to five modes with each
+    atom over three lines:
+
+                          1           2
+       FREQUENCY:       123.45 I     24.06
+        SYMMETRY:         A           B2
+    REDUCED MASS:      1.00842     1.04770
+    IR INTENSITY:      0.22218     0.21920
+
+      1   OXYGEN       X  0.00000000  0.00000000
+                       Y  0.00000000  0.07051245
+                       Z -0.06855102  0.00000000
+
+    followed by the Sayvetz conditions of the block, which are skipped.
+    """
+
+    atom_rows = False
+
+    def reset(self):
+        super().reset()
+        self.modes = 0
+        self.sayvetz = False
+
+    def values(self, line):
+        return [float(value) for value in line.split(":", 1)[1].split()]
+
+    def feed(self, line):
+        if "REFERENCE ON SAYVETZ" in line or "MODE FREQ(CM**-1)" in line:
+            self.done = True
+        elif "FREQUENCY:" in line:
+            self.flush()
+            freqs = []
+            for value in line.split(":", 1)[1].split():
+                # imaginary frequencies are followed by an I
+                if value == "I":
+                    freqs[-1] = -freqs[-1]
+                else:
+                    freqs.append(float(value))
+            self.modes = len(freqs)
+            self.value["frequencies"] += freqs
+            self.sayvetz = False
+        elif "REDUCED MASS:" in line:
+            self.value["reduced_masses"] += self.values(line)
+        elif "IR INTENSITY:" in line:
+            self.value["intensities"] += self.values(line)
+        elif "SAYVETZ" in line:
+            self.sayvetz = True
+        elif self.modes > 0 and not self.sayvetz:
+            parts = line.split()
+            if len(parts) > self.modes and parts[-self.modes - 1] in ("X", "Y", "Z"):
+                self.rows.append(parts[-self.modes:])
+
+
 class GamessResults(Results):
     """Class for obtaining results from Gamess simulations. This class requires
     a log file to be read.
@@ -35,20 +134,74 @@ instance, really. Simple fix; instead of returning values, store in list and ret
 store the iteration number.
     """
 
+    section_headers = (
+        "COORDINATES OF ALL ATOMS ARE (ANGS)",
+        "EQUILIBRIUM GEOMETRY LOCATED",
+        "EIGENVECTORS",
+        "MODE FREQ(CM**-1)",
+        "COORDINATES (BOHR)",
+        "NORMAL COORDINATE ANALYSIS IN THE HARMONIC APPROXIMATION",
+    )
+
+    extractors = [
+        FirstLine("title", lambda line: re.search("[A-Za-z0-9]", line), after="RUN TITLE"),
+        FirstLine("runtype", "RUNTYP="),
+        FirstLine("fmo_level", "NBODY"),
+        FirstLine("version", "GAMESS VERSION ="),
+        FirstLine("basis", "INPUT CARD> $BASIS"),
+        FirstLine("dft_type", "DFTTYP"),
+        FirstLine("multiplicity", lambda line: "SPIN MULTIPLICITY" in line.upper()),
+        FirstLine("num_orbitals_occupied", "ORBITALS ARE OCCUPIED"),
+        # energy type is set by the input, printed before the run title
+        AnyLine("uses_fmo", "FMO", stop="RUN TITLE"),
+        AnyLine("uses_mp2", "MPLEVL", stop="RUN TITLE"),
+        AnyLine("uses_scs", "SCS", stop="RUN TITLE"),
+        AnyLine("uses_dft", "DFT", stop="RUN TITLE"),
+        AnyLine("solvent_calc", "INPUT FOR PCM SOLVATION CALCULATION",
+                stop="BEGINNING GEOMETRY SEARCH"),
+        AnyLine("equilibrium_found", "EQUILIBRIUM GEOMETRY LOCATED"),
+        LastLine("total_energy", "TOTAL ENERGY ="),
+        LastLine("euncorr_hf", "Euncorr HF"),
+        LastLine("euncorr_2", "Euncorr(2)="),
+        LastLine("euncorr_3", "Euncorr(3)="),
+        LastLine("e_corr_mp2", "E corr MP2"),
+        LastLine("e_corr_scs", "E corr SCS"),
+        LastLine("e0", has_word("E(0)="), marker="E(0)="),
+        LastLine("e2s", has_word("E(2S)="), marker="E(2S)="),
+        LastLine("e2t", has_word("E(2T)="), marker="E(2T)="),
+        LastLine("emp2", has_word("E(MP2)="), marker="E(MP2)="),
+        OrbitalEnergies("orbital_energies"),
+    ]
+
+    normal_modes_header = "NORMAL COORDINATE ANALYSIS IN THE HARMONIC APPROXIMATION"
+
+    normal_modes_extractor = GamessModes("normal_modes")
+
+    # headers of geometries the normal modes could be of, and the factor
+    # converting their coordinates to angstroms
+    geometry_headers = (
+        ("COORDINATES (BOHR)", BOHR_TO_ANG),
+        ("EQUILIBRIUM GEOMETRY LOCATED", 1),
+        ("COORDINATES OF ALL ATOMS ARE (ANGS)", 1),
+    )
+
     def __init__(self, log):
         super().__init__(log)
 
-    
+    def _word(self, name, index=-1):
+        """
+        Returns a word of the line found by an extractor, or an empty string
+        if no line was found
+        """
+        line = self.record[name]
+        if line is None:
+            return ""
+        return line.split()[index]
+
     @property
     def title(self):
-        found = False
-        for line in self.read():    
-            if found:
-                if re.search('[A-Za-z0-9]', line):
-                    return line
-            if 'RUN TITLE' in line:
-                found = True
- 
+        return self.record["title"]
+
     
     ################################
     #                              #
@@ -58,7 +211,7 @@ store the iteration number.
 
     def completed(self):
         return any(
-            "EXECUTION OF GAMESS TERMINATED NORMALLY" in line for line in self.eof(0.1)
+            "EXECUTION OF GAMESS TERMINATED NORMALLY" in line for line in self.tail(0.1)
         )
 
         ####NEEDS WORK####
@@ -71,11 +224,8 @@ store the iteration number.
     def get_error(self):
         super().get_error()
         if self.is_optimisation():
-            no_equil = True
-            for line in self.read():
-                # check for equilibrium coords
-                if "EQUILIBRIUM GEOMETRY LOCATED" in line:
-                    no_equil = False
+            # check for equilibrium coords
+            no_equil = not self.record["equilibrium_found"]
             if no_equil:
                 return "No equilibrium geometry found- need to resubmit with rerun.xyz"
             else:
@@ -89,19 +239,18 @@ store the iteration number.
 
     def get_runtype(self):
         """Returns type of calculation ran"""
-        for line in self.read():
-            if "RUNTYP=" in line.upper():
-                parts = line.split()
-                for p in parts:
-                    if "RUNTYP=" in p:
-                        return p.split("=")[1].lower()
+        line = self.record["runtype"]
+        if line is not None:
+            for p in line.split():
+                if "RUNTYP=" in p:
+                    return p.split("=")[1].lower()
 
     @property
     def fmo_level(self):
         """Returns level of FMO calculation ran"""
-        for line in self.read():
-            if "NBODY" in line:
-                return int(line.split()[-1].split("=")[-1])  # FMO2 or 3
+        line = self.record["fmo_level"]
+        if line is not None:
+            return int(line.split()[-1].split("=")[-1])  # FMO2 or 3
         return 0
 
     def get_equil_coords(self, output=None):
@@ -114,8 +263,6 @@ store the iteration number.
         equil = []
         rerun = []
         regex = "[A-Za-z]{1,2}(\s*\D?[0-9]{1,3}\.[0-9]{1,10}){4}"
-        found_equil = False
-        found_some = False
         par_dir = []
         for part in self.path.split("/"):
             if part in ("opt", "spec", "hess"):
@@ -123,28 +270,23 @@ store the iteration number.
             else:
                 par_dir.append(part)
         MOLECULE_PARENT_DIR = "/".join(par_dir)
-        for line in self.read():
-            if "EQUILIBRIUM GEOMETRY LOCATED" in line:
-                found_equil = True
-            if "COORDINATES OF ALL ATOMS ARE (ANGS)" in line:  # store every coord list
-                found_some = True
-                if len(rerun) > 0:  # from last run, remove those coords
-                    rerun = []
-            if found_equil:
-                if re.search(regex, line):
-                    if line.endswith("\n"):
-                        equil.append(line[:-1])  # drop newline char
-                    else:
-                        equil.append(line)
-            if found_some:
-                if re.search(regex, line):
-                    if line.endswith("\n"):
-                        rerun.append(line[:-1])  # drop newline char
-                    else:
-                        rerun.append(line)
-            if line == "\n":
-                found_equil = False
-                found_some = False
+
+        def coordinates(lines):
+            # drop newline chars
+            return [
+                line[:-1] if line.endswith("\n") else line for line in lines
+                if re.search(regex, line)
+            ]
+
+        def blank(line):
+            return line == "\n"
+
+        for lines in self.sections("EQUILIBRIUM GEOMETRY LOCATED", blank):
+            equil += coordinates(lines)
+        # coords of the last step, jumping straight to them
+        steps = self.offsets("COORDINATES OF ALL ATOMS ARE (ANGS)")
+        if len(steps) > 0:
+            rerun = coordinates(self.read_section(steps[-1], blank))
 
         if len(equil) > 0:
             print("Found equilibrium!")
@@ -185,9 +327,9 @@ store the iteration number.
 
     @property
     def version(self):
-        for line in self.read():
-            if "GAMESS VERSION =" in line:
-                return " ".join(line.split()[4:-1])
+        line = self.record["version"]
+        if line is not None:
+            return " ".join(line.split()[4:-1])
 
     def fmo_mp2_data(self, mp2_type):
         """
@@ -200,13 +342,8 @@ store the iteration number.
         to return the correlated SCS energy, 'E corr SCS', or correlated
         MP2 energies, 'E corr MP2'.
         """
-        HF = ""
-        MP2 = ""
-        for line in self.eof(0.2):  # last values only
-            if "Euncorr HF" in line:
-                HF = line.split()[-1]
-            if f"E corr {mp2_type}" in line:
-                MP2 = line.split()[-1]
+        HF = self._word("euncorr_hf")
+        MP2 = self._word(f"e_corr_{mp2_type.lower()}")
 
         HF, MP2 = map(float, (HF, MP2))
         return HF, MP2
@@ -216,10 +353,7 @@ store the iteration number.
         """
         Returns last occurrence of total energy.
         """
-        total = ""
-        for line in self.read():
-            if "TOTAL ENERGY =" in line:
-                total = line.split()[-1]
+        total = self._word("total_energy")
         return float(total)
 
     @property
@@ -229,9 +363,9 @@ store the iteration number.
         """
 
         def raw_basis():
-            for line in self.read():
-                if "INPUT CARD> $BASIS" in line:
-                    return line.split()[-2].split("=")[1]
+            line = self.record["basis"]
+            if line is not None:
+                return line.split()[-2].split("=")[1]
 
         basis = raw_basis()
         change_basis = {
@@ -252,17 +386,9 @@ store the iteration number.
         E(2T) as same spin energy. Then user can scale energies accordingly.
         If looking at optimisations, only the overall correlation energy is printed.
         """
-        HF = ""
-        MP2_opp = ""
-        MP2_same = ""
-        for line in self.eof(0.2):
-            line = line.split()
-            if "E(0)=" in line:
-                HF = line[-1]
-            if "E(2S)=" in line:
-                MP2_opp = line[-1]
-            if "E(2T)=" in line:
-                MP2_same = line[-1]
+        HF = self._word("e0")
+        MP2_opp = self._word("e2s")
+        MP2_same = self._word("e2t")
         HF, MP2_opp, MP2_same = map(float, (HF, MP2_opp, MP2_same))
         return HF, MP2_opp, MP2_same
 
@@ -270,14 +396,8 @@ store the iteration number.
         """
         Returns value of E(0) as HF, E(MP2) as the overall MP2 energy.
         """
-        HF = ""
-        MP2 = ""
-        for line in self.eof(0.2):
-            line = line.split()
-            if "E(0)=" in line:
-                HF = line[-1]
-            if "E(MP2)=" in line:
-                MP2 = line[1]
+        HF = self._word("e0")
+        MP2 = self._word("emp2", 1)
         HF, MP2 = map(float, (HF, MP2))
         return HF, MP2
 
@@ -289,14 +409,8 @@ store the iteration number.
         not with the addition of the energy of the solvent. In order to find
         that, search for 'THE P(2) CORRECTED MP2-CPCM ENERGY'.
         """
-        HF = ""
-        MP2 = ""
-        for line in self.eof(0.2):
-            line = line.split()
-            if "E(0)=" in line:
-                HF = line[-1]
-            if "E(MP2)=" in line:
-                MP2 = line[1]
+        HF = self._word("e0")
+        MP2 = self._word("emp2", 1)
 
         HF, MP2 = map(float, (HF, MP2))
         return HF, MP2
@@ -306,12 +420,11 @@ store the iteration number.
         """
         Returns DFT type (DFTTYP=...)
         """
-        for line in self.read():
-            if "DFTTYP" in line:
-                line = line.split()
-                for val in line:
-                    if "DFTTYP" in val:
-                        return val.split("=")[1].upper()
+        line = self.record["dft_type"]
+        if line is not None:
+            for val in line.split():
+                if "DFTTYP" in val:
+                    return val.split("=")[1].upper()
 
     @property
     def fmo_dft_energy(self):
@@ -320,12 +433,9 @@ store the iteration number.
         """
         if "2019" in self.version:
             energy = ""
-            fmo = self.fmo_level
-            # issues with opening the same file twice, so store fmo level
-            # before looking for the line
-            for line in self.eof(0.1):
-                if f"Euncorr({fmo})=" in line:
-                    energy = line.split()[-1]
+            line = self.record.get(f"euncorr_{self.fmo_level}")
+            if line is not None:
+                energy = line.split()[-1]
             return float(energy)
 
     @property
@@ -333,21 +443,12 @@ store the iteration number.
         """
         Returns energy type, i.e. HF, DFT, MP2
         """
-        dft = False
-        fmo = False
-        mp2 = False
-        scs = False
-        for line in self.read():
-            if "FMO" in line:
-                fmo = True
-            if "MPLEVL" in line:
-                mp2 = True
-            if "SCS" in line:
-                scs = True
-            if "DFT" in line:
-                dft = True
-            if "RUN TITLE" in line:
-                break  # by this point, all data required is specified
+        # flags are only searched for up to the run title, as by that point
+        # all data required is specified
+        dft = self.record["uses_dft"]
+        fmo = self.record["uses_fmo"]
+        mp2 = self.record["uses_mp2"]
+        scs = self.record["uses_scs"]
         types = {
             "fmo_scs": (fmo, scs),
             "fmo_mp2": (fmo, mp2),
@@ -387,12 +488,7 @@ store the iteration number.
         input file at the top though, so instead has to check when the 
         log file reports it.
         """
-        for line in self.read():
-            if "INPUT FOR PCM SOLVATION CALCULATION" in line:
-                return True
-            if "BEGINNING GEOMETRY SEARCH" in line:
-                break
-        return False
+        return self.record["solvent_calc"]
 
     def get_data(self):
         """
@@ -434,9 +530,9 @@ store the iteration number.
 
     @property
     def multiplicity(self):
-        for line in self.read():
-            if "SPIN MULTIPLICITY" in line.upper():  # sometimes prints lower case
-                return int(line.split()[-1])
+        line = self.record["multiplicity"]  # sometimes prints lower case
+        if line is not None:
+            return int(line.split()[-1])
 
     #################
     ### HOMO-LUMO ###
@@ -444,27 +540,17 @@ store the iteration number.
 
     @property
     def num_orbitals_occupied(self):
-        for line in self.read():
-            if "ORBITALS ARE OCCUPIED" in line:
-                return int(line.split()[0])
+        line = self.record["num_orbitals_occupied"]
+        if line is not None:
+            return int(line.split()[0])
 
     def _homo_lumo(self):
         """
         Finds HOMO/LUMO orbitals.
         """
-        found = False
         orbital_energies = []
-        for line in self.read():
-            if "EIGENVECTORS" in line:
-                found = True
-            if "CPU" in line:
-                found = False
-            if found:
-                if re.search("^(\s+-?[0-9]+.[0-9]+){1,5}$", line):
-                    orbital_energies += [float(i) for i in line.split()]
-                    # save time
-                    if len(orbital_energies) > self.num_orbitals_occupied + 1:
-                        break
+        for line in self.record["orbital_energies"]:
+            orbital_energies += [float(i) for i in line.split()]
         homo = orbital_energies[self.num_orbitals_occupied - 1]
         lumo = orbital_energies[self.num_orbitals_occupied]
         return homo, lumo
@@ -508,13 +594,52 @@ store the iteration number.
     #                              #
     ################################
 
-    # create and visualise freq modes/ IR spectra.
-    # If I ever fit multiple lorentzians to the peaks, won't need molden
-    # anymore!
-    # Then this will become useful and could replace the gamess_to_molden script.
+    # normal modes are read by the `vibrations` property of |Results|, and
+    # written for Molden with `write_molden()`
+
+    def vib_get_geom(self, offset=None):
+        """
+        Returns the geometry of the normal modes at a byte offset, or of the
+        last modes of the log, as a list of |Atom|. This is the last geometry
+        printed before them: the input geometry of a hessian run, or the
+        equilibrium geometry of an optimisation that goes on to a hessian.
+        """
+        regex = "^\s*\S+(\s+-?[0-9]+\.[0-9]+){4}\s*$"
+        found = []
+        for header, scale in self.geometry_headers:
+            starts = [start for start in self.offsets(header) if offset is None or start < offset]
+            if len(starts) > 0:
+                found.append((starts[-1], scale))
+        if len(found) == 0:
+            return []
+        start, scale = max(found)
+        atoms = []
+        lines = self.read_from(start)
+        for line in lines:
+            if re.search(regex, line):
+                _, charge, x, y, z = line.split()
+                coords = [float(value) * scale for value in (x, y, z)]
+                atoms.append(Atom(atnum=int(float(charge)), coords=coords))
+            elif len(atoms) > 0:
+                break
+        lines.close()
+        return atoms
 
-    def vib_get_geom(self):
-        pass
+    def ir_table(self):
+        """
+        Lines of the table of frequencies and IR intensities, below this line:
+        'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.'
+        Searched backwards from the end of the log, stopping at that line,
+        through no more than the last 20 % of the file.
+        """
+        rows = []
+        regex = "[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$"
+        for line in self.tail(0.2):
+            if "MODE FREQ(CM**-1)" in line:
+                break
+            if re.search(regex, line):
+                rows.append(line)
+        return rows[::-1]
 
     @property
     def frequencies(self):
@@ -523,12 +648,7 @@ store the iteration number.
         Checks output below this line:
         'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.'
         """
-        vibs = []
-        regex = "[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$"
-        for line in self.eof(0.2):  # last 20 % of file
-            if re.search(regex, line):
-                vibs.append(float(line.split()[1]))
-        return vibs
+        return [float(line.split()[1]) for line in self.ir_table()]
 
     @property
     def intensities(self):
@@ -537,12 +657,7 @@ store the iteration number.
         Checks output below this line:
         'MODE FREQ(CM**-1)  SYMMETRY  RED. MASS  IR INTENS.'
         """
-        ints = []
-        regex = "[0-9]{1,9}?\s*[0-9]{1,9}\.[0-9]{1,9}\s*[A-Za-z](\s*[0-9]{1,9}\.[0-9]{1,9}){2}$"
-        for line in self.eof(0.2):  # last 20 % of file
-            if re.search(regex, line):
-                ints.append(float(line.split()[-1]))
-        return ints
+        return [float(line.split()[-1]) for line in self.ir_table()]
 
     def write_initial_geom_for_thermo(self):
         """Parses GAMESS inputs for the initial geometry"""
@@ -1,5 +1,13 @@
 from ..core.utils import read_file, write_geom_input_for_thermo, write_xyz
-from ..core.results import Results
+from ..core.results import (
+    AllLines,
+    Block,
+    FirstLine,
+    LastLine,
+    LinesBefore,
+    NormalModeBlocks,
+    Results,
+)
 from ..core.periodic_table import PeriodicTable as PT
 from ..core.atom import Atom
 
@@ -10,11 +18,87 @@ import subprocess
 __all__ = ["GaussianResults"]
 
 
+class GaussianModes(NormalModeBlocks):
+    """
+    Normal modes of the 'Harmonic frequencies' section, printed in blocks of
+    up to three modes:
+
+                          1                      2
+                         A1                     A1
+     Frequencies --   1615.8740              3722.6508
+     Red. masses --      1.0825                 1.0453
+     ...
+     IR Inten    --     64.3402                 4.1431
+      Atom  AN      X      Y      Z        X      Y      Z
+         1   8     0.00   0.00   0.07     0.00   0.00  -0.05
+    """
+
+    def reset(self):
+        super().reset()
+        self.modes = 0
+        self.in_atoms = False
+
+    def feed(self, line):
+        parts = line.split()
+        if self.in_atoms:
+            if len(parts) == 2 + 3 * self.modes and parts[0].isdigit():
+                self.rows.append(parts[2:])
+                return
+            self.in_atoms = False
+            # the mode numbers of the next block, or the end of the modes
+            if not (parts and all(part.isdigit() for part in parts)):
+                self.done = True
+            return
+        if "--" not in line:
+            if "Atom  AN" in line:
+                self.in_atoms = True
+            return
+        label, values = line.split("--", 1)
+        label = label.strip()
+        if label == "Frequencies":
+            self.flush()
+            values = [float(v) for v in values.split()]
+            self.modes = len(values)
+            self.value["frequencies"] += values
+        elif label == "Red. masses":
+            self.value["reduced_masses"] += [float(v) for v in values.split()]
+        elif label == "IR Inten":
+            self.value["intensities"] += [float(v) for v in values.split()]
+
+
 class GaussianResults(Results):
     """
     Class for obtaining results from Gaussian simulations. This class requires a log file to be read.
     """
 
+    section_headers = (
+        "Standard orientation",
+        "Excitation energies and oscillator strengths",
+        "Harmonic frequencies",
+        "Input orientation",
+    )
+
+    extractors = [
+        LinesBefore("title", "Symbolic", count=2),
+        Block("user_commands", lambda line: re.search("^\s*?#P?", line.upper()), "------"),
+        LastLine("hf_energy",
+                 lambda line: "E=" in line and re.search("^\sE=\s*-?[0-9]*.[0-9]*", line),
+                 marker="E="),
+        LastLine("dft_energy", "SCF Done"),
+        FirstLine("multiplicity",
+                  lambda line: "Charge" in line and "Multiplicity" in line,
+                  marker="Multiplicity"),
+        # occupied orbitals of the first printout, and the first virtual orbitals
+        AllLines("alpha_occupied", "Alpha  occ. eigenvalues", stop="Alpha virt. eigenvalues"),
+        FirstLine("alpha_virtual", "Alpha virt. eigenvalues"),
+        AllLines("frequencies", "Frequencies --"),
+        AllLines("intensities", "IR Inten    --"),
+    ]
+
+    normal_modes_header = "Harmonic frequencies"
+
+    normal_modes_extractor = GaussianModes("normal_modes")
+
     def __init__(self, log):
         super().__init__(log)
 
@@ -47,15 +131,13 @@ class GaussianResults(Results):
             return "spec"
 
     def errored(self):
-        found = False
-        for line in self.eof(0.01):
+        for line in self.tail(0.01):
             if "Error termination" in line:
                 return True
         return False
 
     def completed(self):
-        found = False
-        for line in self.eof(0.01):
+        for line in self.tail(0.01):
             if "Normal termination" in line:
                 return True
         return False
@@ -171,12 +253,7 @@ class GaussianResults(Results):
         Symbolic Z-matrix
         ...
         """
-        lines = []
-        found = False
-        for line in self.read():
-            if "Symbolic" in line:
-                break
-            lines.append(line)
+        lines = self.record["title"]
         return lines[-2].strip()
 
     @property
@@ -185,15 +262,7 @@ class GaussianResults(Results):
         Returns the #P line of the input file.
         Now accounts for more than one line.
         """
-        lines = []
-        found = False
-        for line in self.read():
-            if re.search("^\s*?#P?", line.upper()):
-                found = True
-            if found:
-                if "------" in line:
-                    break
-                lines.append(line)
+        lines = self.record["user_commands"]
         formatted = []
         # drop leading spaces and trailing newlines
         for line in lines:
@@ -241,9 +310,9 @@ class GaussianResults(Results):
         Returns last occurrence of Hartree-Fock energy.
         """
         HF = ""
-        for line in self.read():
-            if re.search("^\sE=\s*-?[0-9]*.[0-9]*", line):
-                HF = line.split()[1]
+        line = self.record["hf_energy"]
+        if line is not None:
+            HF = line.split()[1]
         return float(HF)
 
     @property
@@ -260,9 +329,9 @@ class GaussianResults(Results):
         Returns last occurrence of DFT energy.
         """
         dft = ""
-        for line in self.read():
-            if "SCF Done" in line:
-                dft = line.split()[4]
+        line = self.record["dft_energy"]
+        if line is not None:
+            dft = line.split()[4]
         return float(dft)
 
     def get_data(self):
@@ -311,9 +380,9 @@ class GaussianResults(Results):
         """
         Returns multiplicity from the symbolic z-matrix section.
         """
-        for line in self.read():
-            if "Charge" in line and "Multiplicity" in line:
-                return int(line.split()[-1])
+        line = self.record["multiplicity"]
+        if line is not None:
+            return int(line.split()[-1])
 
     def _homo_lumo(self):
         """
@@ -321,12 +390,10 @@ class GaussianResults(Results):
         """
         occupied = []
         lumo = ""
-        for line in self.read():
-            if "Alpha  occ. eigenvalues" in line:
-                occupied += line.split()[4:]
-            if "Alpha virt. eigenvalues" in line:
-                lumo = line.split()[4]
-                break
+        for line in self.record["alpha_occupied"]:
+            occupied += line.split()[4:]
+        if self.record["alpha_virtual"] is not None:
+            lumo = self.record["alpha_virtual"].split()[4]
         homo = occupied[-1]
         homo, lumo = map(float, (homo, lumo))
         return homo, lumo
@@ -367,21 +434,36 @@ class GaussianResults(Results):
     @property
     def frequencies(self):
         vibs = []
-        for line in self.read():
-            if "Frequencies --" in line:
-                vibs += line.split()[2:]
+        for line in self.record["frequencies"]:
+            vibs += line.split()[2:]
         vibs = [float(v) for v in vibs]
         return vibs
 
     @property
     def intensities(self):
         ints = []
-        for line in self.read():
-            if "IR Inten    --" in line:
-                ints += line.split()[3:]
+        for line in self.record["intensities"]:
+            ints += line.split()[3:]
         ints = [float(i) for i in ints]
         return ints
 
+    def vib_get_geom(self, offset=None):
+        """
+        Returns the geometry of the normal modes at a byte offset, or of the
+        last modes of the log, as a list of |Atom|: the last standard
+        orientation before them, or the last input orientation with nosymm
+        """
+        regex = "^(\s+[0-9]+){3}(\s+-?[0-9]{1,3}.[0-9]+){3}$"
+        atoms = []
+        for header in ("Standard orientation", "Input orientation"):
+            for line in self.last_section_before(header, offset, "Rotational constants"):
+                if re.search(regex, line):
+                    _, atnum, _, x, y, z = line.split()
+                    atoms.append(Atom(atnum=int(atnum), coords=(float(x), float(y), float(z))))
+            if len(atoms) > 0:
+                break
+        return atoms
+
     def write_initial_geom_for_thermo(self):
         """
         Parses Gaussian frequency calculation log file for the initial
@@ -404,6 +486,19 @@ class GaussianResults(Results):
 
     # TD-DFT Excited states
 
+    def _excited_states(self, value):
+        """
+        Returns a list for each block of excitation energies, of `value` of
+        each Excited State line. Blocks are found from the section index.
+        """
+        found = []
+        for lines in self.sections("Excitation energies and oscillator strengths",
+                                   "Leave Link"):
+            values = [value(line) for line in lines if "Excited State" in line]
+            if len(values) > 0:
+                found.append(values)
+        return found
+
     @property
     def td_dft_wavelengths(self):
         """
@@ -413,63 +508,19 @@ class GaussianResults(Results):
         excited state optimisation, there will be many 
         iterations.
         """
-        waves = []
-        waves_per_iter = []
-        found_region = False
-        for line in self.read():
-            if "Excitation energies and oscillator strengths" in line:
-                found_region = True
-            if found_region:
-                if "Excited State" in line:
-                    wave = float(line.split()[6])
-                    waves_per_iter.append(wave)
-            if "Leave Link" in line:
-                found_region = False
-                if len(waves_per_iter) > 0:
-                    waves.append(waves_per_iter)
-                    waves_per_iter = []
-        return waves
+        return self._excited_states(lambda line: float(line.split()[6]))
 
     @property
     def td_dft_intensities(self):
         """
         Returns a nested list of intensities, one for each iteration.
         """
-        ints = []
-        ints_per_iter = []
-        found_region = False
-        for line in self.read():
-            if "Excitation energies and oscillator strengths" in line:
-                found_region = True
-            if found_region:
-                if "Excited State" in line:
-                    _int = float(line.split()[8].split("=")[1])
-                    ints_per_iter.append(_int)
-            if "Leave Link" in line:
-                found_region = False
-                if len(ints_per_iter) > 0:
-                    ints.append(ints_per_iter)
-                    ints_per_iter = []
-        return ints
+        return self._excited_states(
+            lambda line: float(line.split()[8].split("=")[1]))
 
     @property
     def td_dft_transition_energies(self):
         """
         Returns a nested list of energies of each transition in eV
         """
-        vals = []
-        vals_per_iter = []
-        found_region = False
-        for line in self.read():
-            if "Excitation energies and oscillator strengths" in line:
-                found_region = True
-            if found_region:
-                if "Excited State" in line:
-                    val = float(line.split()[4])
-                    vals_per_iter.append(val)
-            if "Leave Link" in line:
-                found_region = False
-                if len(vals_per_iter) > 0:
-                    vals.append(vals_per_iter)
-                    vals_per_iter = []
-        return vals
+        return self._excited_states(lambda line: float(line.split()[4]))
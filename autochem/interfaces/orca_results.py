@@ -1,5 +1,5 @@
 from ..core.utils import read_file, write_xyz
-from ..core.results import Results
+from ..core.results import AnyLine, Extractor, FirstLine, LastLine, NormalModeBlocks, Results
 from ..core.periodic_table import PeriodicTable as PT
 from ..core.atom import Atom
 
@@ -10,12 +10,122 @@ import subprocess
 __all__ = ["OrcaResults"]
 
 
+class FrontierOrbitals(Extractor):
+    """
+    Lines of the first ORBITAL ENERGIES table, up to and including the
+    first unoccupied orbital
+    """
+
+    regex = r"^\s+[0-9]+(\s+-?[0-9]+.[0-9]+){3}"
+
+    def __init__(self, name):
+        super().__init__(name, default=[])
+
+    def reset(self):
+        self.found = False
+
+    def feed(self, line):
+        if "ORBITAL ENERGIES" in line:
+            self.found = True
+        if self.found and re.search(self.regex, line):
+            self.value.append(line)
+            if line.split()[1] == "0.0000":  # occupancy
+                self.done = True
+
+
+class OrcaModes(NormalModeBlocks):
+    """
+    Normal modes of the VIBRATIONAL FREQUENCIES section. Frequencies of all
+    3N modes are listed first, with zeros for translations and rotations,
+
+       6:      1624.36 cm**-1
+
+    then the NORMAL MODES, one row for each cartesian coordinate in blocks
+    of six modes, then the IR SPECTRUM of the vibrations:
+
+     Mode   freq       eps      Int      T**2         TX        TY        TZ
+    ----------------------------------------------------------------------
+      6:   1624.36   0.012979   65.59  0.002493  ( 0.000000  0.000000 -0.049932)
+
+    ORCA doesn't print reduced masses, so those are found by |NormalModes|.
+    """
+
+    atom_rows = False
+
+    def reset(self):
+        super().reset()
+        self.part = "frequencies"
+        self.column = 2
+        self.ir = {}
+
+    def feed(self, line):
+        parts = line.split()
+        numbered = len(parts) > 1 and parts[0].endswith(":") and parts[0][:-1].isdigit()
+        if "NORMAL MODES" in line:
+            self.part = "modes"
+        elif "IR SPECTRUM" in line:
+            self.flush()
+            self.part = "ir"
+        elif self.part == "frequencies" and numbered and "cm**-1" in line:
+            self.value["frequencies"].append(float(parts[1]))
+        elif self.part == "modes" and len(parts) > 1:
+            if all(part.isdigit() for part in parts):
+                self.flush()
+            elif parts[0].isdigit() and "." in parts[1]:
+                self.rows.append(parts[1:])
+        elif self.part == "ir":
+            if "Mode" in line and "freq" in line:
+                # ORCA 5 has an Int column in km/mol, before that T**2
+                self.column = 3 if "Int" in parts else 2
+            elif numbered:
+                self.ir[int(parts[0][:-1])] = float(parts[self.column])
+            elif len(self.ir) > 0 and len(parts) == 0:
+                self.done = True
+        if "THERMOCHEMISTRY" in line:
+            self.done = True
+
+    def flush(self):
+        super().flush()
+        # intensities in the order of the modes, as not every mode is listed
+        if len(self.ir) > 0:
+            self.value["intensities"] = [
+                self.ir.get(mode, float("nan")) for mode in range(len(self.value["frequencies"]))
+            ]
+
+
 class OrcaResults(Results):
     """
     Class for obtaining results from Orca simulations. This class     
     requires a log file to be read.
     """
 
+    section_headers = (
+        "CARTESIAN COORDINATES (ANGSTROEM)",
+        "ORBITAL ENERGIES",
+        "TRANSITION ELECTRIC",
+        "VIBRATIONAL FREQUENCIES",
+    )
+
+    extractors = [
+        FirstLine("user_commands", "> !"),
+        FirstLine("title", "The coordinates will be read from file"),
+        AnyLine("is_dft", "Density Functional     Method          .... DFT"),
+        FirstLine(
+            "method", lambda line: "Exchange Functional    Exchange" in line or
+            "Ab initio Hamiltonian  Method" in line,
+            marker=("Exchange Functional    Exchange", "Ab initio Hamiltonian  Method")),
+        FirstLine("num_atoms", "Number of atoms"),
+        FirstLine("basis", "Your calculation utilizes the basis:"),
+        FirstLine("total_energy", "Total Energy       :"),
+        LastLine("final_single_point_energy", "FINAL SINGLE POINT ENERGY"),
+        FirstLine("multiplicity", "Multiplicity"),
+        FrontierOrbitals("frontier_orbitals"),
+    ]
+
+    normal_modes_header = "VIBRATIONAL FREQUENCIES"
+
+    normal_modes_extractor = OrcaModes("normal_modes")
+
     def __init__(self, log):
         super().__init__(log)
 
@@ -47,7 +157,7 @@ class OrcaResults(Results):
         return "spec"
 
     def completed(self):
-        for line in self.eof(0.05):
+        for line in self.tail(0.05):
             if "****ORCA TERMINATED NORMALLY****" in line:
                 return True
         return False
@@ -66,66 +176,71 @@ class OrcaResults(Results):
         """
         Returns the ! ... line of the input file.
         """
-        for line in self.read():
-            if "> !" in line:
-                return line.lower()
+        line = self.record["user_commands"]
+        if line is not None:
+            return line.lower()
 
     @property
     def title(self):
         """
         Returns xyz file with no extension. Used when writing new coords
         """
-        for line in self.read():
-            if "The coordinates will be read from file" in line:
-                return line.split()[-1].rsplit(".")[0]
+        line = self.record["title"]
+        if line is not None:
+            return line.split()[-1].rsplit(".")[0]
 
     @property
     def is_dft(self):
         """
         Used internally to decide if dft energies should be collected.
         """
-        for line in self.read():
-            if "Density Functional     Method          .... DFT" in line:
-                return True
-        return False
+        return self.record["is_dft"]
 
     @property
     def method(self):
         """
         Returns method used in calculation.
         """
-        for line in self.read():
-            # dft
-            if "Exchange Functional    Exchange" in line:
-                return line.split()[-1]
-            # HF
-            elif "Ab initio Hamiltonian  Method" in line:
-                return line.split()[-1].split("(")[0]
-            # MP2
-            # elif ....
+        line = self.record["method"]
+        if line is None:
+            return None
+        # dft
+        if "Exchange Functional    Exchange" in line:
+            return line.split()[-1]
+        # HF
+        elif "Ab initio Hamiltonian  Method" in line:
+            return line.split()[-1].split("(")[0]
+        # MP2
+        # elif ....
 
     @property
     def num_atoms(self):
-        for line in self.read():
-            if "Number of atoms" in line:
-                return int(line.split()[-1])
+        line = self.record["num_atoms"]
+        if line is not None:
+            return int(line.split()[-1])
 
     def get_equil_coords(self):
         coords = []
-        found_coords = False
         found_equil = False
         regex = "^\s+[A-z]+(\s+-?[0-9]+\.[0-9]+){3}$"
 
-        for line in self.eof(0.5):
+        # read backwards past the last coordinates up to the ones before,
+        # between which the optimisation reports that it has converged
+        after = []
+        headers = 0
+        for line in self.tail(0.5):
             if "THE OPTIMIZATION HAS CONVERGED" in line:
                 found_equil = True
             if "CARTESIAN COORDINATES (ANGSTROEM)" in line:
-                found_coords = True
-            if line == "\n":
-                found_coords = False
-            if found_coords and re.search(regex, line):
-                if len(coords) == self.num_atoms:
-                    coords = []
+                headers += 1
+                if headers == 2:
+                    break
+            elif headers == 0:
+                after.append(line)
+        for line in reversed(after):
+            if line == "\n" and len(coords) > 0:
+                break
+            if re.search(regex, line):
                 sym, x, y, z = line.split()
                 coords.append(Atom(sym, coords=[x, y, z]))
 
@@ -153,27 +268,27 @@ class OrcaResults(Results):
         """
         Returns basis set.
         """
-        for line in self.read():
-            if "Your calculation utilizes the basis:" in line:
-                return line.split()[-1]
+        line = self.record["basis"]
+        if line is not None:
+            return line.split()[-1]
 
     @property
     def total_energy(self):
         """
         Returns total energy, printed for scf calculations.
         """
-        for line in self.read():
-            if "Total Energy       :" in line:
-                return float(line.split()[3].strip())
+        line = self.record["total_energy"]
+        if line is not None:
+            return float(line.split()[3].strip())
 
     @property
     def final_single_point_energy(self):
         """
-        Returns the energies printed for single points.
+        Returns the last energy printed for single points.
         """
-        for line in self.eof(0.2):
-            if "FINAL SINGLE POINT ENERGY" in line:
-                return float(line.split()[-1])
+        line = self.record["final_single_point_energy"]
+        if line is not None:
+            return float(line.split()[-1])
 
     @property
     def sp_data(self):
@@ -204,9 +319,9 @@ class OrcaResults(Results):
         """
         Return multiplicity.
         """
-        for line in self.read():
-            if "Multiplicity" in line:
-                return int(line.split()[-1])
+        line = self.record["multiplicity"]
+        if line is not None:
+            return int(line.split()[-1])
 
     def _homo_lumo(self):
         """
@@ -215,19 +330,12 @@ class OrcaResults(Results):
         """
         homo = ""
         lumo = ""
-        regex = r"^\s+[0-9]+(\s+-?[0-9]+.[0-9]+){3}"
-        found = False
-        for line in self.read():
-            if "ORBITAL ENERGIES" in line:
-                found = True
-            if found:
-                if re.search(regex, line):
-                    line = line.split()
-                    if line[1] != "0.0000":  # occupancy
-                        homo = line[-1]
-                    else:
-                        lumo = line[-1]
-                        break
+        for line in self.record["frontier_orbitals"]:
+            line = line.split()
+            if line[1] != "0.0000":  # occupancy
+                homo = line[-1]
+            else:
+                lumo = line[-1]
         homo, lumo = map(float, (homo, lumo))
         return homo, lumo
 
@@ -267,33 +375,39 @@ class OrcaResults(Results):
     @property
     def frequencies(self):
         """
-        Orca removes rotations/vibrations before printing.
+        Returns the vibrational frequencies of the last vibrational analysis.
+        Orca prints translations and rotations as zeros, which are left out.
+        Read with the normal modes, in one pass over the vibrational section.
         """
-        vibs = []
-        found = False
-        for line in self.read():
-            if "Mode    freq (cm**-1)" in line:
-                found = True
-            if found and line == "\n":
-                found = False
-            if found and '------' not in line:
-                vibs.append(float(line.split()[1]))
-        return vibs
+        if self.vibrations is None:
+            return []
+        return [float(freq) for freq in self.vibrations.frequencies]
 
     @property
     def intensities(self):
         """
-        Orca removes rotations/vibrations before printing
+        Returns the IR intensities of the vibrations in km/mol, or an empty
+        list if there is no IR spectrum
         """
-        ints = []
-        for line in self.read():
-            if "Mode    freq (cm**-1)" in line:
-                found = True
-            if found and line == "\n":
-                found = False
-            if found and '------' not in line:
-                ints.append(float(line.split()[2]))
-        return ints
+        if self.vibrations is None or self.vibrations.intensities is None:
+            return []
+        return [float(intensity) for intensity in self.vibrations.intensities]
+
+    def vib_get_geom(self, offset=None):
+        """
+        Returns the geometry of the normal modes at a byte offset, or of the
+        last modes of the log, as a list of |Atom|: the last cartesian
+        coordinates printed before them
+        """
+        regex = "^\s+[A-z]+(\s+-?[0-9]+\.[0-9]+){3}$"
+        atoms = []
+        lines = self.last_section_before("CARTESIAN COORDINATES (ANGSTROEM)", offset,
+                                         lambda line: line == "\n")
+        for line in lines:
+            if re.search(regex, line):
+                sym, x, y, z = line.split()
+                atoms.append(Atom(sym, coords=[float(x), float(y), float(z)]))
+        return atoms
 
     #####################
     #  Thermochemistry  #
@@ -306,7 +420,7 @@ class OrcaResults(Results):
         so returns a list of temperatures in Kelvin
         """
         temps = []
-        for line in self.eof(0.5):
+        for line in self.thermochemistry():
             match = re.match('THERMOCHEMISTRY AT (.*)K', line)
             if match is not None:
                 temps.append(match.group(1) + ' K')
@@ -319,7 +433,7 @@ class OrcaResults(Results):
         in kJ/mol.
         """
         zpves = []
-        for line in self.eof(0.5):
+        for line in self.thermochemistry():
             if 'Zero point energy' in line:
                 zpve = float(line.split()[4])
                 zpve *= 2625.5
@@ -333,13 +447,26 @@ class OrcaResults(Results):
         Thermal energy = E(el) + E(ZPE) + E(vib) + E(rot) + E(trans)
         """
         energies = []
-        for line in self.eof(0.5):
+        for line in self.thermochemistry():
             if 'Total thermal energy' in line:
                 energy = float(line.split()[3])
                 energy *= 2625.5
                 energies.append(energy)
         return energies
 
+    def thermochemistry(self):
+        """
+        Lines of the thermochemistry at each temperature, printed after the
+        last vibrational frequencies. Only those lines are read, backwards
+        from the end of the log.
+        """
+        lines = []
+        for line in self.tail(0.5):
+            if "VIBRATIONAL FREQUENCIES" in line:
+                break
+            lines.append(line)
+        return lines[::-1]
+
     ########################
     #  Work in progress ↓  #
     ########################
@@ -365,51 +492,32 @@ class OrcaResults(Results):
     #  TD-DFT Excited states  #
     ###########################
     
+    def _absorption_spectra(self, value):
+        """
+        Returns a list for each absorption spectrum, of `value` of each
+        transition. Spectra are found from the section index.
+        """
+        found = []
+        regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
+        for lines in self.sections("TRANSITION ELECTRIC", lambda line: line == "\n"):
+            values = [value(line) for line in lines if re.search(regex, line)]
+            if len(values) > 0:
+                found.append(values)
+        return found
+
     @property
     def td_dft_wavelengths(self):
         """
         Returns a nested list of wavelengths per iteration
         """
-        waves = []
-        waves_per_iter = []
-        found = False
-        regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
-        for line in self.read():
-            if "TRANSITION ELECTRIC" in line:
-                found = True
-            if found:
-                if re.search(regex, line):
-                    wave = float(line.split()[2])
-                    waves_per_iter.append(wave)
-            if line == "\n":
-                found = False
-                if len(waves_per_iter) > 0:
-                    waves.append(waves_per_iter)
-                    waves_per_iter = []
-        return waves
+        return self._absorption_spectra(lambda line: float(line.split()[2]))
 
     @property
     def td_dft_intensities(self):
         """
         Returns a nested list of intensities
         """
-        ints = []
-        ints_per_iter = []
-        found = False
-        regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
-        for line in self.read():
-            if "TRANSITION ELECTRIC" in line:
-                found = True
-            if found:
-                if re.search(regex, line):
-                    intensity = float(line.split()[4])
-                    ints_per_iter.append(intensity)
-            if line == "\n":
-                found = False
-                if len(ints_per_iter) > 0:
-                    ints.append(ints_per_iter)
-                    ints_per_iter = []
-        return ints
+        return self._absorption_spectra(lambda line: float(line.split()[4]))
 
     @property
     def td_dft_transition_energies(self):
@@ -418,20 +526,5 @@ class OrcaResults(Results):
         from cm-1 to eV
         """
         inverse_cm_to_ev = 1 / 8065.6
-        vals = []
-        vals_per_iter = []
-        found = False
-        regex = "^\s+[0-9]+(\s+-?[0-9]+\.[0-9]+){7}$"
-        for line in self.read():
-            if "TRANSITION ELECTRIC" in line:
-                found = True
-            if found:
-                if re.search(regex, line):
-                    val = float(line.split()[1]) * inverse_cm_to_ev
-                    vals_per_iter.append(val)
-            if line == "\n":
-                found = False
-                if len(vals_per_iter) > 0:
-                    vals.append(vals_per_iter)
-                    vals_per_iter = []
-        return vals
+        return self._absorption_spectra(
+            lambda line: float(line.split()[1]) * inverse_cm_to_ev)
@@ -1,36 +1,155 @@
-from ..core.results import Results
+from ..core.results import (
+    AnyLine,
+    Extractor,
+    FirstLine,
+    LastLine,
+    NormalModeBlocks,
+    Results,
+    Section,
+)
+from ..core.atom import Atom
 
 import re
 
 __all__ = ["PsiResults"]
 
+# energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
+JOB_REGEX = "[A-z]*\('[A-z0-9]*'(.?\s*[A-z]*='[A-z]*')*\)"
+
+
+class SinglyOccupied(Extractor):
+    """
+    Lines of the first singly occupied and virtual orbital sections, as
+    {'singly': [...], 'virtual': [...]}, stopping after four virtual lines
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+
+    def reset(self):
+        self.value = {"singly": [], "virtual": []}
+        self.found_singly_occupied = False
+        self.found_virtual = False
+
+    def feed(self, line):
+        if "Singly Occupied" in line:
+            self.found_singly_occupied = True
+        if "Virtual" in line:
+            self.found_singly_occupied = False
+            self.found_virtual = True
+        if "Final Occupation" in line:
+            self.found_virtual = False
+        if self.found_singly_occupied and line.strip() != "":
+            self.value["singly"].append(line)
+        if self.found_virtual and line.strip() != "":
+            self.value["virtual"].append(line)
+            if len(self.value["virtual"]) > 3:
+                self.done = True
+
+
+class PsiModes(NormalModeBlocks):
+    """
+    Normal modes of the Harmonic Vibrational Analysis section, printed in
+    blocks of up to three modes:
+
+      Vibration                       7                   8
+      Freq [cm^-1]                1746.6068           3874.0393
+      Irrep                           A1                  A1
+      Reduced mass [u]              1.0825              1.0453
+      ...
+      IR activ [km/mol]            72.9963              0.6436
+      ------------------------------------------------------------
+          1   O                 -0.00  0.00  0.07   0.00  0.00 -0.05
+
+    Imaginary frequencies are printed with an i, as 213.4657i.
+    """
+
+    def reset(self):
+        super().reset()
+        self.modes = 0
+        self.started = False
+
+    def values(self, line):
+        return line.split("]", 1)[1].split()
+
+    def feed(self, line):
+        if "==>" in line:
+            # the end of the section, at the header of the next one
+            self.done = self.started
+            self.started = True
+            return
+        label = line.strip()
+        if label.startswith("Vibration"):
+            self.flush()
+        elif label.startswith("Freq [cm^-1]"):
+            freqs = [
+                -float(value[:-1]) if value.endswith("i") else float(value)
+                for value in self.values(line)
+            ]
+            self.modes = len(freqs)
+            self.value["frequencies"] += freqs
+        elif label.startswith("Reduced mass [u]"):
+            self.value["reduced_masses"] += [float(value) for value in self.values(line)]
+        elif label.startswith("IR activ [km/mol]"):
+            self.value["intensities"] += [float(value) for value in self.values(line)]
+        elif self.modes > 0:
+            parts = line.split()
+            if len(parts) == 2 + 3 * self.modes and parts[0].isdigit():
+                self.rows.append(parts[2:])
+
 
 class PsiResults(Results):
     """Class defining the results of a PSI4 calculation."""
 
+    section_headers = (
+        "Geometry (in Angstrom)",
+        "Orbital Energies",
+        "Harmonic Vibrational Analysis",
+    )
+
+    extractors = [
+        AnyLine("completed", "exiting successfully"),
+        FirstLine("job",
+                  lambda line: "('" in line and re.search(JOB_REGEX, line),
+                  marker="('"),
+        FirstLine("multiplicity", "Geometry (in Angstrom)"),
+        FirstLine(
+            "basis", lambda line: "basis" in line and re.search(
+                "basis\s\w*(\-?\w*){1,2}$", line),
+            marker="basis"),
+        LastLine("total_energy", "Total Energy ="),
+        LastLine("hf_energy_for_mp2", "Reference Energy          ="),
+        LastLine("mp2_opp", "Opposite-Spin Energy      ="),
+        LastLine("mp2_same", "Same-Spin Energy          ="),
+        Section("orbital_energies",
+                "Orbital Energies",
+                "Final Occupation",
+                match=lambda line: line.strip() != ""),
+        SinglyOccupied("singly_occupied"),
+    ]
+
+    normal_modes_header = "Harmonic Vibrational Analysis"
+
+    normal_modes_extractor = PsiModes("normal_modes")
+
     def __init__(self, log):
         super().__init__(log)
 
     def completed(self):
-        complete = False
-        for line in self.read():
-            if "exiting successfully" in line:
-                complete = True
-        return complete
+        return self.record["completed"]
 
     def get_runtype(self):
         """
         Returns runtype. For example, for MP2 single points, the line `energy('mp2')` is used. 
         This method returns the string 'energy'.
         """
-        for line in self.read():
-            # need regex for energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
-            if re.search("[A-z]*\('[A-z0-9]*'(.?\s*[A-z]*='[A-z]*')*\)", line):
-                if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
-                    return line.split("(")[0]
-                else:  # optimize('scf', dertype='hess'......)
-                    return line.split("(")[0]  
-                    # add to this later, using the collect additional data
+        line = self.record["job"]
+        if line is not None:
+            if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
+                return line.split("(")[0]
+            else:  # optimize('scf', dertype='hess'......)
+                return line.split("(")[0]
+                # add to this later, using the collect additional data
 
     @property
     def method(self):
@@ -38,13 +157,12 @@ class PsiResults(Results):
         Returns energy type. For example, for MP2 single points, the line `energy('mp2')` is used. 
         This method returns the string 'mp2'.
         """
-        for line in self.read():
-            # need regex for energy('mp2') or optimize('scf', dertype='hess') (any number of k-v pairs)
-            if re.search("[A-z]*\('[A-z0-9]*'(.?\s*[A-z]*='[A-z]*')*\)", line):
-                if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
-                    return re.search("[A-z]*\('([A-z0-9]*)'\)", line).group(1)
-                # else: #optimize('scf', dertype='hess'......)
-                # return line.split('(')[0] #add to this later,
+        line = self.record["job"]
+        if line is not None:
+            if re.search("[A-z]*\('[A-z0-9]*'\)", line):  # energy('mp2')
+                return re.search("[A-z]*\('([A-z0-9]*)'\)", line).group(1)
+            # else: #optimize('scf', dertype='hess'......)
+            # return line.split('(')[0] #add to this later,
 
     def is_optimisation(self):
         return self.get_runtype() == "optimize"
@@ -55,25 +173,41 @@ class PsiResults(Results):
     def is_hessian(self):
         return self.get_runtype() == "frequency"
 
+    def vib_get_geom(self, offset=None):
+        """
+        Returns the geometry of the normal modes at a byte offset, or of the
+        last modes of the log, as a list of |Atom|: the last geometry printed
+        before them
+        """
+        regex = "^\s+[A-z]+(\s+-?[0-9]+\.[0-9]+){3,4}$"
+        starts = [
+            start for start in self.offsets("Geometry (in Angstrom)")
+            if offset is None or start < offset
+        ]
+        if len(starts) == 0:
+            return []
+        atoms = []
+        lines = self.read_from(starts[-1])
+        for line in lines:
+            if re.search(regex, line):
+                sym, x, y, z = line.split()[:4]
+                atoms.append(Atom(sym, coords=[float(x), float(y), float(z)]))
+            elif len(atoms) > 0:
+                break
+        lines.close()
+        return atoms
+
     @property
     def multiplicity(self):
-        for line in self.read():
-            if "Geometry (in Angstrom)" in line:
-                return int(line.split()[-1].replace(":", ""))
+        line = self.record["multiplicity"]
+        if line is not None:
+            return int(line.split()[-1].replace(":", ""))
 
     def _neutral_homo_lumo(self):
         """
         Finds HOMO-LUMO gap for jobs of singlet multiplicity
         """
-        found_region = False
-        energies = []
-        for line in self.read():
-            if "Orbital Energies" in line:
-                found_region = True
-            if "Final Occupation" in line:
-                found_region = False
-            if found_region and line.strip() != "":
-                energies.append(line)
+        energies = self.record["orbital_energies"]
         for index, line in enumerate(energies):
             if "Virtual" in line:
                 homo_lumo = energies[index - 1 : index + 2]
@@ -86,25 +220,8 @@ class PsiResults(Results):
         """
         Finds SOMO-LUMO gap for jobs of doublet multiplicity
         """
-        found_singly_occupied = False
-        found_virtual = False
-        singly = []
-        virtual = []
-        for line in self.read():
-            if "Singly Occupied" in line:
-                found_singly_occupied = True
-            if "Virtual" in line:
-                found_singly_occupied = False
-                found_virtual = True
-            if "Final Occupation" in line:
-                found_virtual = False
-            if found_singly_occupied and line.strip() != "":
-                singly.append(line)
-            if found_virtual and line.strip() != "":
-                virtual.append(line)
-                # save time
-                if len(virtual) > 3:
-                    break
+        singly = self.record["singly_occupied"]["singly"]
+        virtual = self.record["singly_occupied"]["virtual"]
         somo = float(singly[-1].split()[-1])
         lumo = float(virtual[1].split()[1])
         return somo, lumo
@@ -159,9 +276,9 @@ class PsiResults(Results):
         """
         Returns basis set.
         """
-        for line in self.read():
-            if re.search("basis\s\w*(\-?\w*){1,2}$", line):
-                return line.split()[-1]
+        line = self.record["basis"]
+        if line is not None:
+            return line.split()[-1]
 
     @property
     def total_energy(self):
@@ -169,9 +286,9 @@ class PsiResults(Results):
         Returns total energy, printed for scf calculations.
         """
         total = ""
-        for line in self.read():
-            if "Total Energy =" in line:
-                total = float(line.split("=")[1].strip())
+        line = self.record["total_energy"]
+        if line is not None:
+            total = float(line.split("=")[1].strip())
         return total
 
     def _scf_data(self):
@@ -196,9 +313,9 @@ class PsiResults(Results):
         Returns 'reference energy' from MP2 calculations.
         """
         HF = ""
-        for line in self.read():
-            if "Reference Energy          =" in line:
-                HF = float(line.split("=")[1].split()[0].strip())
+        line = self.record["hf_energy_for_mp2"]
+        if line is not None:
+            HF = float(line.split("=")[1].split()[0].strip())
         return HF
 
     @property
@@ -207,9 +324,9 @@ class PsiResults(Results):
         Returns MP2 opposite spin energy.
         """
         opp = ""
-        for line in self.read():
-            if "Opposite-Spin Energy      =" in line:
-                opp = float(line.split("=")[1].split()[0].strip())
+        line = self.record["mp2_opp"]
+        if line is not None:
+            opp = float(line.split("=")[1].split()[0].strip())
         return opp
 
     @property
@@ -218,9 +335,9 @@ class PsiResults(Results):
         Returns MP2 same spin energy.
         """
         same = ""
-        for line in self.read():
-            if "Same-Spin Energy          =" in line:
-                same = float(line.split("=")[1].split()[0].strip())
+        line = self.record["mp2_same"]
+        if line is not None:
+            same = float(line.split("=")[1].split()[0].strip())
         return same
 
     def _mp2_data(self):
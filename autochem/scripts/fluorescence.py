@@ -1,6 +1,9 @@
+from ..interfaces.detect import detect_program
 from ..core.utils import (
     get_files,
+    pool_map,
     read_file,
+    report_errors,
     write_csv_from_nested,
     search_dict_recursively,
     responsive_table,
@@ -11,10 +14,7 @@ __all__ = ["fluorescence_data"]
 
 def is_gaussian(file):
     """Returns True if file is a Gaussian output"""
-    for line in read_file(file):
-        if "Gaussian" in line:
-            return True
-    return False
+    return detect_program(file) == "gaussian"
 
 
 def is_fluorescence(file):
@@ -28,8 +28,11 @@ def is_fluorescence(file):
     return False
 
 
-def get_fluorescence_logs(dir, filepath_includes=None):
-    files = get_files(dir, ["log", "out"], filepath_includes=filepath_includes)
+def get_fluorescence_logs(dir, filepath_includes=None, **search):
+    files = get_files(dir, ["log", "out"],
+                      filepath_includes=filepath_includes,
+                      compressed=True,
+                      **search)
     # remove f- files from qcp results output
     for file in files:
         if "f-" in file:
@@ -158,7 +161,19 @@ def find_spectral_data(file, d, name, root, cutoff):
     return d
 
 
-def grep_data(cutoff, files):
+def grep_file(cutoff, file):
+    """
+    Returns the data of `grep_data` for a single file, or None if the file
+    is not a fluorescence calculation
+    """
+    if not (is_gaussian(file) and is_fluorescence(file)):
+        return None
+    res, name = update_dict_with_name(file, {})
+    res, root = find_root(file, res, name)
+    return find_spectral_data(file, res, name, root, cutoff)
+
+
+def grep_data(cutoff, files, workers=1):
     """Return a dictionary of data in the form
     
     data = {
@@ -172,13 +187,19 @@ def grep_data(cutoff, files):
                    }
                  }
            }
+
+    Files are read in a pool of `workers` processes.
     """
     res = {}
-    for file in files:
-        if is_gaussian(file) and is_fluorescence(file):
-            res, name = update_dict_with_name(file, res)
-            res, root = find_root(file, res, name)
-            res = find_spectral_data(file, res, name, root, cutoff)
+    errors = []
+    found = pool_map(grep_file, [(cutoff, file) for file in files], workers)
+    for file, (data, error) in zip(files, found):
+        if error is not None:
+            errors.append((file, error))
+        elif data is not None:
+            for name, roots in data.items():
+                res.setdefault(name, {}).update(roots)
+    report_errors(errors)
     return res
 
 
@@ -225,11 +246,16 @@ def one_level_dict(res):
     return output
 
 
-def fluorescence_data(dir, output, autosave=False, string_to_find=None):
+def fluorescence_data(dir,
+                      output,
+                      autosave=False,
+                      string_to_find=None,
+                      workers=1,
+                      **search):
     cutoff = user_choice()
-    files = get_fluorescence_logs(dir, filepath_includes=string_to_find)
+    files = get_fluorescence_logs(dir, filepath_includes=string_to_find, **search)
     if len(files) > 0:
-        data = grep_data(cutoff, files)
+        data = grep_data(cutoff, files, workers=workers)
         onelevel = one_level_dict(data)
         data = transform(data)
         responsive_table(onelevel, strings=[1, 2, 3], min_width=2)
@@ -1,20 +1,28 @@
 from ..core.atom import Atom
 from ..core.molecule import Molecule
-from ..core.thermo import thermo_data, freq_data_gamess, freq_data_gauss
+from ..core.result_store import ResultStore
+from ..core.row_stream import RowStream
+from ..core.thermo import (THERMO_CACHE, thermo_input_record, thermo_rows,
+                           temperature_grid, freq_data_gamess, freq_data_gauss,
+                           read_rotors)
 from ..core.utils import (
     check_user_input,
-    eof,
+    find_files,
     get_files,
     list_of_dicts_to_one_level_dict,
+    pool_map,
+    prefetch,
+    PREFETCH_BUDGET,
+    read_backwards,
     read_file,
+    report_errors,
     responsive_table,
+    strip_compression,
     write_csv_from_dict,
     write_csv_from_nested,
 )
-from ..interfaces.gamess_results import GamessResults
-from ..interfaces.orca_results import OrcaResults
-from ..interfaces.psi_results import PsiResults
-from ..interfaces.gaussian_results import GaussianResults
+from ..interfaces.detect import detect_program, results_class
+import itertools
 import os
 import re
 import sys
@@ -24,9 +32,13 @@ __all__ = [
     "get_h_bonds",
     "file_as_results_class",
     "homo_lumo_gaps",
+    "molden_files",
     "energies",
+    "parse_log",
+    "parse_logs",
     "print_freqs",
     "print_freqs_to_csv",
+    "read_charges",
     "energy_table",
     "search_for_coords",
     "thermochemistry",
@@ -54,7 +66,7 @@ def search_for_coords(dir):
                          for f in os.listdir(f"{r.path}/spec"))
         return reruns or equils
 
-    for log in get_files(dir, (".log", ".out")):
+    for log in get_files(dir, (".log", ".out"), compressed=True):
         r = file_as_results_class(log)
         if r is not None and r.is_optimisation():
             if not checked_before(r):
@@ -63,76 +75,377 @@ def search_for_coords(dir):
                 print()
 
 
-def file_as_results_class(log):
-    """Return an instance of the desired class- |GamessResults|, |PsiResults|"""
-    log_type = get_type(log)
-    logs = {
-        "gamess": GamessResults(log),
-        "orca": OrcaResults(log),
-        "psi": PsiResults(log),
-        "gaussian": GaussianResults(log),
-    }
-    return logs.get(log_type, None)
+def file_as_results_class(log, log_type=None):
+    """
+    Return an instance of the desired class- |GamessResults|, |PsiResults|.
+    Pass `log_type` if the type of log is already known.
+    """
+    return results_class(log, log_type)
 
 
 def get_type(filepath):
     """
-    Read in file, determine calculation type
+    Read the start of the file, determine calculation type
     """
-    for line in read_file(filepath):
-        if "GAMESS" in line:
-            return "gamess"
-        elif "Psi4" in line or "PSI4" in line:
-            return "psi"
-        elif "Gaussian" in line:
-            return "gaussian"
-        elif "O   R   C   A" in line:
-            return "orca"
+    return detect_program(filepath)
+
+
+# bump whenever a field of LOG_FIELDS, or a parser that one uses, changes
+# what it returns, so that values stored by older code are parsed again
+LOG_FIELDS_VERSION = 1
+
+# store of values already parsed from logs, so that only new or changed
+# logs are parsed again
+RESULT_STORE = ResultStore(version=LOG_FIELDS_VERSION)
+
+# values that can be stored for each log, found from its Results instance.
+# file and path are left out of energies and homo_lumo, as they depend on the
+# directory the log is found from
+LOG_FIELDS = {
+    "completed": lambda calc: calc.completed(),
+    "runtype": lambda calc: calc.get_runtype(),
+    "is_spec": lambda calc: calc.is_spec(),
+    "is_optimisation": lambda calc: calc.is_optimisation(),
+    "is_hessian": lambda calc: calc.is_hessian(),
+    "method": lambda calc: calc.method,
+    "basis": lambda calc: calc.basis,
+    "energies": lambda calc: list(calc.get_data())[2:],
+    "homo_lumo": lambda calc: {
+        k: v
+        for k, v in calc.homo_lumo_info.items() if k not in ("File", "Path")
+    },
+    "frequencies": lambda calc: calc.frequencies,
+    "intensities": lambda calc: calc.intensities,
+    "charges": lambda calc: read_charges(calc.log),
+    "thermo_input": lambda calc: thermo_input_record(calc.log),
+}
 
+# found for every log the first time it is parsed
+HEADER_FIELDS = ("completed", "runtype", "is_spec", "is_optimisation",
+                 "is_hessian", "method", "basis")
+
+
+def find_fields(log, entry, fields=()):
+    """
+    Parses the values of `fields` missing from `entry`, a dictionary of
+    values from a log as returned by `parse_log`, or None for a log that
+    hasn't been parsed before. Returns the entry, and whether it changed.
+    Doesn't use the store, so that logs can be parsed in other processes.
+
+    A new entry has the 'stat' of the log taken before it is parsed, which
+    is what it is stored under, so that a log written to while it is parsed
+    is parsed again next time.
+    """
+    calc = None
+    changed = False
+
+    def find(names):
+        nonlocal calc, changed
+        for name in names:
+            if name in entry:
+                continue
+            changed = True
+            if entry["program"] is None:
+                entry[name] = None
+                continue
+            if calc is None:
+                calc = file_as_results_class(log, entry["program"])
+            try:
+                entry[name] = LOG_FIELDS[name](calc)
+            except Exception as error:
+                entry[name] = None
+                entry["errors"][name] = f"{error.__class__.__name__}: {error}"
+
+    if entry is None:
+        entry = {"stat": ResultStore.stat(log), "errors": {}}
+        entry["program"] = get_type(log)
+        find(HEADER_FIELDS)
+    if callable(fields):
+        fields = fields(entry)
+    find(fields)
+    return entry, changed
+
+
+def parse_log(log, fields=(), store=None):
+    """
+    Returns a dictionary of values parsed from a log file- the program that
+    wrote it, whether it completed, its runtype, method and basis, along with
+    any other `fields` of LOG_FIELDS. `fields` can also be a function of the
+    dictionary that returns the fields needed, so that for example energies
+    are only found for completed calculations.
+
+    Values are taken from `store` (RESULT_STORE by default) if the log hasn't
+    changed since it was stored, and only missing values are parsed. Values
+    that can't be found are None, with the error kept in the 'errors'
+    dictionary. Files that are not logs of calculations have a program of None.
+    """
+    if store is None:
+        store = RESULT_STORE
+    entry, changed = find_fields(log, store.load(log), fields)
+    if changed:
+        store.save(log, entry)
+    return entry
+
+
+def parse_logs(logs,
+               fields=(),
+               workers=1,
+               store=None,
+               readahead=0,
+               readahead_budget=PREFETCH_BUDGET):
+    """
+    Returns a list of the logs, `parse_log(log, fields)` for each log in the
+    same order, and a list of (log, error) for logs that could not be read
+    at all, whose entry is None.
 
-def need_gauss_energy(calc):
+    Logs that need parsing are shared between a pool of `workers` processes;
+    the store is only read and written from this process. If `fields` is a
+    function it must be defined at module level, so that it can be sent to
+    the workers. `logs` can be a generator such as `find_files`, so that
+    logs are parsed while the rest are still being found.
+
+    With `readahead` threads, logs that need parsing are read ahead of the
+    workers with `prefetch`, up to `readahead_budget` bytes, so that slow
+    reads overlap with parsing.
+    """
+    if store is None:
+        store = RESULT_STORE
+    found_logs = []
+    entries = []
+    todo = []
+
+    def complete(entry):
+        if entry is None:
+            return False
+        names = fields(entry) if callable(fields) else fields
+        return all(name in entry for name in names)
+
+    def to_parse():
+        for log in logs:
+            found_logs.append(log)
+            entries.append(store.load(log))
+            if not complete(entries[-1]):
+                todo.append(len(entries) - 1)
+                yield log, entries[-1], fields
+
+    found = pool_map(
+        find_fields,
+        prefetch(to_parse(), readahead, readahead_budget, key=lambda args: args[0]),
+        workers)
+    logs = found_logs
+    errors = []
+    for i, (result, error) in zip(todo, found):
+        if error is not None:
+            entries[i] = None
+            errors.append((logs[i], error))
+            continue
+        entries[i], changed = result
+        if changed:
+            store.save(logs[i], entries[i])
+    store.commit()
+    return logs, entries, errors
+
+
+# logs parsed at a time when streaming results, so that memory stays bounded
+STREAM_BATCH = 500
+
+
+def iter_logs(logs, fields=(), workers=1, batch_size=None, **parse):
+    """
+    Yields (log, entry, error) for each of `logs` in order, parsed by
+    `parse_logs` `batch_size` logs at a time, so that only one batch is
+    kept in memory. All logs are parsed in one batch by default. error is
+    None unless the log could not be read at all. `parse` is passed on to
+    `parse_logs`, eg. readahead=4
+    """
+    logs = iter(logs)
+    while True:
+        batch, entries, errors = parse_logs(itertools.islice(logs, batch_size),
+                                            fields, workers, **parse)
+        if not batch:
+            return
+        errors = dict(errors)
+        for log, entry in zip(batch, entries):
+            yield log, entry, errors.get(log)
+
+
+def scan_of(dir, **arguments):
+    """
+    Returns the `scan` of a |RowStream| of the logs found in `dir`: its
+    absolute path, the path given, which starts the path of every log, and
+    the arguments that decide which logs are found and what their rows are.
+    A scan is only resumed by the same scan.
+    """
+    arguments.pop("manifest", None)
+    return dict(root=os.path.abspath(dir), dir=dir, **arguments)
+
+
+def stream_rows(filename, columns, logs, found, scan=None):
+    """
+    Writes the rows of each log to `filename` as soon as they are found,
+    with a |RowStream|, so that memory stays bounded and an interrupted scan
+    resumes where it stopped the next time. `found(logs, errors)` yields
+    (log, rows) for each of `logs`, appending logs that could not be read
+    to `errors`; rows is empty for logs without any. `scan` describes the
+    scan, see `scan_of`; the output of any other scan is not resumed.
     """
-    Returns True is there is an energy to be pulled from a Gaussian file. 
+    errors = []
+    with RowStream(filename, columns, scan) as out:
+        logs = (log for log in logs if not out.done(log))
+        for log, rows in found(logs, errors):
+            out.write(rows, log)
+    report_errors(errors)
+    print(f"{out.rows} rows written to {filename}")
+
+
+def field_errors(log, entry, fields):
+    """
+    Returns a list of (log, error) for each of `fields` that could not be
+    parsed from a log, for `report_errors`
+    """
+    return [(log, f"{name}- {entry['errors'][name]}") for name in fields
+            if name in entry["errors"]]
+
+
+def need_gauss_energy(entry):
+    """
+    Returns True is there is an energy to be pulled from a Gaussian file,
+    given the values parsed from it by `parse_log`.
     Required as Gaussian hessian calculations can be preceeded by optimisations,
-    so the calc.is_hessian() call is irrelevant.
+    so the is_hessian value is irrelevant.
     """
-    return isinstance(
-        calc, GaussianResults) and calc.is_optimisation() or calc.is_spec()
+    return entry["program"] == "gaussian" and entry[
+        "is_optimisation"] or entry["is_spec"]
+
+
+def energy_fields(entry):
+    """Fields of `parse_log` needed by `energies`"""
+    # add provision for energies of opts only if equilibrium found
+    if entry["completed"] and (not entry["is_hessian"]
+                               or need_gauss_energy(entry)):
+        return ["energies"]
+    return []
+
 
+def homo_lumo_fields(entry):
+    """Fields of `parse_log` needed by `homo_lumo_gaps`"""
+    return ["homo_lumo"] if entry["completed"] and entry["is_spec"] else []
 
-def energies(dir, filepath_includes):
+
+def freq_fields(entry):
+    """Fields of `parse_log` needed by `print_freqs`"""
+    return ["frequencies", "intensities"] if entry["is_hessian"] else []
+
+
+def find_energies(logs, errors, workers=1, **parse):
     """
-    Used internally to parse log files for energies
+    Yields (log, result) for each of `logs`, where result is
+    {"data": (file, path, method, basis, hf, mp2, mp2_opp, mp2_same),
+    "type": program}, or None for logs without energies. Logs that could not
+    be read are added to `errors`. `parse` is passed on to `iter_logs`.
     """
-    output = []
-    for log in get_files(dir, (".out", ".log"),
-                         filepath_includes=filepath_includes):
-        calc = file_as_results_class(log)
-        filetype = get_type(log)
-        try:
-            if (
-                    calc.completed()
-            ):  # add provision for energies of opts only if equilibrium found
-                if not calc.is_hessian() or need_gauss_energy(calc):
-                    print(log)
-                    data = calc.get_data()
-                    output.append({"data": data, "type": filetype})
-        except AttributeError:  # if log/out files are not logs of calculations
+    for log, entry, error in iter_logs(logs, energy_fields, workers, **parse):
+        if error is not None:
+            errors.append((log, error))
+            entry = None
+        # None if log/out files are not logs of calculations
+        if entry is None or not energy_fields(entry):
+            yield log, None
             continue
+        if entry["energies"] is None:
+            errors += field_errors(log, entry, ["energies"])
+            yield log, None
+            continue
+        print(log)
+        path, file = os.path.split(log)
+        data = (file, path, *entry["energies"])
+        yield log, {"data": data, "type": entry["program"]}
+
+
+def energies(dir,
+             filepath_includes,
+             workers=1,
+             readahead=0,
+             readahead_budget=PREFETCH_BUDGET,
+             **search):
+    """
+    Used internally to parse log files for energies. `search` is passed on
+    to `find_files`, eg. depth=2, exclude=["*/old/*"], and `readahead` is
+    the number of threads reading logs ahead of parsing, see `parse_logs`.
+    """
+    logs = find_files(dir, (".out", ".log"),
+                      filepath_includes=filepath_includes,
+                      compressed=True,
+                      **search)
+    errors = []
+    output = [
+        result for _, result in find_energies(logs,
+                                              errors,
+                                              workers,
+                                              readahead=readahead,
+                                              readahead_budget=readahead_budget)
+        if result is not None
+    ]
+    report_errors(errors)
     return output
 
 
-def energy_table(dir, file_name, string_to_find=None, autosave=None):
+def energy_table(dir,
+                 file_name,
+                 string_to_find=None,
+                 autosave=None,
+                 workers=1,
+                 readahead=0,
+                 readahead_budget=PREFETCH_BUDGET,
+                 stream=False,
+                 **search):
     """
     Prints energies of all log/out files in current and any sub directories to the screen,
     with the option of saving to csv.
+
+    With `stream=True`, rows are written to `file_name` (csv, or json lines
+    if it ends in .jsonl) as each log is read instead, without the table or
+    asking first; see `stream_rows`.
     """
+    keys = (
+        "File",
+        "Path",
+        "Method",
+        "Basis",
+        "HF/DFT",
+        "MP2/SRS",
+        "MP2_opp",
+        "MP2_same",
+    )
+    if stream:
+        logs = find_files(dir, (".out", ".log"),
+                          filepath_includes=string_to_find,
+                          compressed=True,
+                          **search)
+
+        def found(logs, errors):
+            for log, result in find_energies(logs,
+                                             errors,
+                                             workers,
+                                             batch_size=STREAM_BATCH,
+                                             readahead=readahead,
+                                             readahead_budget=readahead_budget):
+                yield log, [] if result is None else [result["data"]]
+
+        return stream_rows(file_name, keys, logs, found,
+                           scan_of(dir, string_to_find=string_to_find, **search))
+
     # lists are faster to fill than dict values
     # order: file, path, method, basis, hf, mp2, mp2_opp, mp2_same
     data = [[], [], [], [], [], [], [], []]
     # at some point, will make this a dictionary, loads clearer that way.
 
-    output = energies(dir, filepath_includes=string_to_find)
+    output = energies(dir,
+                      filepath_includes=string_to_find,
+                      workers=workers,
+                      readahead=readahead,
+                      readahead_budget=readahead_budget,
+                      **search)
 
     def add_data(data, vals):
         """
@@ -152,16 +465,6 @@ def energy_table(dir, file_name, string_to_find=None, autosave=None):
     for result in output:
         data = add_data(data, result["data"])
 
-    keys = (
-        "File",
-        "Path",
-        "Method",
-        "Basis",
-        "HF/DFT",
-        "MP2/SRS",
-        "MP2_opp",
-        "MP2_same",
-    )
     table_data = {}
     for key, val in zip(keys, data):
         table_data[key] = val
@@ -175,24 +478,34 @@ def energy_table(dir, file_name, string_to_find=None, autosave=None):
     write_csv_from_dict(table_data, filename=file_name, autosave=autosave)
 
 
-def homo_lumo_gaps(dir, output, string_to_find=None, autosave=None):
+def homo_lumo_gaps(dir,
+                   output,
+                   string_to_find=None,
+                   autosave=None,
+                   workers=1,
+                   **search):
     """
     Returns HOMO-LUMO or SOMO-LUMO gaps for each single point calculation
     found in any subdirectory. Currently restricted to single points for
     simplicity, but can probably be extended to optimisations if needed- 
     would have to check the log files first.
     """
+    logs = find_files(dir, (".out", ".log"),
+                      filepath_includes=string_to_find,
+                      compressed=True,
+                      **search)
+    logs, entries, errors = parse_logs(logs, homo_lumo_fields, workers)
     info = []
-    for log in get_files(dir, (".out", ".log"),
-                         filepath_includes=string_to_find):
-        calc = file_as_results_class(log)
-        filetype = get_type(log)
-        try:
-            if calc.completed() and calc.is_spec():
-                data = calc.homo_lumo_info
-                info.append(data)
-        except AttributeError:  # if log/out files are not logs of calculations
+    for log, entry in zip(logs, entries):
+        # None if log/out files are not logs of calculations
+        if entry is None or not homo_lumo_fields(entry):
             continue
+        if entry["homo_lumo"] is None:
+            errors += field_errors(log, entry, ["homo_lumo"])
+            continue
+        path, file = os.path.split(log)
+        info.append({"File": file, "Path": path, **entry["homo_lumo"]})
+    report_errors(errors)
     if len(info) == 0:
         sys.exit("Error: No single points found")
     info = list_of_dicts_to_one_level_dict(info)
@@ -201,61 +514,203 @@ def homo_lumo_gaps(dir, output, string_to_find=None, autosave=None):
     return info
 
 
-def thermochemistry(dir, string_to_find, mult, temp, output, autosave=None):
+THERMO_KEYS = ("File", "Method", "Basis", "Temperature [K]",
+               "Multiplicity given", "ZPVE", "TC", "S tot", "S elec",
+               "S trans", "S rot", "S vib", "TC - TS")
+
+# columns added by hindered rotors, empty for logs without any
+THERMO_HR_KEYS = ("TC HR", "S vib HR", "S tot HR")
+
+
+def thermo_units(key):
+    """Adds units to the name of a column of `thermochemistry`"""
+    if key in ("ZPVE", "TC", "TC - TS", "TC HR"):
+        return key + " [kJ/mol]"
+    if key in ("S tot", "S elec", "S trans", "S rot", "S vib", "S vib HR",
+               "S tot HR"):
+        return key + " [J/(mol K)]"
+    return key
+
+
+def log_rotors(log, rotors):
+    """
+    Returns the key of `rotors` ({log: rotors}, see `read_rotors`) that is
+    `log`, by path or else by file name, or None
+    """
+    for name in rotors:
+        if os.path.normpath(name) == os.path.normpath(log):
+            return name
+    for name in rotors:
+        if os.path.basename(name) == os.path.basename(log):
+            return name
+    return None
+
+
+def thermo_fields(entry):
+    """Fields needed for the thermochemistry of a log"""
+    if entry["completed"] and entry["is_hessian"]:
+        return ["thermo_input"]
+    return []
+
+
+def find_thermo(logs,
+                errors,
+                mult,
+                temp,
+                workers=1,
+                batch_size=None,
+                readahead=0,
+                readahead_budget=PREFETCH_BUDGET,
+                sqrt_pi=False,
+                rotors=None):
+    """
+    Yields (log, rows) for each of `logs`, where rows is a list of
+    dictionaries of `THERMO_KEYS` for completed hessians, one for each
+    temperature in `temp` (see `temperature_grid`), and empty for any other
+    log. Logs that could not be read are added to `errors`. S rot includes
+    √π with `sqrt_pi` (see `thermo_properties`). See `iter_logs` for the
+    other arguments.
+
+    `rotors` is the hindered rotors of any of the logs, as {log: rotors}
+    (see `read_rotors`), matched by path or else by file name. Their rows
+    then also have the `THERMO_HR_KEYS`.
+
+    The frequencies and geometry of each hessian are kept in RESULT_STORE,
+    and the results in THERMO_CACHE, so analysing the same hessians again
+    reads neither the logs nor calculates anything.
+    """
+    temps = temperature_grid(temp)
+    rotors = rotors or {}
+    parsed = iter_logs(logs,
+                       thermo_fields,
+                       workers=workers,
+                       batch_size=batch_size,
+                       readahead=readahead,
+                       readahead_budget=readahead_budget)
+    for log, entry, error in parsed:
+        if error is not None:
+            errors.append((log, error))
+        if entry is None or not thermo_fields(entry):
+            yield log, []
+            continue
+        if entry["thermo_input"] is None:
+            errors += field_errors(log, entry, ["thermo_input"])
+            yield log, []
+            continue
+        try:
+            rows = thermo_rows(**entry["thermo_input"],
+                               mult=mult,
+                               temp=temps,
+                               rotors=rotors.get(log_rotors(log, rotors)),
+                               sqrt_pi=sqrt_pi)
+        except ValueError as error:
+            errors.append((log, f"{error.__class__.__name__}: {error}"))
+            yield log, []
+            continue
+        for t, res in zip(temps, rows):
+            res["File"] = log
+            res["Method"] = entry["method"]
+            res["Basis"] = entry["basis"]
+            res["Temperature [K]"] = float(t)
+            res["Multiplicity given"] = mult
+        yield log, rows
+    THERMO_CACHE.commit()
+
+
+def unmatched_rotors(rotors, logs):
+    """
+    Returns a list of (name, error) for the entries of `rotors` (see
+    `read_rotors`) that match none of `logs`, for `report_errors`
+    """
+    matched = {log_rotors(log, rotors) for log in logs}
+    return [(name, "no log found for its hindered rotors")
+            for name in rotors if name not in matched]
+
+
+def thermochemistry(dir,
+                    string_to_find,
+                    mult,
+                    temp,
+                    output,
+                    autosave=None,
+                    workers=1,
+                    readahead=0,
+                    readahead_budget=PREFETCH_BUDGET,
+                    stream=False,
+                    sqrt_pi=False,
+                    rotors=None,
+                    **search):
     """
     Returns thermochemical data for all the relevant hessian log files in the given directory and
     subdirectories. Saves to csv file.
+
+    `temp` can be several temperatures, such as '200:400:5' (see
+    `temperature_grid`). Each log is then read once, and the table has a row
+    for each log at each temperature.
+
+    With `stream=True`, rows are written to `output` (csv, or json lines if
+    it ends in .jsonl) as each log is read instead, without the table or
+    asking first; see `stream_rows`.
+
+    S rot is that of thermo.f, unless `sqrt_pi` is set to include the factor
+    of √π it leaves out (see `thermo_properties`).
+
+    `rotors` is a json file of hindered rotors (see `read_rotors`), or the
+    dictionary read from one, which adds the columns `THERMO_HR_KEYS`.
     """
-    collected = {
-        "File": [],
-        "Method": [],
-        "Basis": [],
-        "Temperature [K]": [],
-        "Multiplicity given": [],
-        "ZPVE": [],
-        "TC": [],
-        "S tot": [],
-        "S elec": [],
-        "S trans": [],
-        "S rot": [],
-        "S vib": [],
-        "TC - TS": [],
-    }
+    try:
+        temp = temperature_grid(temp)
+        if isinstance(rotors, str):
+            rotors = read_rotors(rotors)
+    except ValueError as error:
+        sys.exit(f"Error: {error}")
+    keys = THERMO_KEYS + THERMO_HR_KEYS if rotors else THERMO_KEYS
+    found_logs = []
+
+    def remember(logs):
+        # every log found, to check each hindered rotor is of one of them
+        for log in logs:
+            found_logs.append(log)
+            yield log
+
+    logs = remember(
+        find_files(dir, (".log", ".out"),
+                   filepath_includes=string_to_find,
+                   compressed=True,
+                   **search))
+    parse = dict(readahead=readahead,
+                 readahead_budget=readahead_budget,
+                 sqrt_pi=sqrt_pi,
+                 rotors=rotors)
+    if stream:
+
+        def found(logs, errors):
+            for log, rows in find_thermo(logs, errors, mult, temp, workers,
+                                         batch_size=STREAM_BATCH, **parse):
+                yield log, [[res.get(k, "") for k in keys] for res in rows]
+
+        scan = scan_of(dir,
+                       string_to_find=string_to_find,
+                       mult=mult,
+                       temp=temp,
+                       sqrt_pi=sqrt_pi,
+                       rotors=rotors,
+                       **search)
+        stream_rows(output, [thermo_units(k) for k in keys], logs, found, scan)
+        report_errors(unmatched_rotors(rotors or {}, found_logs))
+        return
+
+    collected = {key: [] for key in keys}
     print("Print csv for more info")
-    for log in get_files(dir, (".log", ".out"),
-                         filepath_includes=string_to_find):
-        r = file_as_results_class(log)
-        try:
-            if r.completed():
-                if r.is_hessian():
-                    res = thermo_data(r.log, mult, temp)
-                    res["File"] = r.log
-                    res["Method"] = r.method
-                    res["Basis"] = r.basis
-                    res["Temperature [K]"] = temp
-                    res["Multiplicity given"] = mult
-
-                    for k, v in res.items():
-                        collected[k].append(v)
-        except AttributeError:
-            continue
-        except UnicodeDecodeError:
-            print(f"{log}- UnicodeDecodeError")
-            continue
+    errors = []
+    for log, rows in find_thermo(logs, errors, mult, temp, workers, **parse):
+        for res in rows:
+            for k in keys:
+                collected[k].append(res.get(k, ""))
+    report_errors(errors + unmatched_rotors(rotors or {}, found_logs))
 
     # add units to dict keys
-
-    kj = ("ZPVE", "TC", "TC - TS")
-    jmol = ("S tot", "S elec", "S trans", "S rot", "S vib")
-    kv = list(collected.items())
-    collected.clear()
-    for k, v in kv:
-        if k in kj:
-            collected[k + " [kJ/mol]"] = v
-        elif k in jmol:
-            collected[k + " [J/(mol K)]"] = v
-        else:
-            collected[k] = v
+    collected = {thermo_units(k): v for k, v in collected.items()}
 
     responsive_table(
         {
@@ -270,7 +725,12 @@ def thermochemistry(dir, string_to_find, mult, temp, output, autosave=None):
     name = write_csv_from_dict(collected, filename=output, autosave=autosave)
 
 
-def print_freqs(dir, output, string_to_find=None, autosave=None):
+def print_freqs(dir,
+                output,
+                string_to_find=None,
+                autosave=None,
+                workers=1,
+                **search):
     """
     Writes frequencies and intensities of GAMESS/Gaussian frequency calculations
     to a csv. Works recursively through the file system.
@@ -279,14 +739,22 @@ def print_freqs(dir, output, string_to_find=None, autosave=None):
     data["File"] = []
     data["Frequencies"] = []
     data["Intensities"] = []
-    for file in get_files(dir, ["log", "out"],
-                          filepath_includes=string_to_find):
-        if "slurm" not in file:
-            calc = file_as_results_class(file)
-            if calc.is_hessian():
-                data["Frequencies"] += calc.frequencies
-                data["Intensities"] += calc.intensities
-                data["File"] += [calc.log] * len(calc.frequencies)
+    files = (file for file in find_files(dir, ["log", "out"],
+                                         filepath_includes=string_to_find,
+                                         compressed=True,
+                                         **search)
+             if "slurm" not in file)
+    files, entries, errors = parse_logs(files, freq_fields, workers)
+    for file, entry in zip(files, entries):
+        if entry is None or not freq_fields(entry):
+            continue
+        if None in (entry["frequencies"], entry["intensities"]):
+            errors += field_errors(file, entry, freq_fields(entry))
+            continue
+        data["Frequencies"] += entry["frequencies"]
+        data["Intensities"] += entry["intensities"]
+        data["File"] += [file] * len(entry["frequencies"])
+    report_errors(errors)
     responsive_table(data, strings=[1])
     write_csv_from_dict(data, filename=output, autosave=autosave)
 
@@ -308,6 +776,42 @@ def print_freqs_to_csv(dir):
                         f.write(f"{freq},{intensity}\n")
 
 
+def write_molden_file(log):
+    """
+    Writes the normal modes of a log to a Molden file next to it, returning
+    the filename, or None if there are no normal modes. At module level, so
+    that it can be called by a pool of processes.
+    """
+    calc = file_as_results_class(log)
+    if calc is None:
+        return None
+    return calc.write_molden()
+
+
+def molden_files(dir, string_to_find=None, workers=1, **search):
+    """
+    Writes a Molden file of the normal modes of each GAMESS, Gaussian, ORCA
+    and PSI4 frequency calculation, next to its log with the extension
+    .molden, for animating the vibrations. Only the vibrational section of
+    each log is read. Works recursively through the file system.
+    """
+    files = [
+        file for file in find_files(dir, ["log", "out"],
+                                    filepath_includes=string_to_find,
+                                    compressed=True,
+                                    **search)
+        if "slurm" not in file
+    ]
+    errors = []
+    written = pool_map(write_molden_file, [(file, ) for file in files], workers)
+    for file, (molden, error) in zip(files, written):
+        if error is not None:
+            errors.append((file, error))
+        elif molden is not None:
+            print(f"Normal modes of {file} written to {molden}")
+    report_errors(errors)
+
+
 def get_h_bonds(dir, output=None, string_to_find=None, autosave=None):
     """
     Searches the current directory for xyz files, then attempts to split them
@@ -385,8 +889,7 @@ def get_h_bonds(dir, output=None, string_to_find=None, autosave=None):
 
 def file_is_gamess(file):
     """ Check first line of file for 'rungms' string """
-    with open(file, "r") as f:
-        return "rungms" in f.readline()
+    return "rungms" in next(read_file(file), "")
 
 
 def file_is_gaussian(file):
@@ -399,124 +902,143 @@ def file_is_gaussian(file):
     return False
 
 
-def charges(dir, output, string_to_find=None, autosave=None):
+def read_charges(logfile):
+    """
+    Returns a list of [symbol, x, y, z, charge] for each atom of a Gaussian
+    log, with mulliken charges, or a GAMESS log, with geodesic charges and
+    coordinates from the input file. Returns None for other files.
+    """
+    atoms = []
+    if file_is_gaussian(logfile):
+        atom_regex = "^\s?[A-z]{1,2}(\s+-?[0-9]+\.[0-9]+){3}"
+        charge_regex = "^\s+[0-9]+\s+[A-z]{1,2}\s+-?[0-9]+\.[0-9]+"
+        #     1  C   -0.122119
+        for line in read_file(logfile):
+            if re.search(atom_regex, line):
+                sym, x, y, z = line.split()
+                x, y, z = map(float, (x, y, z))
+                atoms.append([sym, x, y, z])  # new key for each coord
+        # the last mulliken charges, read backwards from the end of the
+        # block to its header
+        charges = None
+        for line in read_backwards(logfile, fraction=0.20):
+            if "Sum of Mulliken charges" in line:
+                charges = []
+            elif charges is not None and "Mulliken charges:" in line:
+                break
+            elif charges is not None and re.search(charge_regex, line):
+                charges.append(float(line.split()[-1]))
+        for counter, charge in enumerate(reversed(charges or [])):
+            atoms[counter].append(charge)
+
+    elif file_is_gamess(logfile):
+        atom_regex = "^\s[A-Za-z]{1,2}\s*[0-9]*.[0-9]*(\s*-?[0-9]*.[0-9]*){3}$"
+        charge_regex = "^\s[A-Za-z]{1,2}(\s*-?[0-9]*.[0-9]*){2}$"
+        inpfile = strip_compression(logfile)[:-3] + "inp"
+
+        for line in read_file(inpfile):
+            if re.search(atom_regex, line):
+                sym, atnum, x, y, z = line.split()
+                x, y, z = map(float, (x, y, z))
+                atoms.append([sym, x, y, z])  # new key for each coord
+        found = False
+        counter = 0
+        for line in read_file(logfile):
+            if "NET CHARGES:" in line:
+                found = True
+            if "RMS DEVIATION" in line:
+                break
+            if found:
+                if re.search(charge_regex, line):
+                    atoms[counter].append(float(line.split()[1]))
+                    counter += 1
+    else:
+        return None
+    return atoms
+
+
+def find_charges(logs, errors, workers=1, **parse):
+    """
+    Yields (log, rows) for each of `logs`, with a row of [path, index,
+    element, charge, x, y, z, fragment] for each atom, or no rows for logs
+    without charges. Logs that could not be read are added to `errors`.
+    `parse` is passed on to `iter_logs`.
+    """
+    for logfile, entry, error in iter_logs(logs, ["charges"], workers, **parse):
+        if error is not None:
+            errors.append((logfile, error))
+        if entry is None:
+            yield logfile, []
+            continue
+        atoms = entry["charges"]
+        if atoms is None:
+            errors += field_errors(logfile, entry, ["charges"])
+            yield logfile, []
+            continue
+        print(logfile)
+        coordinates = [tuple(atom[:4]) for atom in atoms]
+        mol = Molecule(atoms=coordinates)
+        mol.separate()
+        rows = []
+        for atom, r in zip(mol.coords, atoms):
+            sym, x, y, z, charge = r
+            try:
+                fragment = f"{mol.fragments[atom.mol]['name']}_{atom.mol}"
+            except KeyError:
+                fragment = "NA"
+            rows.append([
+                logfile,
+                atom.index,
+                atom.symbol,
+                charge,
+                atom.x,
+                atom.y,
+                atom.z,
+                fragment,
+            ])
+        yield logfile, rows
+
+
+def charges(dir,
+            output,
+            string_to_find=None,
+            autosave=None,
+            workers=1,
+            readahead=0,
+            readahead_budget=PREFETCH_BUDGET,
+            stream=False,
+            **search):
     """
     Recursively pulls geodesic charges from GAMESS calculations.
     Pulls mulliken charges from Gaussian calculations.
     Writes to `charges.csv` if desired
+
+    With `stream=True`, rows are written to `output` (csv, or json lines if
+    it ends in .jsonl) as each log is read instead, without the table or
+    asking first; see `stream_rows`.
     """
-    results = []
+    keys = ("Path", "Index", "Element", "Charge", "Rx", "Ry", "Rz", "Fragment")
+    files = find_files(dir, ["log"],
+                       filepath_includes=string_to_find,
+                       compressed=True,
+                       **search)
+    parse = dict(readahead=readahead, readahead_budget=readahead_budget)
+    if stream:
+
+        def found(logs, errors):
+            return find_charges(logs, errors, workers, batch_size=STREAM_BATCH, **parse)
 
-    files = get_files(dir, ["log"], filepath_includes=string_to_find)
-    for logfile in files:
-        if file_is_gaussian(logfile):
-            res = []
-            assigned = []
-            print(logfile)
-            atom_regex = "^\s?[A-z]{1,2}(\s+-?[0-9]+\.[0-9]+){3}"
-            charge_regex = "^\s+[0-9]+\s+[A-z]{1,2}\s+-?[0-9]+\.[0-9]+"
-            #     1  C   -0.122119
-            for line in read_file(logfile):
-                if re.search(atom_regex, line):
-                    sym, x, y, z = line.split()
-                    x, y, z = map(float, (x, y, z))
-                    res.append([logfile, Atom(sym, coords=(x, y, z))
-                                ])  # new key for each coord
-            found = False
-            counter = 0
-            for line in eof(logfile, 0.20):
-                if "Mulliken charges:" in line:
-                    found = True
-                if "Sum of Mulliken charges" in line:
-                    break
-                if found:
-                    if re.search(charge_regex, line):
-                        res[counter].append(float(line.split()[-1]))
-                        counter += 1
-            coordinates = [atom[1] for atom in res]
-            mol = Molecule(atoms=coordinates)
-            mol.separate()
-            for atom, r in zip(mol.coords, res):
-                path, _, charge = r
-                try:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        f"{mol.fragments[atom.mol]['name']}_{atom.mol}",
-                    ])
-                except KeyError:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        geodesic_charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        "NA",
-                    ])
-
-        if file_is_gamess(logfile):
-            atom_regex = "^\s[A-Za-z]{1,2}\s*[0-9]*.[0-9]*(\s*-?[0-9]*.[0-9]*){3}$"
-            charge_regex = "^\s[A-Za-z]{1,2}(\s*-?[0-9]*.[0-9]*){2}$"
-            print(logfile)
-            inpfile = logfile[:-3] + "inp"
-
-            res = []
-
-            for line in read_file(inpfile):
-                if re.search(atom_regex, line):
-                    sym, atnum, x, y, z = line.split()
-                    x, y, z = map(float, (x, y, z))
-                    res.append([logfile, Atom(sym, coords=(x, y, z))
-                                ])  # new key for each coord
-            found = False
-            counter = 0
-            for line in read_file(logfile):
-                if "NET CHARGES:" in line:
-                    found = True
-                if "RMS DEVIATION" in line:
-                    break
-                if found:
-                    if re.search(charge_regex, line):
-                        res[counter].append(float(line.split()[1]))
-                        counter += 1
-            coordinates = [atom[1] for atom in res]
-            mol = Molecule(atoms=coordinates)
-            mol.separate()
-            for atom, r in zip(mol.coords, res):
-                path, _, geodesic_charge = r
-                try:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        geodesic_charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        f"{mol.fragments[atom.mol]['name']}_{atom.mol}",
-                    ])
-                except KeyError:
-                    results.append([
-                        path,
-                        atom.index,
-                        atom.symbol,
-                        geodesic_charge,
-                        atom.x,
-                        atom.y,
-                        atom.z,
-                        "NA",
-                    ])
+        return stream_rows(output, keys, files, found,
+                           scan_of(dir, string_to_find=string_to_find, **search))
+
+    results = []
+    errors = []
+    for logfile, rows in find_charges(files, errors, workers, **parse):
+        results += rows
+    report_errors(errors)
 
     # nested list (one level) to dict
     data = {}
-    keys = ("Path", "Index", "Element", "Charge", "Rx", "Ry", "Rz", "Fragment")
     for index, value in enumerate(keys):
         data[value] = [val[index] for val in results]
     responsive_table(data, strings=[1, 3, 8], min_width=10)
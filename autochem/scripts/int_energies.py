@@ -1,7 +1,7 @@
 import pandas as pd
 from dfply import *
 import numpy as np
-from ..core.utils import responsive_table
+from ..core.utils import read_table, responsive_table, write_frame
 
 __all__ = ['calculate_interaction_energies', 'apply_boltzmann_weightings']
 
@@ -21,6 +21,8 @@ def calculate_interaction_energies(csv, ionic_present=False, software='gamess',
     path.
     Pass in --with-ionic to indicate that a calculation is included that
     includes all ions of the cluster, with neutral/undesired molecules removed.
+    The energies can also be read from, and the output written to, parquet or
+    feather files.
     """
 
     @make_symbolic
@@ -33,7 +35,7 @@ def calculate_interaction_energies(csv, ionic_present=False, software='gamess',
 
     gamess_df = None
     psi4_df = None
-    df = pd.read_csv(csv)
+    df = read_table(csv)
     if software == 'gamess':
         gamess_df = df
     else:
@@ -70,7 +72,7 @@ def calculate_interaction_energies(csv, ionic_present=False, software='gamess',
             else:
                 print(data)
             if output is not None:
-                data.to_csv(output, index=False)
+                write_frame(data, output)
         else:
             print(gamess_df.columns)
             data = (gamess_df >>
@@ -98,7 +100,7 @@ def calculate_interaction_energies(csv, ionic_present=False, software='gamess',
             else:
                 print(data)
             if output is not None:
-                data.to_csv(output, index=False)
+                write_frame(data, output)
 
     if psi4_df is not None:
         if ionic_present:
@@ -132,7 +134,7 @@ def calculate_interaction_energies(csv, ionic_present=False, software='gamess',
             else:
                 print(data)
             if output is not None:
-                data.to_csv(output, index=False)
+                write_frame(data, output)
         else:
             data = (psi4_df >>
                 mutate(Config = X.Path.str.split('/').str[0]) >>
@@ -159,13 +161,14 @@ def calculate_interaction_energies(csv, ionic_present=False, software='gamess',
             else:
                 print(data)
             if output is not None:
-                data.to_csv(output, index=False)
+                write_frame(data, output)
 
 
 def apply_boltzmann_weightings(csv, grouping, output):
     """
     Take in a csv produced from `calculate_interaction_energies` and weight configurations
-    according a boltzmann distribution of total energy.
+    according a boltzmann distribution of total energy. Parquet and feather
+    files can be used instead of csv, for the input and the output.
     """
     @make_symbolic
     def bp(series, as_percent = False):
@@ -199,7 +202,7 @@ def apply_boltzmann_weightings(csv, grouping, output):
         return 1.96 * sd(column) * (n(column) ** -0.5)
 
 
-    df = pd.read_csv(csv)
+    df = read_table(csv)
     weighted = (df >> 
         mutate(complex_total_energy = X.hf_complex + X.corr_complex,
                Groups = eval(grouping)) >>
@@ -212,4 +215,4 @@ def apply_boltzmann_weightings(csv, grouping, output):
                   Electro_CI = confidence(X.hf_weighted),
                   Dispersion_CI = confidence(X.corr_weighted)))
     print(weighted)
-    weighted.to_csv(output, index=False)
+    write_frame(weighted, output)
@@ -2,9 +2,9 @@ from ..interfaces.gamess import GamessJob
 from ..interfaces.gaussian import GaussJob
 from ..interfaces.orca import OrcaJob
 from ..interfaces.psi import PsiJob
+from ..core.utils import get_files
 
 import os
-import glob
 from shutil import copyfile
 
 __all__ = ["xyz_to_tree"]
@@ -211,7 +211,7 @@ def logfile_in_dir(path):
 
 def make_job_files(base_dir, chem_package, settings):
     # find all xyz files in subdir to work on
-    files = glob.glob("**/*xyz", recursive=True)
+    files = [os.path.relpath(file) for file in get_files(".", ["xyz"])]
     for file in files:
         path, f = os.path.split(file)
         if path != "":  # or xyz_is_rerun(f):
@@ -234,14 +234,13 @@ def make_job_subdirs(base_dir):
     (i.e. opt, spec, freq), then moves the inp and job into that folder.
     """
     parent = os.getcwd()
-    for path, dirs, files in os.walk(base_dir):
-        for file in files:
-            if file.endswith(".inp") or file.endswith(".job"):
-                os.chdir(path)
-                file_type = file[:-4]  # opt, spec, freq...
-                os.mkdir(file_type)
-                os.system(f"mv {file_type}.inp {file_type}.job {file_type}/")
-                os.chdir(parent)
+    for file in get_files(base_dir, [r"\.inp", r"\.job"]):
+        path, file = os.path.split(file)
+        os.chdir(path)
+        file_type = file[:-4]  # opt, spec, freq...
+        os.mkdir(file_type)
+        os.system(f"mv {file_type}.inp {file_type}.job {file_type}/")
+        os.chdir(parent)
 
 
 def xyz_to_tree(settings):
@@ -1,4 +1,5 @@
 import os
+from ..core.utils import get_files
 
 __all__ = ['make_files_from_meta']
 
@@ -50,32 +51,31 @@ def make_files_from_meta(base_dir, filename = None):
             ├── opt.inp
             └── opt.job
     """
+    # paths of every meta.py, as a regex matching the whole file name
+    metas = [os.path.dirname(file) for file in get_files(base_dir, [r'^meta\.py'])]
     if filename is not None:
         parent = os.getcwd()
-        for path, dirs, files in os.walk(base_dir):
-            for file in files:
-                if file == 'meta.py' and os.path.exists(os.path.join(path, 'equil.xyz')):
-                    print(path)
-                    os.chdir(path)
-                    if not any(file.endswith('.xyz') for file in os.listdir('.')):
-                        raise TypeError(f'Meta file requires an xyz file in the same directory. Check {os.getcwd()}')
-                    else:
-                        print(os.getcwd())
-                    os.system('python3 meta.py')
-                    os.chdir(parent)
+        for path in metas:
+            if os.path.exists(os.path.join(path, 'equil.xyz')):
+                print(path)
+                os.chdir(path)
+                if not any(file.endswith('.xyz') for file in os.listdir('.')):
+                    raise TypeError(f'Meta file requires an xyz file in the same directory. Check {os.getcwd()}')
+                else:
+                    print(os.getcwd())
+                os.system('python3 meta.py')
+                os.chdir(parent)
 
     else:
         parent = os.getcwd()
-        for path, dirs, files in os.walk(base_dir):
-            for file in files:
-                if file == 'meta.py':
-                    os.chdir(path)
-                    if not any(file.endswith('.xyz') for file in os.listdir('.')):
-                        raise TypeError(f'Meta file requires an xyz file in the same directory. Check {os.getcwd()}')
-                    else:
-                        print(os.getcwd())
-                    os.system('python3 meta.py')
-                    os.chdir(parent)
+        for path in metas:
+            os.chdir(path)
+            if not any(file.endswith('.xyz') for file in os.listdir('.')):
+                raise TypeError(f'Meta file requires an xyz file in the same directory. Check {os.getcwd()}')
+            else:
+                print(os.getcwd())
+            os.system('python3 meta.py')
+            os.chdir(parent)
 
     
         
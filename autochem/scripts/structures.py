@@ -1,16 +1,12 @@
 import os
+from ..core.utils import get_files
 
 __all__ = ['copy_xyz_tree']
 
 def get_structures(base_dir):
     """Returns a copy of the directory tree without the runtype folders for each chemical system- no need to know if the file was ran as an optimisation or hessian etc... the files with a chemical name are initial coordinates, and equil.xyz are equilibrium coordinates found after geometry optimisation."""
 
-    file_lst = []
-    for path, dirs, files in os.walk(base_dir):
-        for file in files:
-            if file.endswith('.xyz'):
-                file_lst.append(os.path.join(path, file))
-    return file_lst
+    return get_files(base_dir, [r'\.xyz'])
 
 def change_to_subdir(subdirectory):
     new_dir = os.path.join(os.getcwd(), subdirectory)
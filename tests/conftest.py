@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# run against the source tree, without installing it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# keep the caches of the tests out of ~/.autochem_cache
+os.environ['AUTOCHEM_CACHE'] = tempfile.mkdtemp(prefix='autochem_cache')
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+
+@pytest.fixture
+def data():
+    """Returns the path of a file in tests/data"""
+    return lambda name: os.path.join(DATA, name)
@@ -0,0 +1,176 @@
+import json
+import os
+import sqlite3
+
+from autochem.core.result_store import ResultStore
+from autochem.core.thermo_cache import ThermoCache
+from autochem.core.utils import write_json
+
+ENTRY = {
+    'program': 'gaussian', 'completed': True, 'runtype': 'freq', 'is_spec': False,
+    'is_optimisation': False, 'is_hessian': True, 'method': 'B3LYP', 'basis': '6-31G(d)',
+    'homo_lumo': None, 'energy': -76.4, 'errors': {'homo_lumo': 'ValueError: no orbitals'}
+}
+
+
+def test_write_json(tmp_path):
+    file = tmp_path / 'record.json'
+    write_json({'a': [1, 2]}, str(file))
+    write_json({'a': [3]}, str(file))
+    assert json.loads(file.read_text()) == {'a': [3]}
+    assert os.listdir(tmp_path) == ['record.json']
+
+
+def test_result_store(tmp_path):
+    log = tmp_path / 'water.log'
+    log.write_text('Normal termination\n')
+    store = ResultStore(str(tmp_path / 'results.sqlite'), version=1)
+    assert store.load(str(log)) is None
+    store.save(str(log), ENTRY)
+    store.commit()
+    entry = store.load(str(log))
+    assert entry['energy'] == -76.4 and entry['completed'] is True
+    # fields that failed are not kept, so they are parsed again
+    assert 'homo_lumo' not in entry and entry['errors'] == {}
+    assert (store.hits, store.misses) == (1, 1)
+    assert len(store.select(completed=True)) == 1
+    # parsers of another version don't use the entry
+    assert ResultStore(store.path, version=2).load(str(log)) is None
+    log.write_text('Normal termination\nchanged\n')
+    assert store.load(str(log)) is None
+    store.clear()
+    assert store.query() == []
+
+
+def test_result_store_old_layout(tmp_path):
+    path = str(tmp_path / 'results.sqlite')
+    with sqlite3.connect(path) as connection:
+        connection.execute('CREATE TABLE logs (path TEXT PRIMARY KEY, fields TEXT)')
+    store = ResultStore(path)
+    assert store.query() == []
+
+
+def test_thermo_cache_batches(tmp_path):
+    cache = ThermoCache(str(tmp_path / 'thermo.sqlite'))
+    cache.batch_size = 2
+    cache.save('a', {'S tot': [1.0]})
+    assert cache._pending == 1
+    cache.save('b', {'S tot': [2.0]})
+    assert cache._pending == 0
+    # committed, so another connection sees them
+    assert ThermoCache(cache.path).load('b') == {'S tot': [2.0]}
+    assert str(cache) == f'ThermoCache: {cache.path}, 0 hits, 0 misses'
+    cache.clear()
+    assert cache.load('a') is None
+    cache.enabled = False
+    cache.save('c', {})
+    assert cache.load('c') is None
+
+
+def test_log_changing_while_parsed(data, tmp_path, monkeypatch):
+    from autochem.scripts import grep_results
+
+    log = tmp_path / 'water.log'
+    log.write_text(open(data('water_gauss.log')).read())
+    store = ResultStore(str(tmp_path / 'results.sqlite'), version=1)
+
+    def size_then_append(calc):
+        size = os.path.getsize(log)
+        # the calculation writes more while the log is parsed
+        with open(log, 'a') as f:
+            f.write(' Normal termination of Gaussian 16\n')
+        return size
+
+    monkeypatch.setitem(grep_results.LOG_FIELDS, 'size', size_then_append)
+    first = grep_results.parse_log(str(log), ['size'], store=store)
+    # stored under the stat from before it was parsed, so parsed again
+    assert store.load(str(log)) is None
+    monkeypatch.setitem(grep_results.LOG_FIELDS, 'size', lambda calc: os.path.getsize(log))
+    second = grep_results.parse_log(str(log), ['size'], store=store)
+    assert second['size'] == os.path.getsize(log) > first['size']
+    assert grep_results.parse_log(str(log), ['size'], store=store)['size'] == second['size']
+    assert store.hits == 1
+
+
+def test_section_index_records(tmp_path):
+    from autochem.core.section_index import SectionIndex
+
+    log = tmp_path / 'water.log'
+    log.write_text('header\n')
+    index = SectionIndex(str(tmp_path / 'sections'))
+    index.save(str(log), {'header': [0]})
+    assert index.load(str(log)) == {'header': [0]}
+    # records from elsewhere, without a stat, miss rather than raise
+    write_json({'offsets': {'header': [0]}}, index.path(str(log)))
+    assert index.load(str(log)) == {}
+    assert (index.hits, index.misses) == (1, 1)
+
+
+def test_offsets_of_a_log_written_while_searched(data, tmp_path, monkeypatch):
+    from autochem.core import results
+    from autochem.core.section_index import SectionIndex
+    from autochem.interfaces.gaussian_results import GaussianResults
+
+    log = tmp_path / 'water.log'
+    log.write_text(open(data('water_gauss.log')).read())
+    header = 'Standard orientation'
+    line_offsets = results.MappedLog.line_offsets
+
+    def written_meanwhile(self, marker):
+        offsets = line_offsets(self, marker)
+        # the calculation writes another geometry after the log is mapped
+        with open(log, 'a') as f:
+            f.write(f' {header}:\n')
+        return offsets
+
+    monkeypatch.setattr(GaussianResults, 'section_index', SectionIndex(str(tmp_path / 'sections')))
+    monkeypatch.setattr(results.MappedLog, 'line_offsets', written_meanwhile)
+    assert GaussianResults(str(log)).offsets(header) == []
+    monkeypatch.setattr(results.MappedLog, 'line_offsets', line_offsets)
+    # stored under the stat from before the search, so searched again
+    assert len(GaussianResults(str(log)).offsets(header)) > 0
+
+
+def test_compressed_log_decompressed_once(data, tmp_path, monkeypatch):
+    import gzip
+    from autochem.core import results, utils
+    from autochem.core.section_index import SectionIndex
+    from autochem.interfaces.gamess_results import GamessResults
+
+    plain = GamessResults(data('water_gamess.log'))
+    log = tmp_path / 'water.log.gz'
+    with open(data('water_gamess.log'), 'rb') as f:
+        log.write_bytes(gzip.compress(f.read()))
+    opened = []
+
+    def counted(file, *args, **kwargs):
+        opened.append(file)
+        return open_log(file, *args, **kwargs)
+
+    open_log = utils.open_log
+    monkeypatch.setattr(utils, 'open_log', counted)
+    monkeypatch.setattr(results, 'open_log', counted)
+    monkeypatch.setattr(GamessResults, 'section_index', SectionIndex(str(tmp_path / 'sections')))
+    compressed = GamessResults(str(log))
+    assert list(compressed.tail(0.2)) == list(plain.tail(0.2))
+    # shorter tails are served from the one already decompressed
+    assert list(compressed.tail(0.05)) == list(plain.tail(0.05))
+    assert list(compressed.eof(0.1)) == list(plain.eof(0.1))
+    assert len(opened) == 1
+    assert list(compressed.tail(0.5)) == list(plain.tail(0.5))
+    assert len(opened) == 2
+
+    # sections are kept from the pass that finds their offsets
+    compressed = GamessResults(str(log))
+    header = 'MODE FREQ(CM**-1)'
+    assert len(compressed.offsets(header)) == 1
+    assert compressed.offsets(header) == plain.offsets(header)
+    assert list(compressed.sections(header, '\n')) == list(plain.sections(header, '\n'))
+    assert list(compressed.tail(0.1)) == list(plain.tail(0.1))
+    assert len(opened) == 3
+    # and an index from before is read from the first offset asked for
+    compressed = GamessResults(str(log))
+    start = compressed.offsets(header)[0]
+    assert list(compressed.read_from(start)) == list(plain.read_from(start))
+    assert compressed.read_section(start, '\n') == plain.read_section(start, '\n')
+    assert len(opened) == 4
@@ -0,0 +1,153 @@
+import numpy as np
+import pytest
+
+from autochem.core.atom import Atom
+from autochem.core.hessian import BOHR_TO_ANG, read_fchk, read_hessian, vibrations
+
+
+def energy(x, bonds, angles):
+    """Energy of harmonic bonds and angles at flattened coordinates in bohr"""
+    x = x.reshape(-1, 3)
+    e = 0
+    for i, j, k, r0 in bonds:
+        e += 0.5 * k * (np.linalg.norm(x[i] - x[j]) - r0)**2
+    for i, j, l, k, t0 in angles:
+        a, b = x[i] - x[j], x[l] - x[j]
+        c = np.clip(a @ b / np.linalg.norm(a) / np.linalg.norm(b), -1, 1)
+        e += 0.5 * k * (np.arccos(c) - t0)**2
+    return e
+
+
+def finite_hessian(x, bonds, angles, step=1e-4):
+    n = len(x)
+    hessian = np.zeros((n, n))
+    shifts = np.eye(n) * step
+    for i in range(n):
+        for j in range(i, n):
+            hessian[i, j] = hessian[j, i] = (
+                energy(x + shifts[i] + shifts[j], bonds, angles) -
+                energy(x + shifts[i] - shifts[j], bonds, angles) -
+                energy(x - shifts[i] + shifts[j], bonds, angles) +
+                energy(x - shifts[i] - shifts[j], bonds, angles)) / (4 * step**2)
+    return hessian
+
+
+def molecule(symbols, x):
+    return [Atom(symbol=s, coords=c) for s, c in zip(symbols, x.reshape(-1, 3) * BOHR_TO_ANG)]
+
+
+ANGLE = np.radians(104.5)
+WATER_X = np.array([0, 0, 0,
+                    1.81 * np.sin(ANGLE / 2), 0, 1.81 * np.cos(ANGLE / 2),
+                    -1.81 * np.sin(ANGLE / 2), 0, 1.81 * np.cos(ANGLE / 2)])
+WATER_H = finite_hessian(WATER_X, [(0, 1, 0.5, 1.81), (0, 2, 0.5, 1.81)], [(1, 0, 2, 0.16, ANGLE)])
+WATER = molecule('OHH', WATER_X)
+WATER_MASSES = [15.9949146, 1.00782504, 1.00782504]
+
+CO2_X = np.array([0, 0, -2.2, 0, 0, 0, 0, 0, 2.2])
+CO2_H = finite_hessian(CO2_X, [(0, 1, 0.8, 2.2), (1, 2, 0.8, 2.2)], [])
+CO2 = molecule('OCO', CO2_X)
+
+
+def test_water_projected():
+    freqs, modes = vibrations(WATER_H, WATER)
+    assert freqs.shape == (3, )
+    assert modes.shape == (3, 3, 3)
+    assert (freqs > 1000).all()
+    assert np.linalg.norm(modes, axis=(1, 2)) == pytest.approx(1)
+    # unprojected, the same vibrations come out with six near zero modes
+    unprojected, _ = vibrations(WATER_H, WATER, project=False)
+    assert len(unprojected) == 9
+    assert np.abs(unprojected[:6]).max() < 1
+    assert unprojected[6:] == pytest.approx(freqs, abs=1e-2)
+
+
+def test_linear_has_3n_minus_5():
+    freqs, modes = vibrations(CO2_H, CO2)
+    assert freqs.shape == (4, )
+    assert modes.shape == (4, 3, 3)
+    # no bending term, so the bends are zero and the stretches are not
+    assert freqs[:2] == pytest.approx(0, abs=1)
+    assert (freqs[2:] > 1000).all()
+
+
+def test_isotopologues_in_one_call():
+    heavy = [15.9949146, 2.01410178, 2.01410178]
+    freqs, modes = vibrations(WATER_H, WATER, [WATER_MASSES, heavy])
+    assert freqs.shape == (2, 3)
+    assert modes.shape == (2, 3, 3, 3)
+    for masses, batch in zip([WATER_MASSES, heavy], freqs):
+        assert batch == pytest.approx(vibrations(WATER_H, WATER, masses)[0])
+    assert (freqs[1] < freqs[0]).all()
+
+
+def test_partial():
+    freqs, modes = vibrations(WATER_H, WATER, partial=[1])
+    assert freqs.shape == (3, )
+    assert modes.shape == (3, 1, 3)
+
+
+def fchk_array(name, kind, values, fmt, per_line):
+    lines = [f'{name:<40}   {kind}   N={len(values):>12}']
+    for i in range(0, len(values), per_line):
+        lines.append(''.join(fmt % v for v in values[i:i + per_line]))
+    return lines
+
+
+def test_fchk(tmp_path):
+    # a basis in columns 41-70 of the second line puts an I in column 44
+    lines = ['water MIDIX', 'Freq      RB3LYP                        MIDIX',
+             f'{"Number of atoms":<40}   I     {3:>12}']
+    lines += fchk_array('Atomic numbers', 'I', [8, 1, 1], '%12d', 6)
+    lines += fchk_array('Current cartesian coordinates', 'R', WATER_X, '%16.8E', 5)
+    lines += fchk_array('Real atomic weights', 'R', WATER_MASSES, '%16.8E', 5)
+    lines += fchk_array('Cartesian Force Constants', 'R', WATER_H[np.tril_indices(9)], '%16.8E', 5)
+    fchk = tmp_path / 'water.fchk'
+    fchk.write_text('\n'.join(lines) + '\n')
+    sections = read_fchk(str(fchk))
+    assert sections['Number of atoms'] == 3
+    assert 'MIDIX' not in sections
+    hessian, atoms, masses = read_hessian(str(fchk))
+    assert hessian == pytest.approx(WATER_H, abs=1e-7)
+    assert [atom.symbol for atom in atoms] == ['O', 'H', 'H']
+    assert masses == pytest.approx(WATER_MASSES)
+
+
+def test_orca_hess(tmp_path):
+    lines = ['', '$orca_hessian_file', '', '$hessian', '9']
+    for start in range(0, 9, 5):
+        columns = range(start, min(start + 5, 9))
+        lines.append('          ' + ''.join(f'{j:>18}' for j in columns))
+        for i in range(9):
+            lines.append(f'{i:>6}    ' + ''.join(f'{WATER_H[i, j]:18.10E}' for j in columns))
+    lines += ['', '$atoms', '3']
+    for symbol, mass, xyz in zip('OHH', WATER_MASSES, WATER_X.reshape(-1, 3)):
+        lines.append(f' {symbol}  {mass:10.5f}  ' + '  '.join(f'{v:14.8f}' for v in xyz))
+    lines += ['', '$end']
+    hess = tmp_path / 'water.hess'
+    hess.write_text('\n'.join(lines) + '\n')
+    hessian, atoms, masses = read_hessian(str(hess))
+    assert hessian == pytest.approx(WATER_H, abs=1e-9)
+    assert atoms[1].coords == pytest.approx(WATER[1].coords, abs=1e-6)
+    assert masses == pytest.approx(WATER_MASSES, abs=1e-5)
+
+
+def test_gamess_dat(tmp_path):
+    # rows in (I2,I3,5E15.8), negative values running into each other
+    lines = [' $HESS', 'ENERGY IS      -76.0107465155 E(NUC) IS        9.1681932964']
+    for i in range(9):
+        for line, start in enumerate(range(0, 9, 5)):
+            lines.append(f'{(i + 1) % 100:2d}{line + 1:3d}' +
+                         ''.join(f'{v:15.8E}' for v in WATER_H[i, start:start + 5]))
+    lines.append(' $END')
+    (tmp_path / 'water.dat').write_text('\n'.join(lines) + '\n')
+    log = [' GAMESS', ' COORD 0 VIB 0']
+    for symbol, xyz in zip('OHH', WATER_X.reshape(-1, 3)):
+        log.append(f'    1 {symbol}  ' + ' '.join(f'{v:14.10f}' for v in xyz))
+    log.append(' CPU')
+    (tmp_path / 'water.log').write_text('\n'.join(log) + '\n')
+    hessian, atoms, masses = read_hessian(str(tmp_path / 'water.dat'))
+    assert hessian == pytest.approx(WATER_H, abs=1e-7)
+    assert masses is None
+    freqs, _ = vibrations(hessian, atoms)
+    assert freqs == pytest.approx(vibrations(WATER_H, WATER)[0], abs=1e-2)
@@ -0,0 +1,37 @@
+from autochem.core.atom import Atom
+from autochem.core.molecule import Molecule
+
+WATER_DIMER = [('O', 0.0, 0.0, 0.0), ('H', 0.757, 0.586, 0.0), ('H', -0.757, 0.586, 0.0),
+               ('O', 0.0, -2.9, 0.0), ('H', 0.0, -1.95, 0.0), ('H', 0.0, -3.2, 0.9)]
+
+
+def test_atoms_passed_in_are_copied():
+    a = Molecule(atoms=WATER_DIMER)
+    first = a.coords[0]
+    b = Molecule(atoms=a.coords[:3])
+    assert all(copy is not atom for copy, atom in zip(b.coords, a.coords))
+    a.translate([10, 0, 0])
+    # the atoms of a are still views of a's arrays
+    assert first.coords.tolist() == [10, 0, 0] and a.positions[0][0] == 10
+    assert all((atom.coords == row).all() for atom, row in zip(a.coords, a.positions))
+    assert (b.positions[:, 0] == [0, 0.757, -0.757]).all()
+    b.translate([0, 5, 0])
+    assert a.positions[0][1] == 0
+
+
+def test_copies_leave_molecule_numbers_alone():
+    a = Molecule(atoms=WATER_DIMER)
+    mols = [atom.mol for atom in a.coords]
+    b = Molecule(atoms=a.coords[3:])
+    # b numbers its own fragments, without renumbering a
+    assert [atom.mol for atom in b.coords] == [1, 1, 1]
+    assert [atom.mol for atom in a.coords] == mols
+    assert len(a.fragments) == 2 and len(b.fragments) == 1
+
+
+def test_single_atoms():
+    atoms = [Atom('O'), Atom('H', coords=(0.96, 0, 0))]
+    mol = Molecule(atoms=atoms)
+    mol.translate([1, 0, 0])
+    assert atoms[0].coords.tolist() == [0, 0, 0]
+    assert mol.positions[:, 0].tolist() == [1, 1.96]
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from autochem.core.neighbours import NeighbourList, bonded_pairs, cell_matrix, minimum_image
+from autochem.core.periodic_table import PeriodicTable as PT
+
+# boxes that are only one or two cutoffs across along some axes, where the
+# same neighbouring cell is reached by more than one offset
+CELLS = [
+    None,
+    [5.0, 6.0, 7.0],
+    [4.0, 9.0, 13.0],
+    [6.0, 7.0, 8.0, 70.0, 80.0, 100.0],
+    [12.0, 5.0, 9.0, 80.0, 95.0, 110.0],
+    [[7.0, 0.0, 0.0], [3.5, 6.0, 0.0], [-2.0, 1.5, 5.5]],
+]
+
+
+def brute_force(positions, cutoff, cell=None):
+    """Every pair closer than the cutoff, from all N² separations"""
+    i, j = np.triu_indices(len(positions), k=1)
+    diff = positions[i] - positions[j]
+    if cell is not None:
+        diff = minimum_image(diff, cell_matrix(cell))
+    dists = np.sqrt((diff**2).sum(axis=1))
+    close = dists < cutoff
+    return i[close], j[close], dists[close]
+
+
+def random_positions(rng, num_atoms, cell):
+    if cell is None:
+        return rng.uniform(-8, 8, size=(num_atoms, 3))
+    # some atoms outside the box, as in unwrapped trajectories
+    return rng.uniform(-0.3, 1.3, size=(num_atoms, 3)) @ cell_matrix(cell)
+
+
+@pytest.mark.parametrize('cell', CELLS)
+@pytest.mark.parametrize('seed', range(5))
+def test_pairs_match_brute_force(cell, seed):
+    rng = np.random.default_rng(seed)
+    positions = random_positions(rng, int(rng.integers(2, 120)), cell)
+    for cutoff in (1.0, 2.5, 3.2):
+        i, j, dists = NeighbourList(positions, cutoff, cell).pairs()
+        expected_i, expected_j, expected_dists = brute_force(positions, cutoff, cell)
+        assert i.tolist() == expected_i.tolist()
+        assert j.tolist() == expected_j.tolist()
+        assert np.allclose(dists, expected_dists)
+
+
+@pytest.mark.parametrize('cell', CELLS)
+def test_bonded_pairs_match_brute_force(cell):
+    rng = np.random.default_rng(7)
+    positions = random_positions(rng, 80, cell)
+    atnums = rng.choice([1, 6, 7, 8], size=len(positions))
+    radii = PT.vdw_radii[atnums]
+    i, j, dists = brute_force(positions, np.inf, cell)
+    bonded = dists < radii[i] + radii[j]
+    found_i, found_j = bonded_pairs(positions, atnums, cell)
+    assert found_i.tolist() == i[bonded].tolist()
+    assert found_j.tolist() == j[bonded].tolist()
+
+
+def test_no_pairs():
+    assert len(NeighbourList(np.zeros((1, 3)), 2.0).pairs()[0]) == 0
+    assert len(NeighbourList(np.zeros((0, 3)), 2.0, cell=[5, 5, 5]).pairs()[0]) == 0
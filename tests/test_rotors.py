@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pytest
+
+from autochem.core.atom import Atom
+from autochem.core.thermo import read_rotors, thermo_properties, thermo_rows
+from autochem.core.thermo_cache import ThermoCache
+from autochem.scripts.grep_results import log_rotors, unmatched_rotors
+
+ETHANE = [
+    Atom(symbol=s, coords=c) for s, c in [
+        ('C', (0, 0, 0.765)), ('C', (0, 0, -0.765)), ('H', (1.018, 0, 1.16)),
+        ('H', (-0.509, 0.882, 1.16)), ('H', (-0.509, -0.882, 1.16)),
+        ('H', (-1.018, 0, -1.16)), ('H', (0.509, 0.882, -1.16)), ('H', (0.509, -0.882, -1.16))
+    ]
+]
+FREQS = [289.5, 821.9, 821.9, 995.0, 1206.4, 1206.4, 1379.1, 1397.9, 1468.5, 1468.5,
+         1469.7, 1469.7, 2896.1, 2954.0, 2968.7, 2968.7, 2985.4, 2985.4]
+ROTORS = {0: ([0, 2, 3, 4], 3, 12.0)}
+
+
+def test_read_rotors(tmp_path):
+    file = tmp_path / 'rotors.json'
+    file.write_text(json.dumps({'ethane.log': {'0': [[0, 2, 3, 4], 3, 12]}}))
+    assert read_rotors(str(file)) == {'ethane.log': ROTORS}
+
+
+def test_read_rotors_bad_format(tmp_path):
+    file = tmp_path / 'rotors.json'
+    file.write_text(json.dumps({'ethane.log': [0, 3, 12]}))
+    with pytest.raises(ValueError):
+        read_rotors(str(file))
+
+
+def test_matching_logs():
+    rotors = {'ethane.log': ROTORS, 'sub/propane.log': ROTORS, 'missing.log': ROTORS}
+    assert log_rotors('./a/ethane.log', rotors) == 'ethane.log'
+    assert log_rotors('./sub/propane.log', rotors) == 'sub/propane.log'
+    assert log_rotors('./water.log', rotors) is None
+    logs = ['./a/ethane.log', './sub/propane.log', './water.log']
+    assert unmatched_rotors(rotors, logs) == [('missing.log', 'no log found for its hindered rotors')]
+
+
+def test_hindered_rotor_columns(tmp_path):
+    cache = ThermoCache(str(tmp_path / 'thermo.sqlite'))
+    plain, = thermo_rows(FREQS, ETHANE, 1, 298.15, cache=cache)
+    assert 'S tot HR' not in plain
+    rows = thermo_rows(FREQS, ETHANE, 1, '298.15,500', ROTORS, cache=cache)
+    assert all({'TC HR', 'S vib HR', 'S tot HR'} <= set(row) for row in rows)
+    assert rows[0]['S tot'] == plain['S tot']
+    assert rows[0]['TC'] == plain['TC']
+    data = thermo_properties(FREQS, ETHANE, 1, np.array([298.15, 500]), ROTORS)
+    assert data['S tot HR'] - data['S tot'] == pytest.approx(data['S vib HR'] - data['S vib'])
+    assert [float(row['S tot HR']) for row in rows] == pytest.approx(data['S tot HR'], abs=1e-5)
+    assert cache.misses == 2
+
+
+def test_rotor_must_be_a_low_mode():
+    with pytest.raises(ValueError):
+        thermo_properties(FREQS, ETHANE, 1, 298.15, {1: ([0, 2, 3, 4], 3, 12.0)})
+
+
+def test_rotor_on_the_axis():
+    with pytest.raises(ValueError):
+        thermo_properties(FREQS, ETHANE, 1, 298.15, {0: ([0], 1, 12.0)})
@@ -0,0 +1,75 @@
+import csv
+import os
+
+import pytest
+
+from autochem.core.row_stream import RowStream
+from autochem.core.utils import find_files
+from autochem.scripts.grep_results import scan_of, stream_rows
+
+LOGS = ['a/1.log', 'a/2.log', 'b/3.log', 'b/c/4.log', 'b/c/5.out', 'd/6.log', '7.log']
+
+
+class Interrupted(Exception):
+    pass
+
+
+def make_tree(root):
+    for log in LOGS:
+        path = root / log
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('Normal termination\n')
+
+
+def scan(dir, output, stop=None):
+    """Streams two rows per log of `dir`, interrupted after `stop` logs"""
+
+    def found(logs, errors):
+        for count, log in enumerate(logs):
+            if count == stop:
+                raise Interrupted
+            yield log, [[log, 0], [log, 1]]
+
+    logs = find_files(dir, ('.log', '.out'), manifest=False)
+    stream_rows(output, ('File', 'Row'), logs, found, scan_of(dir, manifest=False))
+
+
+def rows(output):
+    with open(output, encoding='utf-8-sig') as f:
+        return [tuple(row) for row in csv.reader(f)][1:]
+
+
+def test_interrupted_scan_resumes(tmp_path, monkeypatch):
+    monkeypatch.setattr(RowStream, 'interval', 0)
+    make_tree(tmp_path / 'tree')
+    monkeypatch.chdir(tmp_path)
+    output = str(tmp_path / 'rows.csv')
+    with pytest.raises(Interrupted):
+        scan('tree', output, stop=3)
+    assert len(rows(output)) == 6 and os.path.isfile(f'{output}.checkpoint')
+    scan('tree', output)
+    expected = [(log, row) for log in find_files('tree', ('.log', '.out'), manifest=False)
+                for row in ('0', '1')]
+    assert rows(output) == expected and len(expected) == 2 * len(LOGS)
+    assert not os.path.isfile(f'{output}.checkpoint')
+
+
+def test_other_scan_not_resumed(tmp_path, monkeypatch):
+    monkeypatch.setattr(RowStream, 'interval', 0)
+    make_tree(tmp_path / 'tree')
+    monkeypatch.chdir(tmp_path)
+    output = str(tmp_path / 'rows.csv')
+    with pytest.raises(Interrupted):
+        scan('tree', output, stop=3)
+    written = rows(output)
+    # the same logs, from paths that sort differently
+    monkeypatch.chdir(tmp_path / 'tree')
+    with pytest.raises(ValueError, match='interrupted scan'):
+        scan('.', output)
+    with pytest.raises(ValueError, match='interrupted scan'):
+        scan(str(tmp_path / 'tree' / 'b'), output)
+    assert rows(output) == written
+    # resumed by the scan that was interrupted
+    monkeypatch.chdir(tmp_path)
+    scan('tree', output)
+    assert len(rows(output)) == 2 * len(LOGS)
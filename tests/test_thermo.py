@@ -0,0 +1,98 @@
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from autochem.core.thermo import (THERMO_CACHE, freq_data_gamess, freq_data_gauss,
+                                  read_thermo_input, thermo_data, thermo_data_fortran,
+                                  thermo_properties)
+
+THERMO_F = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'autochem', 'core', 'thermo.f')
+
+# written by thermo.f (gfortran build) for water_gauss.log
+FORTRAN_WATER = {
+    (1, 298.15): {'ZPVE': 55.56545, 'TC': 9.92103, 'S elec': 0.0, 'S trans': 144.80349,
+                  'S rot': 44.72716, 'S vib': 0.0198, 'S tot': 189.55045,
+                  'TC - TS': -46.59344},
+    (2, 500): {'ZPVE': 55.56545, 'TC': 16.77976, 'S elec': 5.76311, 'S trans': 155.5501,
+               'S rot': 51.17513, 'S vib': 0.36251, 'S tot': 212.85086,
+               'TC - TS': -89.64567},
+}
+
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    monkeypatch.setattr(THERMO_CACHE, 'enabled', False)
+
+
+def test_gauss_keeps_every_mode(data):
+    freqs = freq_data_gauss(data('water_gauss.log'))
+    # the HPModes block repeats the same modes, and isn't counted twice
+    assert freqs['Frequencies [cm-1]'] == [1713.1007, 3727.4302, 3849.3981]
+    assert freqs['Intensities [Debye^2/(amu Å^2)]'] == [75.9425, 2.0626, 17.54]
+    assert freqs['Modes'] == [1, 2, 3]
+
+
+def test_gamess_removes_rotations_and_translations(data):
+    freqs = freq_data_gamess(data('water_gamess.log'))
+    assert freqs['Modes'] == [7, 8, 9]
+    assert freqs['Frequencies [cm-1]'] == [1713.101, 3727.43, 3849.398]
+
+
+def test_gamess_linear_keeps_bend(data):
+    freqs = freq_data_gamess(data('co2_gamess.log'))
+    assert freqs['Modes'] == [6, 7, 8, 9]
+    assert freqs['Frequencies [cm-1]'] == [667.381, 667.381, 1388.17, 2349.14]
+
+
+@pytest.mark.parametrize('name, modes', [('water_gamess.log', [7, 8, 9]),
+                                         ('co2_gamess.log', [6, 7, 8, 9])])
+def test_gamess_without_modes_line(data, tmp_path, name, modes):
+    """Falls back to 5 or 6 modes, from whether the geometry is linear"""
+    with open(data(name)) as f:
+        lines = [line for line in f if 'ARE TAKEN AS ROTATIONS' not in line]
+    log = tmp_path / name
+    log.write_text(''.join(lines))
+    assert freq_data_gamess(str(log))['Modes'] == modes
+
+
+@pytest.mark.parametrize('name', ['water_gauss.log', 'water_gamess.log'])
+def test_thermo_input(data, name):
+    freqs, atoms = read_thermo_input(data(name))
+    assert freqs == pytest.approx([1713.1, 3727.43, 3849.4], abs=1e-2)
+    assert [atom.symbol for atom in atoms] == ['O', 'H', 'H']
+    assert atoms[1].coords == pytest.approx([0, 0.7572, -0.4692], abs=1e-5)
+
+
+@pytest.mark.parametrize('mult, temp', list(FORTRAN_WATER))
+def test_matches_thermo_f(data, no_cache, mult, temp):
+    new = thermo_data(data('water_gauss.log'), mult, temp)
+    for key, value in FORTRAN_WATER[mult, temp].items():
+        assert float(new[key]) == pytest.approx(value, abs=2e-5), key
+
+
+def test_sqrt_pi(data):
+    freqs, atoms = read_thermo_input(data('water_gauss.log'))
+    plain = thermo_properties(freqs, atoms, 1, 298.15)
+    with_pi = thermo_properties(freqs, atoms, 1, 298.15, sqrt_pi=True)
+    shift = 8.31441 * np.log(np.sqrt(np.pi))
+    assert with_pi['S rot'] - plain['S rot'] == pytest.approx(shift)
+    assert with_pi['S tot'] - plain['S tot'] == pytest.approx(shift)
+    assert with_pi['TC - TS'] - plain['TC - TS'] == pytest.approx(-298.15 * shift / 1000)
+
+
+@pytest.mark.skipif(shutil.which('gfortran') is None, reason='needs gfortran')
+@pytest.mark.parametrize('name', ['water_gauss.log', 'water_gamess.log'])
+def test_against_compiled_thermo_f(data, no_cache, tmp_path, monkeypatch, name):
+    exe = str(tmp_path / 'thermo.exe')
+    subprocess.run(['gfortran', THERMO_F, '-o', exe], check=True, capture_output=True)
+    # thermo.f writes its input and output to the working directory
+    monkeypatch.chdir(tmp_path)
+    for mult, temp in [(1, 298.15), (2, 500), (3, 50)]:
+        fortran = thermo_data_fortran(data(name), mult, temp, exe=exe)
+        new = thermo_data(data(name), mult, temp)
+        for key, value in fortran.items():
+            assert float(new[key]) == pytest.approx(float(value), abs=2e-5), key